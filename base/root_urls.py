@@ -40,9 +40,12 @@ from django.urls import path
 from soapbox import val_test_route_name
 from soapbox.constants import (
     LANDING_ROUTE_NAME, HOME_ROUTE_NAME, VAL_TEST_PATH_PREFIX, HELP_URL,
-    HELP_ROUTE_NAME
+    HELP_ROUTE_NAME, METRICS_URL, METRICS_ROUTE_NAME, PROFILES_URL,
+    PROFILES_ROUTE_NAME, PROFILE_URL, PROFILE_ROUTE_NAME
+)
+from .views import (
+    get_landing, get_help, get_metrics, get_profiles, get_profile
 )
-from .views import get_landing, get_help
 
 urlpatterns = [
     # TODO duplicate routes
@@ -54,6 +57,9 @@ urlpatterns = [
 
     # standard app urls
     path(HELP_URL, get_help, name=HELP_ROUTE_NAME),
+    path(METRICS_URL, get_metrics, name=METRICS_ROUTE_NAME),
+    path(PROFILES_URL, get_profiles, name=PROFILES_ROUTE_NAME),
+    path(PROFILE_URL, get_profile, name=PROFILE_ROUTE_NAME),
     path('', get_landing, name=HOME_ROUTE_NAME),
     path('', get_landing, name=LANDING_ROUTE_NAME),
 ]
@@ -19,8 +19,11 @@
 #  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
 #  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 #  DEALINGS IN THE SOFTWARE.
-from django.http import HttpRequest, HttpResponse
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpRequest, HttpResponse, FileResponse, Http404
 from django.shortcuts import render, redirect
+from django.utils.crypto import constant_time_compare
 
 from base.constants import (
     FOLLOWING_FEED_ROUTE_NAME, CATEGORY_FEED_ROUTE_NAME, ALL_FEED_ROUTE_NAME
@@ -29,7 +32,16 @@ from soapbox import BASE_APP_NAME
 from soapbox.constants import (
     HOME_MENU_CTX, HELP_MENU_CTX, HELP_ROUTE_NAME, HOME_ROUTE_NAME
 )
-from utils import app_template_path, namespaced_url, resolve_req
+from utils import (
+    app_template_path, namespaced_url, resolve_req, get_registry,
+    exposition, METRICS_CONTENT_TYPE
+)
+from utils.metrics import JOBS_QUEUE_DEPTH
+from utils.profiling import list_profiles, profile_path, profile_text
+
+BEARER_PREFIX = 'Bearer '
+DOWNLOAD_QUERY = 'download'
+TEXT_CONTENT_TYPE = 'text/plain; charset=utf-8'
 
 
 def get_landing(request: HttpRequest) -> HttpResponse:
@@ -60,6 +72,78 @@ def get_help(request: HttpRequest) -> HttpResponse:
     )
 
 
+def get_metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Render metrics in Prometheus text exposition format, aggregated across
+    all server processes. Available to staff, or with the METRICS_TOKEN
+    bearer token
+    :param request: request
+    :return: response
+    """
+    from jobs.queue import queue_depth
+
+    authorisation = request.headers.get('Authorization', '')
+    token_ok = bool(settings.METRICS_TOKEN) and \
+        authorisation.startswith(BEARER_PREFIX) and \
+        constant_time_compare(
+            authorisation[len(BEARER_PREFIX):], settings.METRICS_TOKEN)
+    if not token_ok and not (
+            request.user.is_authenticated and request.user.is_staff):
+        raise PermissionDenied("Metrics are restricted")
+
+    text = exposition(get_registry().collect(), gauges={
+        JOBS_QUEUE_DEPTH: {
+            (('state', state),): count
+            for state, count in queue_depth().items()
+        }
+    })
+    return HttpResponse(text, content_type=METRICS_CONTENT_TYPE)
+
+
+def superuser_check(request: HttpRequest):
+    """
+    Check request is from a superuser
+    :param request: http request
+    :raises PermissionDenied if not a superuser
+    """
+    if not request.user.is_authenticated or not request.user.is_superuser:
+        raise PermissionDenied("Restricted to superusers")
+
+
+def get_profiles(request: HttpRequest) -> HttpResponse:
+    """
+    Render list of saved profiles, newest first
+    :param request: request
+    :return: response
+    """
+    superuser_check(request)
+
+    return HttpResponse(''.join([
+        f'{path.stem}\t{path.suffix[1:]}\t{path.stat().st_size}\n'
+        for path in list_profiles()
+    ]), content_type=TEXT_CONTENT_TYPE)
+
+
+def get_profile(request: HttpRequest, name: str) -> HttpResponse:
+    """
+    Render a saved profile as a text summary, or download it as a pstats
+    file or collapsed stacks if the download query parameter is present
+    :param request: request
+    :param name: name of profile
+    :return: response
+    """
+    superuser_check(request)
+
+    path = profile_path(name)
+    if path is None:
+        raise Http404(f"Profile '{name}' not found")
+
+    return FileResponse(open(path, 'rb'), as_attachment=True,
+                        filename=path.name) \
+        if DOWNLOAD_QUERY in request.GET else \
+        HttpResponse(profile_text(path), content_type=TEXT_CONTENT_TYPE)
+
+
 def add_base_context(request: HttpRequest, context: dict = None) -> dict:
     """
     Add base-specific context entries
@@ -26,10 +26,15 @@ from django.utils.translation import gettext_lazy as _
 
 
 class CategoriesConfig(AppConfig):
+    default = True
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'categories'
     verbose_name = _("Category Management")
 
+    def ready(self):
+        # Implicitly connect signal handlers decorated with @receiver.
+        from . import signals
+
 
 class StatusesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
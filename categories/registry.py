@@ -0,0 +1,227 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from threading import Lock
+from time import monotonic
+from typing import Optional, Type
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import models, transaction, DEFAULT_DB_ALIAS
+
+from .models import Category, Status
+
+REGISTRY_CHECK_INTERVAL = 30
+""" Seconds between checks of the shared cache for changes """
+REGISTRY_MAX_AGE = 600
+""" Seconds after which entries are reloaded regardless """
+
+
+class NameRegistry:
+    """
+    Process-level registry of the rows of a model with a unique name field.
+    Changes in any worker process are signalled to the others via the
+    generation number held in the default cache; a shared cache backend
+    (see CACHE_URL) is required for prompt invalidation across workers.
+    """
+    def __init__(self, model: Type[models.Model], name_field: str):
+        self.model = model
+        self.name_field = name_field
+        self._lock = Lock()
+        self._entries: Optional[dict[str, dict]] = None
+        self._names: dict[int, str] = {}
+        self._generation = None
+        self._checked = 0.0
+        self._loaded = 0.0
+
+    @property
+    def generation_key(self) -> str:
+        """ Cache key of the generation number """
+        return f'registry:{self.model._meta.label_lower}:generation'
+
+    def _current_generation(self) -> str:
+        return cache.get_or_set(
+            self.generation_key, uuid4().hex, timeout=None)
+
+    def _refresh(self, force: bool = False):
+        """
+        Ensure entries are up-to-date
+        :param force: force reload flag; default False
+        """
+        now = monotonic()
+        if not force and self._entries is not None and \
+                now - self._checked < REGISTRY_CHECK_INTERVAL:
+            return
+
+        with self._lock:
+            generation = self._current_generation()
+            if force or self._entries is None or \
+                    generation != self._generation or \
+                    now - self._loaded >= REGISTRY_MAX_AGE:
+                self._entries = {
+                    entry[self.name_field]: entry
+                    for entry in self.model.objects.values()
+                }
+                self._names = {
+                    entry[self.model._meta.pk.attname]: name
+                    for name, entry in self._entries.items()
+                }
+                self._generation = generation
+                self._loaded = now
+            self._checked = now
+
+    def load(self):
+        """ Load entries from the database """
+        self._refresh(force=True)
+
+    def invalidate(self):
+        """
+        Discard entries in all processes, following a change of rows.
+        The shared generation is only changed once the change is committed,
+        otherwise other processes may reload the old rows and cache them
+        under the new generation.
+        """
+        # this process sees its own uncommitted changes, so reload now
+        self._reset()
+        transaction.on_commit(self._new_generation)
+
+    def _new_generation(self):
+        """ Signal a change of rows to all processes """
+        cache.set(self.generation_key, uuid4().hex, timeout=None)
+        self._reset()
+
+    def _reset(self):
+        """ Reload entries on next use """
+        self._generation = None
+        self._checked = 0.0
+
+    def _entry(self, name: str) -> dict:
+        self._refresh()
+        entry = self._entries.get(name)
+        if entry is None:
+            # may have been added since last load, so reload
+            self._refresh(force=True)
+            entry = self._entries.get(name)
+            if entry is None:
+                raise self.model.DoesNotExist(
+                    f'{self.model.__name__} matching name "{name}" '
+                    f'does not exist.')
+        return entry
+
+    def id_of(self, name: str) -> int:
+        """
+        Get the id of the entry with the specified name
+        :param name: name of entry
+        :return: id
+        :raises DoesNotExist if not found
+        """
+        return self._entry(name)[self.model._meta.pk.attname]
+
+    def ids_of(self, names: list[str]) -> list[int]:
+        """
+        Get the ids of the entries with the specified names
+        :param names: names of entries
+        :return: list of ids
+        :raises DoesNotExist if any not found
+        """
+        return [self.id_of(name) for name in names]
+
+    def name_of(self, pk: int) -> str:
+        """
+        Get the name of the entry with the specified id
+        :param pk: id of entry
+        :return: name
+        :raises DoesNotExist if not found
+        """
+        self._refresh()
+        name = self._names.get(pk)
+        if name is None:
+            # may have been added since last load, so reload
+            self._refresh(force=True)
+            name = self._names.get(pk)
+            if name is None:
+                raise self.model.DoesNotExist(
+                    f'{self.model.__name__} matching id {pk} does not '
+                    f'exist.')
+        return name
+
+    def get(self, name: str) -> models.Model:
+        """
+        Get the entry with the specified name, without a database query
+        :param name: name of entry
+        :return: model instance
+        :raises DoesNotExist if not found
+        """
+        entry = self._entry(name)
+        return self.model.from_db(
+            DEFAULT_DB_ALIAS, list(entry.keys()), list(entry.values()))
+
+    def names_containing(self, term: str) -> list[str]:
+        """
+        Get the names of the entries which contain the specified term,
+        ignoring case
+        :param term: term to search for
+        :return: list of names
+        """
+        self._refresh()
+        term = term.lower()
+        return [name for name in self._entries if term in name.lower()]
+
+
+STATUS_REGISTRY = NameRegistry(Status, Status.NAME_FIELD)
+CATEGORY_REGISTRY = NameRegistry(Category, Category.NAME_FIELD)
+
+
+def status_id(name: str) -> int:
+    """
+    Get the id of a status
+    :param name: status name
+    :return: status id
+    """
+    return STATUS_REGISTRY.id_of(name)
+
+
+def get_status(name: str) -> Status:
+    """
+    Get a status
+    :param name: status name
+    :return: status
+    """
+    return STATUS_REGISTRY.get(name)
+
+
+def category_id(name: str) -> int:
+    """
+    Get the id of a category
+    :param name: category name
+    :return: category id
+    """
+    return CATEGORY_REGISTRY.id_of(name)
+
+
+def get_category(name: str) -> Category:
+    """
+    Get a category
+    :param name: category name
+    :return: category
+    """
+    return CATEGORY_REGISTRY.get(name)
@@ -0,0 +1,182 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+import tempfile
+from http import HTTPStatus
+from types import SimpleNamespace
+
+from django.test import override_settings, SimpleTestCase
+
+from django_tests.user.base_user_test_cls import BaseUserTest
+from opinions.constants import OPINIONS_ROUTE_NAME
+from soapbox import OPINIONS_APP_NAME
+from soapbox.constants import METRICS_ROUTE_NAME
+from utils import reverse_q, namespaced_url, MetricsRegistry, exposition
+from utils.metrics import (
+    REQUEST_DURATION, REQUESTS_TOTAL, histogram_quantile, METRICS
+)
+
+METRICS_TOKEN = 'metrics-token'
+
+
+def request_metrics(url_name: str, total_ms: float, status: int = 200):
+    """ Get request metrics for a request """
+    return SimpleNamespace(
+        url_name=url_name, method='GET', status=status, total_ms=total_ms,
+        sql_count=3, sql_ms=1.5, cache_hits=2, cache_misses=1)
+
+
+class TestMetricsRegistry(SimpleTestCase):
+    """
+    Test metrics registry
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    def test_histogram_quantile(self):
+        """ Test quantile estimate """
+        buckets = (1, 2, 4)
+        # 10 in each bucket including +Inf
+        self.assertEqual(histogram_quantile(0.5, buckets, [10] * 4), 2)
+        self.assertEqual(histogram_quantile(0.125, buckets, [10] * 4), 0.5)
+        self.assertEqual(histogram_quantile(0.99, buckets, [10] * 4), 4)
+        self.assertEqual(histogram_quantile(0.5, buckets, [0] * 4), 0)
+
+    def test_exposition(self):
+        """ Test Prometheus text exposition """
+        registry = MetricsRegistry()
+        for total_ms in [3, 30, 300]:
+            registry.observe_request(request_metrics('app:route', total_ms))
+
+        text = exposition(registry)
+        buckets = METRICS[REQUEST_DURATION][2]
+        for line in [
+            '# TYPE soapbox_requests_total counter',
+            'soapbox_requests_total{method="GET",route="app:route",'
+            'status="200"} 3',
+            '# TYPE soapbox_request_duration_seconds histogram',
+            'soapbox_request_duration_seconds_bucket{route="app:route",'
+            'le="0.005"} 1',
+            'soapbox_request_duration_seconds_bucket{route="app:route",'
+            'le="0.05"} 2',
+            'soapbox_request_duration_seconds_bucket{route="app:route",'
+            'le="+Inf"} 3',
+            'soapbox_request_duration_seconds_sum{route="app:route"} 0.333',
+            'soapbox_request_duration_seconds_count{route="app:route"} 3',
+            'soapbox_db_queries_total{route="app:route"} 9',
+            'soapbox_cache_hit_ratio 0.666667',
+        ]:
+            with self.subTest(line=line):
+                self.assertIn(line, text.splitlines())
+        for quantile in ['0.5', '0.95', '0.99']:
+            with self.subTest(quantile=quantile):
+                self.assertRegex(
+                    text, r'soapbox_request_duration_seconds_quantile'
+                          rf'{{route="app:route",quantile="{quantile}"}} '
+                          r'[\d.]+\n')
+        self.assertEqual(len(buckets) + 1, len([
+            line for line in text.splitlines()
+            if line.startswith('soapbox_request_duration_seconds_bucket')
+        ]))
+
+    def test_aggregation(self):
+        """ Test metrics of processes are aggregated """
+        with tempfile.TemporaryDirectory() as directory:
+            registries = [
+                MetricsRegistry(directory, process_id=str(process))
+                for process in range(2)
+            ]
+            for registry in registries:
+                registry.observe_request(request_metrics('app:route', 10))
+                registry.observe_request(request_metrics('app:route', 20))
+
+            aggregated = registries[0].collect()
+            key = (REQUESTS_TOTAL, (
+                ('method', 'GET'), ('route', 'app:route'), ('status', '200')
+            ))
+            self.assertEqual(aggregated.counters[key], 4)
+            key = (REQUEST_DURATION, (('route', 'app:route'),))
+            self.assertEqual(aggregated.histograms[key][-1], 4)
+            self.assertAlmostEqual(aggregated.histograms[key][-2], 0.06)
+
+
+class TestMetricsView(BaseUserTest):
+    """
+    Test metrics endpoint
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            METRICS_ENABLED=True, METRICS_DIR=directory.name,
+            METRICS_FLUSH_INTERVAL=0, METRICS_TOKEN=METRICS_TOKEN)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def get_metrics(self, **kwargs):
+        """ Get the metrics endpoint """
+        return self.client.get(reverse_q(METRICS_ROUTE_NAME), **kwargs)
+
+    def test_not_staff(self):
+        """ Test metrics are restricted """
+        response = self.get_metrics()
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+        user, _ = self.get_user_by_index(0)
+        self.login_user(self, user)
+        for headers in [{}, {'HTTP_AUTHORIZATION': 'Bearer wrong'}]:
+            with self.subTest(headers=headers):
+                response = self.get_metrics(**headers)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.FORBIDDEN)
+
+    def test_token(self):
+        """ Test metrics with bearer token """
+        response = self.get_metrics(
+            HTTP_AUTHORIZATION=f'Bearer {METRICS_TOKEN}')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_staff(self):
+        """ Test metrics for staff include requests """
+        user, _ = self.get_user_by_index(0)
+        user.is_staff = True
+        user.save()
+        self.login_user(self, user)
+
+        self.client.get(reverse_q(
+            namespaced_url(OPINIONS_APP_NAME, OPINIONS_ROUTE_NAME)))
+        response = self.get_metrics()
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+
+        text = response.content.decode()
+        route = f'{OPINIONS_APP_NAME}:{OPINIONS_ROUTE_NAME}'
+        self.assertIn(
+            f'soapbox_request_duration_seconds_count{{route="{route}"}} 1',
+            text)
+        self.assertIn(
+            f'soapbox_request_duration_seconds_quantile{{route="{route}",'
+            f'quantile="0.99"}}', text)
+        self.assertRegex(
+            text, rf'soapbox_db_queries_total{{route="{route}"}} [1-9]')
+        self.assertIn('soapbox_jobs_queue_depth{state="pending"} 0', text)
@@ -0,0 +1,161 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+import json
+import pickle
+import re
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.test import override_settings, RequestFactory
+
+from django_tests.user.base_user_test_cls import BaseUserTest
+from opinions.constants import OPINIONS_ROUTE_NAME
+from soapbox import OPINIONS_APP_NAME
+from utils import reverse_q, namespaced_url
+from utils.instrumentation import (
+    SERVER_TIMING_HEADER, RequestMetricsMiddleware, UNRESOLVED_URL_NAME
+)
+
+
+class DelegatingCache(LocMemCache):
+    """ Cache implementing get using get_many, like DatabaseCache """
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        # read the cache directly, as DatabaseCache reads its table
+        values = {}
+        with self._lock:
+            for key in keys:
+                cache_key = self.make_and_validate_key(key, version=version)
+                if cache_key in self._cache and \
+                        not self._has_expired(cache_key):
+                    values[key] = pickle.loads(self._cache[cache_key])
+        return values
+
+
+class TestRequestMetrics(BaseUserTest):
+    """
+    Test request metrics middleware
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    def get_opinions(self):
+        """ Get the opinion list page """
+        user, _ = self.get_user_by_index(0)
+        self.login_user(self, user)
+        return self.client.get(reverse_q(
+            namespaced_url(OPINIONS_APP_NAME, OPINIONS_ROUTE_NAME)))
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_disabled(self):
+        """ Test no metrics when sampling is disabled """
+        response = self.get_opinions()
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotIn(SERVER_TIMING_HEADER, response.headers)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1,
+                       REQUEST_METRICS_LOG=True)
+    def test_metrics(self):
+        """ Test metrics header and log line """
+        cache.clear()
+        with self.assertLogs('utils.instrumentation', level='INFO') as logs:
+            response = self.get_opinions()
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        timing = response.headers[SERVER_TIMING_HEADER]
+        for metric in ['total', 'view', 'sql', 'tpl']:
+            with self.subTest(metric=metric):
+                self.assertRegex(timing, rf'{metric};dur=\d+\.\d')
+        self.assertRegex(timing, r'sql;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+        metrics = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(metrics['url_name'],
+                         f'{OPINIONS_APP_NAME}:{OPINIONS_ROUTE_NAME}')
+        self.assertEqual(metrics['status'], HTTPStatus.OK)
+        self.assertGreater(metrics['sql_count'], 0)
+        self.assertGreater(metrics['template_ms'], 0)
+        self.assertGreaterEqual(metrics['total_ms'], metrics['view_ms'])
+        # template response is rendered within the view time
+        self.assertGreaterEqual(metrics['view_ms'], metrics['template_ms'])
+        # page functions of interest are timed
+        for span in ['footer_context', 'get_reaction_status',
+                     'get_popularity_levels']:
+            with self.subTest(span=span):
+                self.assertIn(span, metrics['spans'])
+                self.assertRegex(timing, rf'{span};dur=\d+\.\d')
+        hits, misses = re.search(
+            r'cache;desc="(\d+) hits (\d+) misses"', timing).groups()
+        self.assertEqual(
+            (int(hits), int(misses)),
+            (metrics['cache_hits'], metrics['cache_misses']))
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1,
+                       REQUEST_METRICS_LOG=True)
+    def test_cache_metrics(self):
+        """ Test cache hits and misses are counted """
+        def get_response(request):
+            cache.get('metrics-miss')
+            cache.set('metrics-hit', 1)
+            cache.get('metrics-hit')
+            cache.get_many(['metrics-hit', 'metrics-miss'])
+            return HttpResponse()
+
+        cache.clear()
+        middleware = RequestMetricsMiddleware(get_response)
+        with self.assertLogs('utils.instrumentation', level='INFO') as logs:
+            middleware(RequestFactory().get('/no/such/path/'))
+
+        metrics = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(metrics['url_name'], UNRESOLVED_URL_NAME)
+        self.assertEqual(
+            (metrics['cache_hits'], metrics['cache_misses']), (2, 2))
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1,
+                       REQUEST_METRICS_LOG=True,
+                       CACHES={**settings.CACHES, 'delegating': {
+                           'BACKEND': f'{__name__}.DelegatingCache'
+                       }})
+    def test_cache_metrics_delegating(self):
+        """ Test cache get using get_many is only counted once """
+        delegating = caches['delegating']
+
+        def get_response(request):
+            delegating.get('metrics-miss')
+            delegating.set('metrics-hit', 1)
+            delegating.get('metrics-hit')
+            delegating.get_many(['metrics-hit', 'metrics-miss'])
+            return HttpResponse()
+
+        delegating.clear()
+        middleware = RequestMetricsMiddleware(get_response)
+        with self.assertLogs('utils.instrumentation', level='INFO') as logs:
+            middleware(RequestFactory().get('/no/such/path/'))
+
+        metrics = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(
+            (metrics['cache_hits'], metrics['cache_misses']), (2, 2))
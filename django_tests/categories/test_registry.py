@@ -0,0 +1,98 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+
+from django.core.cache import cache
+from django.test import TestCase
+
+import django_tests.check_setup     # do env checks and setup
+
+from categories import STATUS_PUBLISHED, CATEGORY_UNASSIGNED
+from categories.models import Category, Status
+from categories.registry import (
+    STATUS_REGISTRY, CATEGORY_REGISTRY, status_id, get_status, category_id,
+    get_category
+)
+
+
+class TestRegistry(TestCase):
+    """
+    Test status/category registry
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    def test_registry_matches_database(self):
+        """ Test registry entries match the database """
+        for registry, model in [
+            (STATUS_REGISTRY, Status), (CATEGORY_REGISTRY, Category)
+        ]:
+            for entry in model.objects.all():
+                with self.subTest(model=model, name=entry.name):
+                    self.assertEqual(registry.id_of(entry.name), entry.id)
+                    self.assertEqual(registry.name_of(entry.id), entry.name)
+
+                    registry_entry = registry.get(entry.name)
+                    self.assertEqual(registry_entry, entry)
+                    self.assertEqual(registry_entry.name, entry.name)
+
+            with self.assertRaises(model.DoesNotExist):
+                registry.id_of('not a name')
+
+    def test_no_queries(self):
+        """ Test loaded registry does not query the database """
+        status_id(STATUS_PUBLISHED)
+        category_id(CATEGORY_UNASSIGNED)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_status(STATUS_PUBLISHED).id, status_id(STATUS_PUBLISHED))
+            self.assertEqual(
+                get_category(CATEGORY_UNASSIGNED).id,
+                category_id(CATEGORY_UNASSIGNED))
+
+    def test_invalidation(self):
+        """ Test registry is updated when entries change """
+        category = Category.objects.create(name='Registry test')
+        self.assertEqual(category_id('Registry test'), category.id)
+        self.assertIn(
+            'Registry test', CATEGORY_REGISTRY.names_containing('TRY te'))
+
+        category.name = 'Registry updated'
+        category.save()
+        self.assertEqual(category_id('Registry updated'), category.id)
+        with self.assertRaises(Category.DoesNotExist):
+            category_id('Registry test')
+
+        category.delete()
+        with self.assertRaises(Category.DoesNotExist):
+            category_id('Registry updated')
+
+    def test_generation_changed_on_commit(self):
+        """ Test shared generation only changes when changes are committed """
+        generation = CATEGORY_REGISTRY._current_generation()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Category.objects.create(name='Registry commit')
+            # not visible to other processes until commit
+            self.assertEqual(
+                cache.get(CATEGORY_REGISTRY.generation_key), generation)
+        self.assertEqual(len(callbacks), 1)
+        self.assertNotEqual(
+            cache.get(CATEGORY_REGISTRY.generation_key), generation)
@@ -0,0 +1,158 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs import STATE_PENDING, STATE_RUNNING, STATE_DONE, STATE_FAILED
+from jobs.models import Job
+from jobs.queue import (
+    job, enqueue, claim_jobs, run_pending, retry_delay, worker_id,
+    purge_done_jobs
+)
+
+RESULTS = []
+
+
+@job(name='test.record')
+def record_job(value: int):
+    """ Job recording its argument """
+    RESULTS.append(value)
+
+
+@job(name='test.fail')
+def failing_job():
+    """ Job which always fails """
+    raise ValueError('failed')
+
+
+class TestJobQueue(TestCase):
+    """
+    Test background job queue
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    def setUp(self):
+        RESULTS.clear()
+
+    @override_settings(JOBS_SYNC=True)
+    def test_sync_mode(self):
+        """ Test jobs run immediately in synchronous mode """
+        self.assertIsNone(enqueue(record_job, value=1))
+        self.assertEqual(RESULTS, [1])
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_SYNC=False)
+    def test_run_pending(self):
+        """ Test enqueued jobs are run by a worker """
+        queued = [enqueue(record_job, value=value) for value in range(3)]
+        later = enqueue('test.record', value=99,
+                        run_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(RESULTS, [])
+        for queued_job in queued + [later]:
+            self.assertEqual(queued_job.state, STATE_PENDING)
+
+        self.assertEqual(run_pending(batch=2), len(queued))
+        self.assertEqual(RESULTS, [0, 1, 2])
+        for queued_job in queued:
+            queued_job.refresh_from_db()
+            self.assertEqual(queued_job.state, STATE_DONE)
+            self.assertEqual(queued_job.attempts, 1)
+        later.refresh_from_db()
+        self.assertEqual(later.state, STATE_PENDING)
+
+        with self.assertRaises(ValueError):
+            enqueue('test.unknown')
+
+    @override_settings(JOBS_SYNC=False)
+    def test_claim(self):
+        """ Test claimed jobs are not claimed by other workers """
+        enqueue(record_job, value=1)
+        worker = worker_id()
+        claimed = claim_jobs(worker, limit=5)
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(claimed[0].state, STATE_RUNNING)
+        self.assertEqual(claimed[0].locked_by, worker)
+        self.assertEqual(claim_jobs(worker_id(), limit=5), [])
+
+    @override_settings(JOBS_SYNC=False, JOB_MAX_ATTEMPTS=2,
+                       JOB_RETRY_DELAY=10)
+    def test_retry(self):
+        """ Test failed jobs are retried with backoff """
+        failing = enqueue(failing_job)
+        start = timezone.now()
+        with self.assertLogs('jobs.queue', level='WARNING'):
+            self.assertEqual(run_pending(), 1)
+        failing.refresh_from_db()
+        self.assertEqual(failing.state, STATE_PENDING)
+        self.assertIn('ValueError', failing.last_error)
+        self.assertGreaterEqual(failing.run_at, start + retry_delay(1))
+        self.assertEqual(retry_delay(2), 2 * retry_delay(1))
+
+        # not ready to retry yet
+        self.assertEqual(run_pending(), 0)
+
+        Job.objects.update(**{Job.RUN_AT_FIELD: timezone.now()})
+        with self.assertLogs('jobs.queue', level='WARNING'):
+            self.assertEqual(run_pending(), 1)
+        failing.refresh_from_db()
+        self.assertEqual(failing.state, STATE_FAILED)
+        self.assertEqual(failing.attempts, 2)
+
+    @override_settings(JOBS_SYNC=False)
+    def test_worker_command(self):
+        """ Test worker command """
+        enqueue(record_job, value=1)
+        out = StringIO()
+        call_command('run_worker', '--once', stdout=out)
+        self.assertIn('Jobs run: 1', out.getvalue())
+        self.assertEqual(RESULTS, [1])
+
+    @override_settings(JOBS_SYNC=False, JOB_DONE_RETENTION_DAYS=7)
+    def test_purge_done_jobs(self):
+        """ Test purging of completed jobs """
+        old = timezone.now() - timedelta(days=8)
+        jobs = {
+            state: enqueue(record_job, value=1) for state in [
+                STATE_DONE, STATE_FAILED, STATE_PENDING
+            ]
+        }
+        recent = enqueue(record_job, value=2)
+        for state, queued in jobs.items():
+            Job.objects.filter(id=queued.id).update(**{
+                Job.STATE_FIELD: state, Job.UPDATED_FIELD: old
+            })
+        Job.objects.filter(id=recent.id).update(**{
+            Job.STATE_FIELD: STATE_DONE
+        })
+
+        self.assertEqual(purge_done_jobs(), 1)
+        self.assertFalse(
+            Job.objects.filter(id=jobs[STATE_DONE].id).exists())
+        self.assertEqual(
+            Job.objects.filter(id__in=[
+                jobs[STATE_FAILED].id, jobs[STATE_PENDING].id, recent.id
+            ]).count(), 3)
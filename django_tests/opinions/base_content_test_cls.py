@@ -30,10 +30,12 @@ from categories.constants import (
     STATUS_DELETED, STATUS_UNDER_REVIEW, STATUS_UNACCEPTABLE
 )
 from categories.models import Category, Status
+from categories.registry import STATUS_REGISTRY, CATEGORY_REGISTRY
 from opinions.constants import (
     OPINION_PAGINATION_ON_EACH_SIDE, OPINION_PAGINATION_ON_ENDS
 )
 from opinions.models import Opinion, Comment, HideStatus, Review
+from opinions.review_state import update_review_state
 from opinions.views.utils import generate_excerpt
 from opinions.enums import PerPage
 from user.models import User
@@ -132,6 +134,7 @@ class ContentTestBase(BaseUserTest):
                 Status.objects.get(name=status),
         }
         Review.objects.create(**kwargs)
+        update_review_state(content)
 
     @classmethod
     def create_comment(
@@ -156,6 +159,8 @@ class ContentTestBase(BaseUserTest):
             Comment.OPINION_FIELD: opinion,
             Comment.PARENT_FIELD: parent.id if parent else Comment.NO_PARENT,
             Comment.LEVEL_FIELD: parent.level + 1 if parent else 0,
+            Comment.PATH_FIELD:
+                parent.descendant_path if parent else Comment.NO_PATH,
             Comment.USER_FIELD: user,
             Comment.STATUS_FIELD: status,
         }
@@ -175,6 +180,13 @@ class ContentTestBase(BaseUserTest):
 
         return comment
 
+    def setUp(self):
+        """ Set up before each test """
+        super().setUp()
+        # load registries so they are not loaded during query count tests
+        STATUS_REGISTRY.load()
+        CATEGORY_REGISTRY.load()
+
     @classmethod
     def setUpTestData(cls):
         """ Set up data for the whole TestCase """
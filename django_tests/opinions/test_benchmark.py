@@ -0,0 +1,113 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from dataclasses import replace
+from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from opinions.benchmark import (
+    run_benchmark, compare_runs, BenchmarkRun, SCENARIO_NAMES
+)
+from opinions.models import AgreementStatus
+from opinions.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+
+class TestBenchmark(TestCase):
+    """
+    Test benchmark suite
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestBenchmark, cls).setUpTestData()
+        SyntheticDataGenerator(SyntheticConfig(
+            users=10, opinions=10, comments=100)).generate()
+
+    def test_run(self):
+        """ Test benchmark run """
+        reactions = AgreementStatus.objects.count()
+        run = run_benchmark(repeat=1, warmup=0)
+
+        self.assertEqual(list(run.results), SCENARIO_NAMES)
+        for result in run.results.values():
+            with self.subTest(scenario=result.name):
+                self.assertEqual(result.status, HTTPStatus.OK)
+                self.assertEqual(result.runs, 1)
+                self.assertGreater(result.queries, 0)
+                self.assertGreater(result.size, 0)
+        # reactions are rolled back
+        self.assertEqual(AgreementStatus.objects.count(), reactions)
+
+        self.assertEqual(
+            BenchmarkRun.from_json(run.to_json()).results, run.results)
+
+    def test_compare(self):
+        """ Test benchmark comparison """
+        baseline = run_benchmark(
+            scenarios=SCENARIO_NAMES[:1], repeat=1, warmup=0)
+        name = SCENARIO_NAMES[0]
+        result = baseline.results[name]
+
+        self.assertEqual(compare_runs(baseline, baseline), [])
+        for metric, value, threshold, regressed in [
+            ('queries', result.queries + 1, 0.2, True),
+            ('wall_ms', result.wall_ms * 1.1, 0.2, False),
+            ('wall_ms', result.wall_ms * 1.3, 0.2, True),
+            ('size', result.size * 1.3, 0.5, False),
+        ]:
+            with self.subTest(metric=metric, value=value):
+                current = BenchmarkRun(results={
+                    name: replace(result, **{metric: value})
+                })
+                regressions = compare_runs(
+                    current, baseline, threshold=threshold)
+                self.assertEqual(
+                    [regression.metric for regression in regressions],
+                    [metric] if regressed else [])
+
+    def test_command(self):
+        """ Test benchmark command """
+        with TemporaryDirectory() as folder:
+            output = Path(folder) / 'benchmark.json'
+            call_command(
+                'benchmark', scenario=[SCENARIO_NAMES[0]], repeat=1,
+                output=str(output), stdout=StringIO())
+            run = BenchmarkRun.from_json(output.read_text())
+            self.assertEqual(list(run.results), SCENARIO_NAMES[:1])
+
+            # baseline with fewer queries is a regression
+            result = run.results[SCENARIO_NAMES[0]]
+            run.results[result.name] = replace(
+                result, queries=result.queries - 1)
+            output.write_text(run.to_json())
+            with self.assertRaises(CommandError):
+                call_command(
+                    'benchmark', scenario=[SCENARIO_NAMES[0]], repeat=1,
+                    baseline=str(output), threshold=100, stdout=StringIO())
@@ -0,0 +1,320 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from http import HTTPStatus
+
+from django.test import RequestFactory
+
+from categories import STATUS_PUBLISHED
+from categories.models import Status
+from opinions.comment_data import (
+    get_comment_tree, get_comments_page, get_comment_query_args,
+    CommentBundle, fetch_page
+)
+from opinions.constants import (
+    PAGE_QUERY, COMMENT_DEPTH_QUERY, PARENT_ID_QUERY, REFERENCE_QUERY,
+    COMMENT_COMMENT_ID_ROUTE_NAME, COMMENT_ID_ROUTE_NAME,
+    COMMENT_SLUG_ROUTE_NAME
+)
+from opinions.enums import QueryArg
+from opinions.models import Comment
+from opinions.views.comment_queries import (
+    get_comment_queryset, get_route_comment_level
+)
+from opinions.views.utils import DEFAULT_COMMENT_DEPTH, query_search_term
+from soapbox import OPINIONS_APP_NAME
+from user.models import User
+from utils import reverse_q, namespaced_url
+from .base_opinion_test_cls import BaseOpinionTest
+
+REPLY_COUNT = 8     # more than PerPage.DEFAULT to get a placeholder
+CHAIN_DEPTH = 5
+
+
+def expected_comment_tree(
+    query_params: dict[str, QueryArg], user: User
+) -> list[CommentBundle]:
+    """
+    Get comment tree, level by level, for comparison
+    :param query_params: query parameters
+    :param user: current user
+    :return: list of comments (including a 'more' element if necessary)
+    """
+    comment_bundles = get_comments_page(query_params, user)
+
+    depth = QueryArg.value_arg_or_object(
+        query_params.get(COMMENT_DEPTH_QUERY, DEFAULT_COMMENT_DEPTH))
+    for bundle in comment_bundles:
+        if bundle.is_more_placeholder:
+            continue
+        sub_query_params = query_params.copy()
+        sub_query_params[PARENT_ID_QUERY] = bundle.comment.id
+        if depth > 1:
+            sub_query_params[PAGE_QUERY] = 1
+            sub_query_params[COMMENT_DEPTH_QUERY] = depth - 1
+            bundle.comments = expected_comment_tree(sub_query_params, user)
+        else:
+            sub_query_params[COMMENT_DEPTH_QUERY] = DEFAULT_COMMENT_DEPTH
+            if get_comment_queryset(sub_query_params, user).exists():
+                bundle.comment_query = query_search_term(sub_query_params)
+
+    return comment_bundles
+
+
+def bundle_tree(bundles: list[CommentBundle]) -> list[tuple]:
+    """
+    Get a comparable representation of a comment tree
+    :param bundles: comment bundles
+    :return: list of tuples
+    """
+    return [
+        (bundle.comment.id, bundle.is_more_placeholder,
+         bundle.next_page if bundle.is_more_placeholder else None,
+         bundle.comment_query, bundle_tree(bundle.comments))
+        for bundle in bundles
+    ]
+
+
+class TestCommentTree(BaseOpinionTest):
+    """
+    Test comment tree loading
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestCommentTree, cls).setUpTestData()
+
+        published = Status.objects.get(name=STATUS_PUBLISHED)
+        cls.opinion = cls.comments[0].opinion
+        user = cls.get_other_user(cls.opinion.user)
+
+        # add a page and a bit of replies on the first comment
+        days = len(cls.comments)
+        root = cls.comments[0]
+        for index in range(REPLY_COUNT):
+            cls.comments.append(
+                cls.create_comment(
+                    index + 2000, user, cls.opinion, published,
+                    days=days + index, parent=root))
+
+        # and a chain of replies on the last reply
+        parent = cls.comments[-1]
+        for index in range(CHAIN_DEPTH):
+            parent = cls.create_comment(
+                index + 3000, user, cls.opinion, published,
+                days=days + REPLY_COUNT + index, parent=parent)
+            cls.comments.append(parent)
+
+    def test_comment_path(self):
+        """ Test comment path matches parent hierarchy """
+        comments = {comment.id: comment for comment in Comment.objects.all()}
+        for comment in comments.values():
+            with self.subTest(comment=comment):
+                ancestors = []
+                parent = comment.parent
+                while parent != Comment.NO_PARENT:
+                    ancestors.insert(0, parent)
+                    parent = comments[parent].parent
+                self.assertEqual(comment.ancestor_ids, ancestors)
+                self.assertEqual(len(ancestors), comment.level)
+
+                self.assertEqual(
+                    sorted(
+                        Comment.objects.filter(**{
+                            f'{Comment.PATH_FIELD}__startswith':
+                                comment.descendant_path
+                        }).values_list(Comment.id_field(), flat=True)),
+                    sorted([
+                        cmt.id for cmt in comments.values()
+                        if comment.id in cmt.ancestor_ids
+                    ])
+                )
+
+    def test_comment_tree(self):
+        """ Test comment tree matches level by level loading """
+        user, _ = self.get_user_by_index(0)
+        for depth in range(1, CHAIN_DEPTH + 3):
+            for page in [1, 2]:
+                with self.subTest(depth=depth, page=page):
+                    query_args = get_comment_query_args(
+                        opinion=self.opinion, depth=depth, page=page)
+                    self.assertEqual(
+                        bundle_tree(get_comment_tree(query_args, user)),
+                        bundle_tree(expected_comment_tree(query_args, user))
+                    )
+
+        # subtree of a comment
+        root = self.comments[0]
+        query_args = get_comment_query_args(
+            opinion=self.opinion, parent=root, depth=CHAIN_DEPTH)
+        tree = get_comment_tree(query_args, user)
+        self.assertTrue(tree[-1].is_more_placeholder)
+        self.assertEqual(
+            bundle_tree(tree),
+            bundle_tree(expected_comment_tree(query_args, user))
+        )
+
+    def test_comment_tree_query_count(self):
+        """ Test comment tree query count is independent of depth """
+        user, _ = self.get_user_by_index(0)
+        root = self.comments[0]
+        for depth in range(1, CHAIN_DEPTH + 3):
+            with self.subTest(depth=depth):
+                query_args = get_comment_query_args(
+                    opinion=self.opinion, parent=root, depth=depth)
+                # page of first level, subtree
+                with self.assertNumQueries(2):
+                    get_comment_tree(query_args, user)
+
+    def test_fetch_page(self):
+        """ Test fetching a page with the first item of the next page """
+        per_page = 3
+        for count in range(0, 3 * per_page + 1):
+            items = list(range(count))
+            for page in range(1, 4):
+                start = per_page * (page - 1)
+                with self.subTest(count=count, page=page):
+                    self.assertEqual(
+                        fetch_page(items, page, per_page),
+                        items[start:start + per_page + 1])
+
+        # comments page queries
+        root = self.comments[0]
+        replies = Comment.objects.filter(**{
+            f'{Comment.PARENT_FIELD}': root.id
+        }).order_by(Comment.id_field())
+        with self.assertNumQueries(1):
+            page = fetch_page(replies, 1, per_page)
+        self.assertEqual(page, list(replies[:per_page + 1]))
+
+    def test_comment_create_path(self):
+        """ Test comment on comment path and display offset """
+        root = self.comments[0]
+        parent = Comment.objects.filter(**{
+            f'{Comment.PARENT_FIELD}': root.id
+        }).last()
+        user = TestCommentTree.get_other_user(parent.user)
+        TestCommentTree.login_user(self, user)
+        response = self.client.post(
+            reverse_q(
+                namespaced_url(
+                    OPINIONS_APP_NAME, COMMENT_COMMENT_ID_ROUTE_NAME),
+                args=[parent.id],
+                query_kwargs={
+                    REFERENCE_QUERY: reverse_q(
+                        namespaced_url(
+                            OPINIONS_APP_NAME, COMMENT_ID_ROUTE_NAME),
+                        args=[root.id])
+                }),
+            data={
+                Comment.CONTENT_FIELD: 'Path test reply'
+            })
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        reply = Comment.objects.filter(**{
+            f'{Comment.PARENT_FIELD}': parent.id,
+            f'{Comment.USER_FIELD}': user
+        }).last()
+        self.assertEqual(reply.path, parent.descendant_path)
+        self.assertEqual(reply.ancestor_ids, [root.id, parent.id])
+        self.assertEqual(reply.level, parent.level + 1)
+
+    def test_comment_create_max_level(self):
+        """ Test replies beyond the maximum level are flattened """
+        root = self.comments[0]
+        parent = Comment.objects.filter(**{
+            f'{Comment.PARENT_FIELD}': root.id
+        }).last()
+        # comment at maximum level, with a full path ending with parent
+        deepest = Comment.objects.get(pk=parent.pk)
+        deepest.pk = None
+        deepest.set_slug('Deepest reply')
+        deepest.level = Comment.MAX_LEVEL
+        deepest.parent = parent.id
+        deepest.path = \
+            Comment.path_segment(root.id) * (Comment.MAX_LEVEL - 1) + \
+            Comment.path_segment(parent.id)
+        deepest.save()
+
+        user = TestCommentTree.get_other_user(deepest.user)
+        TestCommentTree.login_user(self, user)
+        response = self.client.post(
+            reverse_q(
+                namespaced_url(
+                    OPINIONS_APP_NAME, COMMENT_COMMENT_ID_ROUTE_NAME),
+                args=[deepest.id],
+                query_kwargs={
+                    REFERENCE_QUERY: reverse_q(
+                        namespaced_url(
+                            OPINIONS_APP_NAME, COMMENT_ID_ROUTE_NAME),
+                        args=[root.id])
+                }),
+            data={
+                Comment.CONTENT_FIELD: 'Max level reply'
+            })
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        reply = Comment.objects.filter(**{
+            f'{Comment.CONTENT_FIELD}': 'Max level reply'
+        }).get()
+        self.assertEqual(reply.level, Comment.MAX_LEVEL)
+        self.assertEqual(reply.parent, parent.id)
+        self.assertEqual(reply.path, deepest.path)
+        self.assertLessEqual(
+            len(reply.path), Comment.COMMENT_ATTRIB_PATH_MAX_LEN)
+
+    def test_route_comment_level(self):
+        """ Test level of comment specified by the request """
+        root = self.comments[0]
+        # reference url is lowercased when resolved, so use lowercase slug
+        root.slug = root.slug.lower()
+        root.save()
+        reply = Comment.objects.filter(**{
+            f'{Comment.LEVEL_FIELD}': CHAIN_DEPTH
+        }).last()
+
+        def route_request(route: str, arg):
+            return RequestFactory().get('/', data={
+                REFERENCE_QUERY: reverse_q(
+                    namespaced_url(OPINIONS_APP_NAME, route), args=[arg])
+            })
+
+        # level from the reply's path
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_route_comment_level(
+                    route_request(COMMENT_ID_ROUTE_NAME, root.id), [reply]),
+                (root.id, root.level))
+
+        # level from the database
+        for route, arg in [
+            (COMMENT_ID_ROUTE_NAME, root.id),
+            (COMMENT_SLUG_ROUTE_NAME, root.slug),
+        ]:
+            with self.subTest(route=route):
+                with self.assertNumQueries(1):
+                    self.assertEqual(
+                        get_route_comment_level(
+                            route_request(route, arg), []),
+                        (root.id, root.level))
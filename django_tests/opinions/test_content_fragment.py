@@ -0,0 +1,197 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from http import HTTPStatus
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test.utils import CaptureQueriesContext
+
+from categories import STATUS_PUBLISHED
+from opinions.constants import OPINIONS_ROUTE_NAME
+from opinions.models import Opinion
+from opinions.templatetags.content_fragment import fragment_key
+from soapbox import OPINIONS_APP_NAME
+from utils import reverse_q, namespaced_url
+from .base_opinion_test_cls import BaseOpinionTest
+from ..user.base_user_test_cls import BaseUserTest
+
+FRAGMENT_TEMPLATE = Template(
+    "{% load content_fragment %}"
+    "{% content_fragment 'test-title' opinion review_no_show %}"
+    "{% if review_no_show %}under review"
+    "{% else %}{{ opinion.title }}{% endif %}"
+    "{% endcontent_fragment %}"
+)
+SLOT_TEMPLATE = Template(
+    "{% load content_fragment %}"
+    "{% content_fragment 'test-slot' opinion %}"
+    "{{ opinion.title }}|{% fragment_var user %}|"
+    "{% fragment_slot %}{% if mine %}mine{% endif %}{% endfragment_slot %}"
+    "{% endcontent_fragment %}"
+)
+
+
+class TestContentFragment(BaseOpinionTest):
+    """
+    Test content fragment cache
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestContentFragment, cls).setUpTestData()
+
+    @staticmethod
+    def render(opinion: Opinion, review_no_show: bool = False) -> str:
+        """
+        Render the test fragment
+        :param opinion: opinion
+        :param review_no_show: review state
+        :return: rendered html
+        """
+        return FRAGMENT_TEMPLATE.render(Context({
+            'opinion': opinion,
+            'review_no_show': review_no_show,
+        }))
+
+    def test_fragment_key(self):
+        """ Test fragment keys are versioned """
+        opinion = Opinion.objects.get(pk=self.opinions[0].id)
+        key = fragment_key('test', opinion, False)
+        self.assertEqual(key, fragment_key('test', opinion, False))
+        self.assertNotEqual(key, fragment_key('test', opinion, True))
+        self.assertNotEqual(key, fragment_key('other', opinion, False))
+
+        other = Opinion.objects.get(pk=self.opinions[1].id)
+        self.assertNotEqual(key, fragment_key('test', other, False))
+
+    def test_fragment_cache(self):
+        """ Test fragments are rendered once per version """
+        opinion = Opinion.objects.get(pk=self.opinions[0].id)
+        original = opinion.title
+        self.assertEqual(self.render(opinion), original)
+
+        # unsaved change, cached fragment returned
+        opinion.title = f'{original} changed'
+        self.assertEqual(self.render(opinion), original)
+
+        # review state varies the fragment
+        self.assertEqual(self.render(opinion, True), 'under review')
+
+        # save bumps updated, invalidating the fragment
+        opinion.save()
+        self.assertEqual(self.render(opinion), opinion.title)
+        self.assertNotEqual(opinion.title, original)
+
+    def test_fragment_slots(self):
+        """ Test fragment slots are rendered on every render """
+        opinion = Opinion.objects.get(pk=self.opinions[0].id)
+        original = opinion.title
+
+        def render(**kwargs):
+            return SLOT_TEMPLATE.render(Context({
+                'opinion': opinion, **kwargs
+            }))
+
+        self.assertEqual(
+            render(user='first', mine=True), f'{original}|first|mine')
+
+        # unsaved change, cached fragment returned with current slots
+        opinion.title = f'{original} changed'
+        self.assertEqual(
+            render(user='second', mine=False), f'{original}|second|')
+
+    def get_opinion_list(self) -> HttpResponse:
+        """
+        Get the opinion list
+        :return: response
+        """
+        return self.client.get(
+            reverse_q(namespaced_url(OPINIONS_APP_NAME, OPINIONS_ROUTE_NAME)))
+
+    def test_opinion_list_cache_use(self):
+        """ Test opinion list cache round-trips and queries per page """
+        opinion = self.opinions[0]
+        BaseUserTest.login_user_by_id(self, opinion.user.id)
+        cache.clear()
+
+        with mock.patch(
+                'opinions.templatetags.content_fragment.cache',
+                wraps=cache) as mock_cache:
+            response = self.get_opinion_list()
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            cards = len(response.context['opinion_list'])
+            self.assertGreater(cards, 0)
+            # one get per card, and a set for each rendered card
+            self.assertEqual(mock_cache.get.call_count, cards)
+            self.assertEqual(mock_cache.set.call_count, cards)
+
+            # no cache writes once cards are cached
+            mock_cache.reset_mock()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.get_opinion_list()
+            self.assertEqual(mock_cache.get.call_count, cards)
+            self.assertEqual(mock_cache.set.call_count, 0)
+            # slots filled, and ids rendered for cached cards
+            self.assertNotContains(response, '\x00')
+            for card in response.context['opinion_list']:
+                self.assertContains(response, f'id="id--title-{card.id}"')
+
+            # queries per page are constant, not dependent on card rendering
+            with self.assertNumQueries(len(queries)):
+                self.get_opinion_list()
+
+    def test_opinion_list_user_slots(self):
+        """ Test cached opinion cards render user dependent slots """
+        cache.clear()
+        user = self.opinions[0].user
+        BaseUserTest.login_user_by_id(self, user.id)
+        response = self.get_opinion_list()
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        # opinion by user which is also visible to other users
+        opinion = [
+            op for op in response.context['opinion_list']
+            if op.user_id == user.id and op.status == STATUS_PUBLISHED
+        ][0]
+        edit = f'aria-label="edit {opinion.title}"'
+        self.assertContains(response, edit)
+
+        other = [
+            usr for usr in self.users.values() if usr.id != user.id
+        ][0]
+        BaseUserTest.login_user_by_id(self, other.id)
+        with mock.patch(
+                'opinions.templatetags.content_fragment.cache',
+                wraps=cache) as mock_cache:
+            response = self.get_opinion_list()
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn(opinion.id, [
+            op.id for op in response.context['opinion_list']
+        ])
+        self.assertNotContains(response, edit)
+        # cached card used for the other user
+        mock_cache.set.assert_not_called()
@@ -0,0 +1,142 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from categories import STATUS_PUBLISHED, REACTION_AGREE
+from categories.models import Status
+from opinions.models import (
+    Opinion, Comment, AgreementStatus, PinStatus, FollowStatus
+)
+from opinions.queries import content_status_check, content_status_check_bulk
+from opinions.reactions import (
+    get_reaction_status, OPINION_REACTIONS_LIST, ReactionsList
+)
+from opinions.templatetags.reaction_button_id import reaction_button_id
+from user.queries import is_moderator
+from .base_opinion_test_cls import BaseOpinionTest
+
+
+class TestContentStatus(BaseOpinionTest):
+    """
+    Test content status resolution
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestContentStatus, cls).setUpTestData()
+
+    def test_bulk_matches_single(self):
+        """ Test bulk status resolution matches single item resolution """
+        for user_idx in range(self.num_users()):
+            user, _ = self.get_user_by_index(user_idx)
+            for model, content in [
+                (Opinion, self.opinions), (Comment, self.comments)
+            ]:
+                with self.subTest(user=user.username, model=model):
+                    statuses = content_status_check_bulk(
+                        model, [item.id for item in content],
+                        current_user=user)
+                    self.assertEqual(len(statuses), len(content))
+                    for item in content:
+                        self.assertEqual(
+                            statuses[item.id],
+                            content_status_check(item, current_user=user),
+                            f'{item}')
+
+    def test_bulk_query_count(self):
+        """ Test bulk status resolution uses a fixed number of queries """
+        user, _ = self.get_user_by_index(0)
+        # user's groups are only loaded once, so load them beforehand
+        is_moderator(user)
+        for count in [1, len(self.opinions)]:
+            with self.subTest(count=count):
+                # review state is cached on content, so only content and
+                # hide status are queried for a non-moderator
+                with self.assertNumQueries(2):
+                    content_status_check_bulk(
+                        Opinion,
+                        [item.id for item in self.opinions[:count]],
+                        current_user=user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                content_status_check_bulk(Opinion, [], current_user=user),
+                {})
+
+    def test_reaction_status(self):
+        """ Test reaction status of a list of content """
+        user, _ = self.get_user_by_index(0)
+        opinions = [
+            opinion for opinion in self.opinions
+            if opinion.status.name == STATUS_PUBLISHED and
+            opinion.user != user
+        ][:3]
+        AgreementStatus.objects.create(**{
+            AgreementStatus.OPINION_FIELD: opinions[0],
+            AgreementStatus.USER_FIELD: user,
+            AgreementStatus.STATUS_FIELD:
+                Status.objects.get(name=REACTION_AGREE)
+        })
+        PinStatus.objects.create(**{
+            PinStatus.OPINION_FIELD: opinions[1],
+            PinStatus.USER_FIELD: user
+        })
+        FollowStatus.objects.create(**{
+            FollowStatus.AUTHOR_FIELD: opinions[2].user,
+            FollowStatus.USER_FIELD: user
+        })
+
+        ctrls = get_reaction_status(user, opinions)
+
+        for reaction, opinion in [
+            (OPINION_REACTIONS_LIST.agree, opinions[0]),
+            (OPINION_REACTIONS_LIST.unpin, opinions[1]),
+            (OPINION_REACTIONS_LIST.unfollow, opinions[2]),
+        ]:
+            with self.subTest(reaction=reaction.field):
+                self.assertTrue(
+                    ctrls[reaction_button_id(reaction, opinion.id)].selected)
+        self.assertFalse(
+            ctrls[reaction_button_id(
+                OPINION_REACTIONS_LIST.disagree, opinions[0].id)].selected)
+        self.assertFalse(
+            ctrls[reaction_button_id(
+                OPINION_REACTIONS_LIST.agree, opinions[1].id)].selected)
+
+    def test_reaction_status_query_count(self):
+        """ Test reaction status uses a fixed number of queries """
+        user, _ = self.get_user_by_index(0)
+        for count in [1, len(self.comments)]:
+            opinions = list(Opinion.objects.all()[:count])
+            comments = list(Comment.objects.all()[:count])
+            with self.subTest(count=count):
+                # opinion, agreement, pin, follow, hide & review queries
+                with self.assertNumQueries(6):
+                    get_reaction_status(user, opinions)
+                # comment, agreement, follow, hide & review queries
+                with self.assertNumQueries(5):
+                    get_reaction_status(user, comments)
+                # opinion & pin queries
+                with self.assertNumQueries(2):
+                    get_reaction_status(
+                        user, opinions, reactions=ReactionsList.PIN_FIELDS)
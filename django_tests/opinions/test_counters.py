@@ -0,0 +1,209 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+
+from categories.constants import STATUS_DELETED
+from opinions.constants import (
+    STATUS_QUERY, OPINION_LIKE_ID_ROUTE_NAME, OPINION_PIN_ID_ROUTE_NAME,
+    OPINION_HIDE_ID_ROUTE_NAME, COMMENT_COMMENT_ID_ROUTE_NAME,
+    OPINION_ID_ROUTE_NAME, REFERENCE_QUERY
+)
+from opinions.counters import reconcile_counters
+from opinions.enums import ReactionStatus
+from opinions.models import Opinion, Comment
+from soapbox import OPINIONS_APP_NAME
+from utils import reverse_q, namespaced_url
+from .base_opinion_test_cls import BaseOpinionTest
+from .opinion_mixin_test_cls import OpinionMixin, AccessBy
+
+
+class TestCounters(OpinionMixin, BaseOpinionTest):
+    """
+    Test denormalised content counters
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestCounters, cls).setUpTestData()
+
+    def reconcile_all(self, fix: bool = True) -> dict:
+        """ Reconcile all counters """
+        return {
+            model: reconcile_counters(
+                model, list(model.objects.values_list('id', flat=True)),
+                fix=fix)
+            for model in [Opinion, Comment]
+        }
+
+    def test_reconcile_counters(self):
+        """ Test reconciling counters """
+        # test data is created directly so counters are not maintained
+        drift = self.reconcile_all()
+        self.assertTrue(len(drift[Opinion]) > 0)
+        self.assertTrue(len(drift[Comment]) > 0)
+
+        drift = self.reconcile_all()
+        self.assertEqual(drift, {Opinion: {}, Comment: {}})
+
+        for opinion in self.hidden_opinions:
+            with self.subTest(opinion=opinion):
+                opinion.refresh_from_db()
+                self.assertEqual(opinion.hide_count, 1)
+        for comment in self.comments:
+            with self.subTest(comment=comment):
+                comment.refresh_from_db()
+                self.assertEqual(
+                    comment.reply_count,
+                    Comment.objects.filter(parent=comment.id).exclude(
+                        status__name=STATUS_DELETED).count()
+                )
+                opinion = Opinion.objects.get(pk=comment.opinion.id)
+                self.assertEqual(
+                    opinion.comment_count,
+                    Comment.objects.filter(opinion=opinion).exclude(
+                        status__name=STATUS_DELETED).count()
+                )
+
+    def test_reconcile_command(self):
+        """ Test reconcile counters command """
+        out = StringIO()
+        call_command('reconcile_counters', '--dry-run', stdout=out)
+        self.assertIn('with drift', out.getvalue())
+        # dry run doesn't update
+        self.assertNotEqual(self.reconcile_all(fix=False)[Opinion], {})
+
+        out = StringIO()
+        call_command('reconcile_counters', '--batch-size', '7', stdout=out)
+        self.assertIn('fixed', out.getvalue())
+
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn(
+            f'{Opinion.model_name_caps()}: {len(self.opinions)} checked, '
+            f'0 with drift', out.getvalue())
+
+    def patch_reaction(self, opinion: Opinion, route: str,
+                       reaction: ReactionStatus):
+        """ Send a reaction patch request """
+        url = reverse_q(
+            namespaced_url(OPINIONS_APP_NAME, route),
+            args=[opinion.id],
+            query_kwargs={
+                STATUS_QUERY: reaction.arg
+            })
+        return self.client.patch(url)
+
+    def test_reaction_counters(self):
+        """ Test counters are maintained by reactions """
+        self.reconcile_all()
+
+        opinion = self.published_opinions()[0]
+        TestCounters.login_user(
+            self, TestCounters.get_other_user(opinion.user))
+        opinion.refresh_from_db()
+        start = {
+            field: getattr(opinion, field) for field in Opinion.COUNTER_FIELDS
+        }
+
+        for route, reaction, field, delta in [
+            (OPINION_LIKE_ID_ROUTE_NAME, ReactionStatus.AGREE,
+             Opinion.AGREE_COUNT_FIELD, 1),
+            # change agree to disagree
+            (OPINION_LIKE_ID_ROUTE_NAME, ReactionStatus.DISAGREE,
+             Opinion.DISAGREE_COUNT_FIELD, 1),
+            # toggle disagree off
+            (OPINION_LIKE_ID_ROUTE_NAME, ReactionStatus.DISAGREE,
+             Opinion.DISAGREE_COUNT_FIELD, 0),
+            (OPINION_PIN_ID_ROUTE_NAME, ReactionStatus.PIN,
+             Opinion.PIN_COUNT_FIELD, 1),
+            # no change if already pinned
+            (OPINION_PIN_ID_ROUTE_NAME, ReactionStatus.PIN,
+             Opinion.PIN_COUNT_FIELD, 1),
+            (OPINION_PIN_ID_ROUTE_NAME, ReactionStatus.UNPIN,
+             Opinion.PIN_COUNT_FIELD, 0),
+            (OPINION_HIDE_ID_ROUTE_NAME, ReactionStatus.HIDE,
+             Opinion.HIDE_COUNT_FIELD, 1),
+            (OPINION_HIDE_ID_ROUTE_NAME, ReactionStatus.SHOW,
+             Opinion.HIDE_COUNT_FIELD, 0),
+        ]:
+            with self.subTest(reaction=reaction, field=field):
+                self.patch_reaction(opinion, route, reaction)
+                opinion.refresh_from_db()
+                self.assertEqual(
+                    getattr(opinion, field), start[field] + delta)
+                if reaction == ReactionStatus.DISAGREE:
+                    self.assertEqual(
+                        opinion.agree_count,
+                        start[Opinion.AGREE_COUNT_FIELD])
+
+        self.assertEqual(self.reconcile_all(fix=False)[Opinion], {})
+
+    def test_comment_counters(self):
+        """ Test counters are maintained by comment create/delete """
+        self.reconcile_all()
+
+        parent = self.comments[0]
+        opinion = Opinion.objects.get(pk=parent.opinion.id)
+        start_comments = opinion.comment_count
+        parent.refresh_from_db()
+        start_replies = parent.reply_count
+
+        user = TestCounters.get_other_user(parent.user)
+        TestCounters.login_user(self, user)
+        response = self.client.post(
+            reverse_q(
+                namespaced_url(
+                    OPINIONS_APP_NAME, COMMENT_COMMENT_ID_ROUTE_NAME),
+                args=[parent.id],
+                query_kwargs={
+                    REFERENCE_QUERY: reverse_q(
+                        namespaced_url(
+                            OPINIONS_APP_NAME, OPINION_ID_ROUTE_NAME),
+                        args=[opinion.id])
+                }),
+            data={
+                Comment.CONTENT_FIELD: 'Counter test reply'
+            })
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        opinion.refresh_from_db()
+        parent.refresh_from_db()
+        self.assertEqual(opinion.comment_count, start_comments + 1)
+        self.assertEqual(parent.reply_count, start_replies + 1)
+
+        reply = Comment.objects.filter(parent=parent.id, user=user).last()
+        response = self.delete_comment_by(reply.id, AccessBy.BY_ID)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        opinion.refresh_from_db()
+        parent.refresh_from_db()
+        self.assertEqual(opinion.comment_count, start_comments)
+        self.assertEqual(parent.reply_count, start_replies)
+
+        self.assertEqual(
+            self.reconcile_all(fix=False), {Opinion: {}, Comment: {}})
@@ -0,0 +1,52 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from io import StringIO
+
+from django.core.management import call_command
+
+from opinions.models import Comment, FeedEntry
+from .base_opinion_test_cls import BaseOpinionTest
+
+
+class TestExplainQueries(BaseOpinionTest):
+    """
+    Test hot path query plans
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestExplainQueries, cls).setUpTestData()
+
+    def test_explain_queries(self):
+        """ Test the hot path queries use the declared indexes """
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        output = out.getvalue()
+
+        for model in [Comment, FeedEntry]:
+            with self.subTest(model=model):
+                self.assertTrue(any(
+                    index.name in output for index in model._meta.indexes
+                ))
@@ -0,0 +1,190 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from categories import STATUS_DRAFT, STATUS_PUBLISHED
+from categories.registry import get_status
+from opinions.models import Opinion, Review, FollowStatus, FeedEntry
+from opinions.queries import followed_author_publications, IN_REVIEW_STATUSES
+from user.models import User
+from .base_opinion_test_cls import BaseOpinionTest
+
+
+class TestFeeds(BaseOpinionTest):
+    """
+    Test following feed store
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestFeeds, cls).setUpTestData()
+
+    def feed_ids(self, user: User) -> set[int]:
+        """
+        Get the ids of the opinions in a user's feed
+        :param user: user
+        :return: set of opinion ids
+        """
+        return set(
+            followed_author_publications(user).values_list(
+                Opinion.id_field(), flat=True)
+        )
+
+    def expected_ids(self, author: User) -> set[int]:
+        """
+        Get the ids of the opinions by an author which should be in feeds
+        :param author: author
+        :return: set of opinion ids
+        """
+        in_review = set(
+            Review.objects.filter(**{
+                Review.IS_CURRENT_FIELD: True,
+                f'{Review.STATUS_FIELD}__name__in': IN_REVIEW_STATUSES
+            }).values_list(Review.OPINION_FIELD, flat=True)
+        )
+        return set(
+            op.id for op in Opinion.objects.filter(**{
+                Opinion.USER_FIELD: author,
+                f'{Opinion.STATUS_FIELD}__name': STATUS_PUBLISHED
+            }) if op.id not in in_review
+        )
+
+    def get_author_follower(self) -> tuple[User, User]:
+        """
+        Get an author with opinions in feeds, and another user
+        :return: tuple of author and follower
+        """
+        author = next(filter(
+            lambda user: len(self.expected_ids(user)) > 1,
+            [opinion.user for opinion in self.published_opinions()]
+        ))
+        return author, self.get_other_user(author)
+
+    @staticmethod
+    def follow(user: User, author: User):
+        """ Follow author """
+        FollowStatus.objects.create(**{
+            FollowStatus.AUTHOR_FIELD: author,
+            FollowStatus.USER_FIELD: user
+        })
+
+    @staticmethod
+    def unfollow(user: User, author: User):
+        """ Unfollow author """
+        FollowStatus.objects.filter(**{
+            FollowStatus.AUTHOR_FIELD: author,
+            FollowStatus.USER_FIELD: user
+        }).delete()
+
+    def test_follow_unfollow(self):
+        """ Test feed on follow and unfollow """
+        author, follower = self.get_author_follower()
+        self.unfollow(follower, author)
+        self.assertFalse(self.feed_ids(follower) & self.expected_ids(author))
+
+        self.follow(follower, author)
+        self.assertTrue(
+            self.expected_ids(author) <= self.feed_ids(follower))
+
+        self.unfollow(follower, author)
+        self.assertFalse(self.feed_ids(follower) & self.expected_ids(author))
+
+    def test_publish_unpublish(self):
+        """ Test feed on publish and unpublish """
+        author, follower = self.get_author_follower()
+        self.follow(follower, author)
+
+        opinion = Opinion.objects.get(pk=min(self.expected_ids(author)))
+        # feeds are updated in the background once committed
+        with self.captureOnCommitCallbacks(execute=True):
+            opinion.status = get_status(STATUS_DRAFT)
+            opinion.save()
+        self.assertNotIn(opinion.id, self.feed_ids(follower))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            opinion.status = get_status(STATUS_PUBLISHED)
+            opinion.save()
+        self.assertIn(opinion.id, self.feed_ids(follower))
+
+        # other changes do not update feeds
+        with self.captureOnCommitCallbacks() as callbacks:
+            opinion.title = f'{opinion.title} edited'
+            opinion.save()
+        self.assertEqual(len(callbacks), 0)
+
+        # re-publish refreshes the published date of existing entries
+        with self.captureOnCommitCallbacks(execute=True):
+            opinion.published = opinion.published + timedelta(days=1)
+            opinion.save()
+        self.assertEqual(
+            set(FeedEntry.objects.filter(**{
+                FeedEntry.OPINION_FIELD: opinion
+            }).values_list(FeedEntry.PUBLISHED_FIELD, flat=True)),
+            {opinion.published})
+
+        # review in progress removes from feed
+        with self.captureOnCommitCallbacks(execute=True):
+            self.report_content(opinion, follower)
+        self.assertNotIn(opinion.id, self.feed_ids(follower))
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_fan_out_on_read(self):
+        """ Test feed for authors with many followers """
+        author, follower = self.get_author_follower()
+        self.follow(follower, author)
+        self.assertTrue(
+            self.expected_ids(author) <= self.feed_ids(follower))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            opinion = self.create_opinion(
+                len(self.opinions), author, get_status(STATUS_PUBLISHED), [])
+        entries = FeedEntry.objects.filter(**{
+            FeedEntry.OPINION_FIELD: opinion
+        })
+        self.assertEqual(entries.count(), 1)
+        self.assertIsNone(entries.first().user)
+        self.assertIn(opinion.id, self.feed_ids(follower))
+
+        other = self.get_other_user(follower)
+        if other == author:
+            other = self.get_other_user(author)
+        self.unfollow(other, author)
+        self.assertNotIn(opinion.id, self.feed_ids(other))
+
+    def test_backfill_command(self):
+        """ Test feed backfill command """
+        author, follower = self.get_author_follower()
+        self.follow(follower, author)
+        FeedEntry.objects.all().delete()
+        self.assertFalse(self.feed_ids(follower))
+
+        call_command('backfill_feeds', stdout=StringIO())
+        self.assertEqual(
+            self.feed_ids(follower) & self.expected_ids(author),
+            self.expected_ids(author))
@@ -0,0 +1,169 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from http import HTTPStatus
+
+from bs4 import BeautifulSoup
+
+from base.constants import ALL_FEED_ROUTE_NAME
+from opinions.constants import (
+    ORDER_QUERY, PER_PAGE_QUERY, CURSOR_QUERY, OPINION_LIST_CTX,
+    CURSOR_PAGINATION_CTX
+)
+from opinions.enums import OpinionSortOrder, QueryArg, PerPage
+from opinions.models import Opinion
+from opinions.views.opinion_list import OpinionList
+from soapbox import BASE_APP_NAME
+from utils import reverse_q, namespaced_url
+from utils.pagination import KeysetPaginator
+from .base_opinion_test_cls import BaseOpinionTest
+from ..user.base_user_test_cls import BaseUserTest
+
+PER_PAGE = 4
+
+
+def view_ordering(order: OpinionSortOrder) -> tuple:
+    """
+    Get the ordering applied by a list view
+    :param order: sort order
+    :return: ordering
+    """
+    view = OpinionList()
+    view.queryset = Opinion.objects.all()
+    view.set_ordering({
+        ORDER_QUERY: QueryArg(order, True)
+    })
+    return view.get_ordering()
+
+
+class TestKeysetPagination(BaseOpinionTest):
+    """
+    Test keyset pagination
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestKeysetPagination, cls).setUpTestData()
+
+    def test_pages(self):
+        """ Test following next and previous cursors """
+        for order in list(OpinionSortOrder):
+            ordering = view_ordering(order)
+            expected = list(
+                Opinion.objects.order_by(*ordering).values_list(
+                    Opinion.id_field(), flat=True)
+            )
+            paginator = KeysetPaginator(
+                Opinion.objects.all(), ordering, PER_PAGE)
+
+            with self.subTest(order=order):
+                pages = [paginator.page(approx_total=True)]
+                self.assertFalse(pages[0].has_previous)
+                self.assertEqual(pages[0].approx_total, len(expected))
+                self.assertTrue(pages[0].total_is_exact)
+                while pages[-1].has_next:
+                    pages.append(paginator.page(pages[-1].next_cursor))
+                self.assertEqual(
+                    [op.id for page in pages for op in page], expected)
+                self.assertEqual(
+                    len(pages), (len(expected) + PER_PAGE - 1) // PER_PAGE)
+
+                # and back again
+                page = pages[-1]
+                for previous in reversed(pages[:-1]):
+                    self.assertTrue(page.has_previous)
+                    page = paginator.page(page.previous_cursor)
+                    self.assertEqual(
+                        [op.id for op in page], [op.id for op in previous])
+                    self.assertTrue(page.has_next)
+                self.assertFalse(page.has_previous)
+
+    def test_invalid_cursor(self):
+        """ Test invalid cursors get the first page """
+        ordering = view_ordering(OpinionSortOrder.NEWEST)
+        paginator = KeysetPaginator(
+            Opinion.objects.all(), ordering, PER_PAGE)
+        first = [op.id for op in paginator.page()]
+        second_cursor = paginator.page().next_cursor
+
+        # cursor for a different ordering
+        other = KeysetPaginator(
+            Opinion.objects.all(), view_ordering(OpinionSortOrder.TITLE_AZ),
+            PER_PAGE)
+
+        for cursor in ['not-a-cursor', second_cursor[:-2],
+                       other.page().next_cursor]:
+            with self.subTest(cursor=cursor):
+                self.assertEqual(
+                    [op.id for op in paginator.page(cursor)], first)
+
+    def test_feed_sort_order_select(self):
+        """ Test the sort order select is displayed in cursor feeds """
+        BaseUserTest.login_user_by_id(self, self.opinions[0].user.id)
+        order = OpinionSortOrder.AUTHOR_AZ
+        response = self.client.get(reverse_q(
+            namespaced_url(BASE_APP_NAME, ALL_FEED_ROUTE_NAME),
+            query_kwargs={ORDER_QUERY: order.arg}))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.context[CURSOR_PAGINATION_CTX])
+
+        soup = BeautifulSoup(
+            response.content.decode("utf-8", errors="ignore"), features="lxml"
+        )
+        select = soup.find('select', id='id--sort-order-select')
+        self.assertIsNotNone(select)
+        self.assertEqual(
+            select.find('option', selected=True)['value'], order.arg)
+
+    def test_feed_load_more(self):
+        """ Test loading more opinions in the all feed """
+        user = BaseUserTest.login_user_by_id(self, self.opinions[0].user.id)
+        for order in [OpinionSortOrder.NEWEST, OpinionSortOrder.AUTHOR_AZ]:
+            expected = BaseOpinionTest.get_expected(self, {}, order, user)
+
+            ids = []
+            cursor = None
+            with self.subTest(order=order):
+                while True:
+                    query_kwargs = {
+                        ORDER_QUERY: order.arg,
+                        PER_PAGE_QUERY: PerPage.SIX.arg,
+                    }
+                    if cursor:
+                        query_kwargs[CURSOR_QUERY] = cursor
+                    response = self.client.get(reverse_q(
+                        namespaced_url(BASE_APP_NAME, ALL_FEED_ROUTE_NAME),
+                        query_kwargs=query_kwargs))
+                    self.assertEqual(response.status_code, HTTPStatus.OK)
+                    self.assertIsNone(response.context['paginator'])
+                    ids.extend(
+                        op.id for op in response.context[OPINION_LIST_CTX])
+                    cursor = response.context['page_obj'].next_cursor
+                    self.assertEqual(
+                        'load-more-item' in response.content.decode(),
+                        cursor is not None)
+                    if cursor is None:
+                        break
+
+                self.assertEqual(ids, [op.id for op in expected])
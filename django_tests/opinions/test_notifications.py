@@ -0,0 +1,143 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from datetime import timedelta
+from http import HTTPStatus
+
+from django.contrib.messages import get_messages
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.queue import run_pending
+from opinions.models import FollowStatus, NotificationSummary
+from opinions.notifications import (
+    NOTIFICATIONS_PENDING_SESSION_KEY, NOTIFICATIONS_PENDING_AT_SESSION_KEY,
+    NOTIFICATIONS_PENDING_TIMEOUT
+)
+from .base_opinion_test_cls import BaseOpinionTest
+
+
+class TestNotifications(BaseOpinionTest):
+    """
+    Test login notifications
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestNotifications, cls).setUpTestData()
+
+    def get_messages(self) -> list[str]:
+        """ Get the home page and return the messages displayed """
+        response = self.client.get('/', follow=True)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return [
+            str(message) for message in get_messages(response.wsgi_request)
+        ]
+
+    def login_follower(self):
+        """ Login a user following an author with published opinions """
+        author = self.published_opinions()[0].user
+        follower = self.get_other_user(author)
+        FollowStatus.objects.get_or_create(**{
+            FollowStatus.AUTHOR_FIELD: author,
+            FollowStatus.USER_FIELD: follower
+        })
+        # feed update on follow
+        run_pending()
+
+        password = 'more-than-8-in-a-crate'
+        follower.set_password(password)
+        follower.save()
+        response = self.client.post(reverse('account_login'), data={
+            'login': follower.username,
+            'password': password
+        })
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        return follower
+
+    @override_settings(JOBS_SYNC=False)
+    def test_login_notifications(self):
+        """ Test login notifications are generated on next page load """
+        follower = self.login_follower()
+        summaries = NotificationSummary.objects.filter(**{
+            NotificationSummary.USER_FIELD: follower
+        })
+
+        # nothing generated during login
+        self.assertIn(NOTIFICATIONS_PENDING_SESSION_KEY, self.client.session)
+        self.assertFalse(summaries.exists())
+
+        # page load before the summary is generated displays nothing, and
+        # does not generate the summary
+        msgs = self.get_messages()
+        self.assertFalse(
+            any('published by authors you follow' in msg for msg in msgs))
+        self.assertIn(NOTIFICATIONS_PENDING_SESSION_KEY, self.client.session)
+        self.assertFalse(summaries.exists())
+
+        # summary generated in the background
+        self.assertEqual(run_pending(), 1)
+        self.assertGreater(summaries.get().tagged_count, 0)
+
+        msgs = self.get_messages()
+        self.assertTrue(
+            any('published by authors you follow' in msg for msg in msgs))
+        self.assertFalse(summaries.exists())
+        self.assertNotIn(
+            NOTIFICATIONS_PENDING_SESSION_KEY, self.client.session)
+
+        # only displayed once
+        msgs = self.get_messages()
+        self.assertFalse(
+            any('published by authors you follow' in msg for msg in msgs))
+
+    @override_settings(JOBS_SYNC=False)
+    def test_login_notifications_timeout(self):
+        """
+        Test login notifications are generated during the request if the
+        summary is not generated in time
+        """
+        self.login_follower()
+        # no worker running
+        msgs = self.get_messages()
+        self.assertFalse(
+            any('published by authors you follow' in msg for msg in msgs))
+        self.assertIn(NOTIFICATIONS_PENDING_SESSION_KEY, self.client.session)
+
+        session = self.client.session
+        session[NOTIFICATIONS_PENDING_AT_SESSION_KEY] = (
+            timezone.now() - timedelta(
+                seconds=NOTIFICATIONS_PENDING_TIMEOUT + 1)
+        ).isoformat()
+        session.save()
+
+        msgs = self.get_messages()
+        self.assertTrue(
+            any('published by authors you follow' in msg for msg in msgs))
+        for key in [
+            NOTIFICATIONS_PENDING_SESSION_KEY,
+            NOTIFICATIONS_PENDING_AT_SESSION_KEY
+        ]:
+            self.assertNotIn(key, self.client.session)
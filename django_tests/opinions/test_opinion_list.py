@@ -227,13 +227,13 @@ def verify_opinion_list_content(
         with test_case.subTest(sub_msg):
 
             # check title
-            titles = soup.find_all(id=f'id--title-{index + 1}')
+            titles = soup.find_all(id=f'id--title-{opinion.id}')
             test_case.assertEqual(len(titles), 1)
             test_case.assertEqual(
                 titles[0].text.strip(), expected_title, dbg_msg)
 
             # check excerpt
-            excerpts = soup.find_all(id=f'excerpt_{index + 1}')
+            excerpts = soup.find_all(id=f'excerpt_{opinion.id}')
             test_case.assertEqual(len(excerpts), 1)
             test_case.assertEqual(
                 excerpts[0].text.strip(), expected_excerpt, dbg_msg)
@@ -243,7 +243,7 @@ def verify_opinion_list_content(
                 test_case, soup,
                 lambda tag: tag.name == 'span'
                 and TestOpinionList.equal_tag_attr(
-                    tag.parent, 'id', f'categories_{index + 1}'),
+                    tag.parent, 'id', f'categories_{opinion.id}'),
                 lambda category, tag: category.name == tag.text,
                 opinion.categories.all(),
                 msg=sub_msg)
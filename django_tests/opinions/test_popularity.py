@@ -0,0 +1,106 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from categories import REACTION_AGREE, REACTION_DISAGREE
+from categories.constants import STATUS_DELETED
+from categories.models import Status
+from opinions.comment_data import get_popularity_levels, PopularityLevel
+from opinions.models import (
+    Opinion, Comment, AgreementStatus, HideStatus, PinStatus
+)
+from .base_opinion_test_cls import BaseOpinionTest
+
+
+class TestPopularity(BaseOpinionTest):
+    """
+    Test opinion popularity levels
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestPopularity, cls).setUpTestData()
+
+        # add some reactions
+        for index, opinion in enumerate(cls.opinions[:10]):
+            user = cls.get_other_user(opinion.user)
+            AgreementStatus.objects.create(**{
+                AgreementStatus.OPINION_FIELD: opinion,
+                AgreementStatus.USER_FIELD: user,
+                AgreementStatus.STATUS_FIELD: Status.objects.get(
+                    name=REACTION_AGREE if index % 2 else REACTION_DISAGREE)
+            })
+            if index % 3 == 0:
+                PinStatus.objects.create(**{
+                    PinStatus.OPINION_FIELD: opinion,
+                    PinStatus.USER_FIELD: user
+                })
+
+    def test_popularity_levels(self):
+        """ Test popularity levels match the individual counts """
+        # deleted comments are not counted, as for the comment counter
+        comment = Comment.objects.filter(opinion__in=self.opinions).first()
+        comment.status = Status.objects.get(name=STATUS_DELETED)
+        comment.save()
+
+        levels = get_popularity_levels(self.opinions)
+        self.assertEqual(len(levels), len(self.opinions))
+
+        for opinion in self.opinions:
+            with self.subTest(opinion=opinion):
+                self.assertEqual(
+                    levels[f'opinion_{opinion.id}'],
+                    PopularityLevel(
+                        comments=Comment.objects.filter(
+                            opinion=opinion).exclude(
+                            status__name=STATUS_DELETED).count(),
+                        agree=AgreementStatus.objects.filter(
+                            opinion=opinion,
+                            status__name=REACTION_AGREE).count(),
+                        disagree=AgreementStatus.objects.filter(
+                            opinion=opinion,
+                            status__name=REACTION_DISAGREE).count(),
+                        hide=HideStatus.objects.filter(
+                            opinion=opinion).count(),
+                        pin=PinStatus.objects.filter(
+                            opinion=opinion).count(),
+                    )
+                )
+
+        # single opinion
+        opinion = self.opinions[0]
+        self.assertEqual(
+            get_popularity_levels(opinion),
+            {f'opinion_{opinion.id}': levels[f'opinion_{opinion.id}']}
+        )
+
+    def test_popularity_levels_query_count(self):
+        """ Test query count is independent of number of opinions """
+        opinions = list(Opinion.objects.all())
+        for count in [1, 10, len(opinions)]:
+            with self.subTest(count=count):
+                with self.assertNumQueries(1):
+                    get_popularity_levels(opinions[:count])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_popularity_levels([]), {})
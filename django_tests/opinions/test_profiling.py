@@ -0,0 +1,150 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+import pstats
+import tempfile
+from http import HTTPStatus
+from pathlib import Path
+
+from django.test import override_settings
+
+from opinions.constants import OPINIONS_ROUTE_NAME, OPINION_ID_ROUTE_NAME
+from soapbox import OPINIONS_APP_NAME
+from soapbox.constants import PROFILE_ROUTE_NAME, PROFILES_ROUTE_NAME
+from utils import reverse_q, namespaced_url, ProfileMode
+from utils.profiling import PROFILE_QUERY, PROFILE_HEADER
+from .base_opinion_test_cls import BaseOpinionTest
+from .opinion_mixin_test_cls import OpinionMixin
+
+
+class TestProfiling(OpinionMixin, BaseOpinionTest):
+    """
+    Test on-demand profiling
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestProfiling, cls).setUpTestData()
+        cls.superuser, _ = cls.get_user_by_index(0)
+        cls.superuser.is_superuser = True
+        cls.superuser.save()
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings_override = override_settings(
+            PROFILE_DIR=directory.name, PROFILE_MAX_FILES=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def get_opinions(self, mode: str = None, header: bool = False):
+        """ Get the opinion list page, requesting a profile """
+        query_kwargs = {PROFILE_QUERY: mode} if mode and not header else None
+        headers = {
+            f'HTTP_{PROFILE_HEADER.upper().replace("-", "_")}': mode
+        } if mode and header else {}
+        return self.client.get(reverse_q(
+            namespaced_url(OPINIONS_APP_NAME, OPINIONS_ROUTE_NAME),
+            query_kwargs=query_kwargs), **headers)
+
+    def test_not_superuser(self):
+        """ Test profile requests by other users are ignored """
+        user, _ = self.get_user_by_index(1)
+        self.login_user(self, user)
+
+        response = self.get_opinions(ProfileMode.CPROFILE.arg)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotIn(PROFILE_HEADER, response.headers)
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+        for route, kwargs in [
+            (PROFILES_ROUTE_NAME, {}),
+            (PROFILE_ROUTE_NAME, {'args': ['any']}),
+        ]:
+            with self.subTest(route=route):
+                response = self.client.get(reverse_q(route, **kwargs))
+                self.assertEqual(
+                    response.status_code, HTTPStatus.FORBIDDEN)
+
+    def test_profile(self):
+        """ Test profiling the opinion list and opinion pages """
+        self.login_user(self, self.superuser)
+        opinion = self.opinions[0]
+
+        for mode, header in [
+            (ProfileMode.CPROFILE, False), (ProfileMode.SAMPLE, True)
+        ]:
+            with self.subTest(mode=mode, header=header):
+                response = self.get_opinions(mode.arg, header=header)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                name = response.headers[PROFILE_HEADER]
+                path = self.directory / f'{name}.{mode.extension}'
+                self.assertTrue(path.is_file())
+
+                response = self.client.get(
+                    reverse_q(PROFILE_ROUTE_NAME, args=[name]))
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+                response = self.client.get(reverse_q(
+                    PROFILE_ROUTE_NAME, args=[name],
+                    query_kwargs={'download': ''}))
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                content = b''.join(response.streaming_content)
+                self.assertEqual(content, path.read_bytes())
+
+                if mode == ProfileMode.CPROFILE:
+                    # view and template rendering are profiled
+                    functions = {
+                        func for _, _, func in pstats.Stats(
+                            str(path)).stats
+                    }
+                    self.assertIn('get', functions)
+                    self.assertIn('render', functions)
+
+        with self.subTest('opinion page'):
+            self.login_user(self, opinion.user)
+            opinion.user.is_superuser = True
+            opinion.user.save()
+            response = self.client.get(reverse_q(
+                namespaced_url(OPINIONS_APP_NAME, OPINION_ID_ROUTE_NAME),
+                args=[opinion.id],
+                query_kwargs={PROFILE_QUERY: ProfileMode.CPROFILE.arg}))
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertIn(PROFILE_HEADER, response.headers)
+
+        # oldest profiles are removed
+        response = self.client.get(reverse_q(PROFILES_ROUTE_NAME))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(len(response.content.decode().splitlines()), 2)
+        self.assertEqual(len(list(self.directory.iterdir())), 2)
+
+    def test_not_found(self):
+        """ Test unknown profile """
+        self.login_user(self, self.superuser)
+        for name in ['unknown', '..']:
+            with self.subTest(name=name):
+                response = self.client.get(
+                    reverse_q(PROFILE_ROUTE_NAME, args=[name]))
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
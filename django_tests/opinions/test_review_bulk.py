@@ -0,0 +1,220 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from http import HTTPStatus
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from opinions.constants import (
+    OPINION_REVIEW_BULK_ROUTE_NAME, COMMENT_REVIEW_BULK_ROUTE_NAME,
+    IDS_FIELD, REVIEW_RESULT_FIELD, COUNT_CTX,
+    OPINION_REVIEW_CLAIM_ROUTE_NAME, COMMENT_REVIEW_CLAIM_ROUTE_NAME,
+    CLAIM_COUNT_FIELD
+)
+from opinions.enums import QueryStatus
+from opinions.forms import ReviewClaimForm
+from opinions.models import Opinion, Comment, Review
+from soapbox import OPINIONS_APP_NAME
+from user.permissions import add_to_moderators
+from .base_opinion_test_cls import BaseOpinionTest
+
+
+class TestReviewBulk(BaseOpinionTest):
+    """
+    Test bulk review decisions
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestReviewBulk, cls).setUpTestData()
+        cls.moderator, _ = cls.get_user_by_index(2)
+        add_to_moderators(cls.moderator)
+
+    def report_all(self, model) -> list[int]:
+        """ Report all content of model which is not in review """
+        reporter, _ = self.get_user_by_index(0)
+        content = list(model.objects.filter(**{
+            model.REPORTED_FIELD: False
+        }))
+        for item in content:
+            self.report_content(item, reporter)
+        return [item.id for item in content]
+
+    def post_decision(self, route: str, ids: list[int],
+                      decision: QueryStatus):
+        """ Post a bulk review decision """
+        return self.client.post(
+            reverse(f'{OPINIONS_APP_NAME}:{route}'), data={
+                IDS_FIELD: ','.join(map(str, ids)),
+                REVIEW_RESULT_FIELD: decision.arg
+            })
+
+    @override_settings(JOBS_SYNC=False)
+    def test_bulk_decision(self):
+        """ Test bulk review decision """
+        self.login_user(self, self.moderator)
+
+        for model, route in [
+            (Opinion, OPINION_REVIEW_BULK_ROUTE_NAME),
+            (Comment, COMMENT_REVIEW_BULK_ROUTE_NAME),
+        ]:
+            with self.subTest(model=model):
+                ids = self.report_all(model)
+                self.assertGreater(len(ids), 1)
+
+                # query count is independent of the number of items;
+                # review inserts are excluded as bulk_create batches
+                # them according to the database backend's limits
+                query_counts = []
+                for chunk in [ids[:1], ids[1:]]:
+                    with CaptureQueriesContext(connection) as queries:
+                        response = self.post_decision(
+                            route, chunk, QueryStatus.ACCEPTABLE)
+                    self.assertEqual(response.status_code, HTTPStatus.OK)
+                    self.assertEqual(response.json()[COUNT_CTX], len(chunk))
+                    query_counts.append(len([
+                        query for query in queries.captured_queries
+                        if not query['sql'].startswith(
+                            f'INSERT INTO "{Review._meta.db_table}"')
+                    ]))
+                self.assertEqual(query_counts[0], query_counts[1])
+
+                self.assertFalse(model.objects.filter(**{
+                    f'{model.id_field()}__in': ids,
+                    model.REPORTED_FIELD: True
+                }).exists())
+                self.assertFalse(Review.objects.filter(**{
+                    f'{Review.content_field(model)}__in': ids,
+                    Review.IS_CURRENT_FIELD: True
+                }).exists())
+
+                # nothing left in review
+                response = self.post_decision(
+                    route, ids, QueryStatus.ACCEPTABLE)
+                self.assertEqual(response.json()[COUNT_CTX], 0)
+
+    def test_bulk_decision_unacceptable(self):
+        """ Test bulk review decision leaving content in review """
+        self.login_user(self, self.moderator)
+        ids = self.report_all(Opinion)
+
+        response = self.post_decision(
+            OPINION_REVIEW_BULK_ROUTE_NAME, ids, QueryStatus.UNACCEPTABLE)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        for opinion in Opinion.objects.filter(**{
+            f'{Opinion.id_field()}__in': ids
+        }):
+            self.assertTrue(opinion.reported)
+            self.assertEqual(opinion.review_status.name,
+                             QueryStatus.UNACCEPTABLE.display)
+
+    def test_bulk_decision_invalid(self):
+        """ Test bulk review decision with invalid requests """
+        self.login_user(self, self.moderator)
+        for ids in ['', 'a,b']:
+            with self.subTest(ids=ids):
+                response = self.client.post(
+                    reverse(f'{OPINIONS_APP_NAME}:'
+                            f'{OPINION_REVIEW_BULK_ROUTE_NAME}'), data={
+                        IDS_FIELD: ids,
+                        REVIEW_RESULT_FIELD: QueryStatus.ACCEPTABLE.arg
+                    })
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+        user, _ = self.get_user_by_index(0)
+        self.login_user(self, user)
+        response = self.post_decision(
+            OPINION_REVIEW_BULK_ROUTE_NAME, [1], QueryStatus.ACCEPTABLE)
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+    def post_claim(self, route: str, count: int):
+        """ Post a review claim """
+        return self.client.post(
+            reverse(f'{OPINIONS_APP_NAME}:{route}'), data={
+                CLAIM_COUNT_FIELD: count
+            })
+
+    def test_claim(self):
+        """ Test claiming content pending review """
+        self.login_user(self, self.moderator)
+
+        for model, route in [
+            (Opinion, OPINION_REVIEW_CLAIM_ROUTE_NAME),
+            (Comment, COMMENT_REVIEW_CLAIM_ROUTE_NAME),
+        ]:
+            with self.subTest(model=model):
+                self.report_all(model)
+                ids = list(model.objects.filter(**{
+                    f'{model.REVIEW_STATUS_FIELD}__name':
+                        QueryStatus.PENDING_REVIEW.display
+                }).order_by(model.id_field()).values_list(
+                    model.id_field(), flat=True))
+                self.assertGreater(len(ids), 2)
+
+                # claims are made oldest first, and not repeated
+                claimed = []
+                counts = [2] + [ReviewClaimForm.MAX_COUNT] * (
+                    (len(ids) - 2) // ReviewClaimForm.MAX_COUNT + 1)
+                for count in counts:
+                    response = self.post_claim(route, count)
+                    self.assertEqual(response.status_code, HTTPStatus.OK)
+                    expected = ids[len(claimed):len(claimed) + count]
+                    self.assertEqual(response.json()[IDS_FIELD], expected)
+                    self.assertEqual(
+                        response.json()[COUNT_CTX], len(expected))
+                    claimed.extend(expected)
+
+                response = self.post_claim(route, 1)
+                self.assertEqual(response.json()[COUNT_CTX], 0)
+
+                # claim is recorded on the current review records
+                for review in Review.objects.filter(**{
+                    f'{Review.content_field(model)}__in': ids,
+                    Review.IS_CURRENT_FIELD: True
+                }):
+                    self.assertEqual(review.reviewer, self.moderator)
+                    self.assertEqual(review.status.name,
+                                     QueryStatus.UNDER_REVIEW.display)
+                self.assertEqual(model.objects.filter(**{
+                    f'{model.id_field()}__in': ids,
+                    f'{model.REVIEW_STATUS_FIELD}__name':
+                        QueryStatus.UNDER_REVIEW.display
+                }).count(), len(ids))
+
+    def test_claim_invalid(self):
+        """ Test claiming content pending review with invalid requests """
+        self.login_user(self, self.moderator)
+        for count in [0, ReviewClaimForm.MAX_COUNT + 1, 'a']:
+            with self.subTest(count=count):
+                response = self.post_claim(
+                    OPINION_REVIEW_CLAIM_ROUTE_NAME, count)
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+        user, _ = self.get_user_by_index(0)
+        self.login_user(self, user)
+        response = self.post_claim(OPINION_REVIEW_CLAIM_ROUTE_NAME, 1)
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
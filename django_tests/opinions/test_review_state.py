@@ -0,0 +1,139 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from categories import (
+    STATUS_PENDING_REVIEW, STATUS_UNDER_REVIEW, STATUS_ACCEPTABLE
+)
+from categories.registry import get_status
+from opinions.enums import QueryStatus
+from opinions.models import Opinion, Review
+from opinions.queries import (
+    get_content_status, StatusCheck, effective_content_status,
+    review_content_by_status, content_review_records_list
+)
+from opinions.views.opinion_by_id import save_new_review_status_post
+from .base_opinion_test_cls import BaseOpinionTest
+
+
+class TestReviewState(BaseOpinionTest):
+    """
+    Test cached review state of content
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestReviewState, cls).setUpTestData()
+
+    def get_unreported(self) -> Opinion:
+        """ Get a published opinion which is not in review """
+        return next(filter(
+            lambda op: not Opinion.objects.get(pk=op.id).reported,
+            self.published_opinions()
+        ))
+
+    def new_review_status(self, opinion: Opinion, status: str,
+                          is_current: bool = True):
+        """ Save a new review status for the current reviews of opinion """
+        new_records = [
+            Review(**{
+                Review.OPINION_FIELD: opinion,
+                Review.REQUESTED_FIELD: review.requested,
+                Review.REASON_FIELD: review.reason,
+                Review.REVIEWER_FIELD: self.get_other_user(opinion.user),
+                Review.STATUS_FIELD: get_status(status),
+                Review.IS_CURRENT_FIELD: is_current
+            }) for review in content_review_records_list(opinion)
+        ]
+        save_new_review_status_post(opinion, new_records)
+
+    def assert_state(self, opinion: Opinion, status: str = None):
+        """ Check the cached review state of opinion """
+        opinion = Opinion.objects.get(pk=opinion.id)
+        self.assertEqual(opinion.reported, status is not None)
+        self.assertEqual(
+            opinion.review_status,
+            None if status is None else get_status(status))
+        return opinion
+
+    def test_review_state(self):
+        """ Test review state follows review status changes """
+        opinion = self.get_unreported()
+        reporter = self.get_other_user(opinion.user)
+        self.assert_state(opinion)
+
+        self.report_content(opinion, reporter)
+        opinion = self.assert_state(opinion, STATUS_PENDING_REVIEW)
+
+        # status checks use the cached state
+        effective_content_status(opinion)
+        with self.assertNumQueries(0):
+            content_status = get_content_status(
+                opinion, StatusCheck.REPORTED, StatusCheck.REVIEW_WIP,
+                StatusCheck.VIEWABLE)
+            self.assertTrue(content_status.reported)
+            self.assertTrue(content_status.review_wip)
+            self.assertFalse(content_status.viewable)
+            self.assertEqual(effective_content_status(opinion),
+                             QueryStatus.PENDING_REVIEW)
+
+        self.new_review_status(opinion, STATUS_UNDER_REVIEW)
+        self.assert_state(opinion, STATUS_UNDER_REVIEW)
+
+        # review over, so no longer current
+        self.new_review_status(opinion, STATUS_ACCEPTABLE, is_current=False)
+        opinion = self.assert_state(opinion)
+        content_status = get_content_status(opinion, StatusCheck.ALL)
+        self.assertFalse(content_status.reported)
+        self.assertTrue(content_status.viewable)
+
+    def test_reported_under_review(self):
+        """ Test reporting content under review keeps it under review """
+        opinion = self.get_unreported()
+        reporter = self.get_other_user(opinion.user)
+        self.report_content(opinion, reporter)
+        self.new_review_status(opinion, STATUS_UNDER_REVIEW)
+        self.assert_state(opinion, STATUS_UNDER_REVIEW)
+
+        # reported again while under review, and again
+        for _ in range(2):
+            self.report_content(opinion, reporter)
+            opinion = self.assert_state(opinion, STATUS_UNDER_REVIEW)
+            self.assertEqual(effective_content_status(opinion),
+                             QueryStatus.UNDER_REVIEW)
+            self.assertIn(opinion, review_content_by_status(
+                Opinion, [QueryStatus.UNDER_REVIEW]))
+            self.assertNotIn(opinion, review_content_by_status(
+                Opinion, [QueryStatus.PENDING_REVIEW]))
+
+    def test_in_review_list(self):
+        """ Test in review list uses the cached state """
+        opinion = self.get_unreported()
+        statuses = [QueryStatus.PENDING_REVIEW]
+        self.assertNotIn(
+            opinion, review_content_by_status(Opinion, statuses))
+
+        self.report_content(opinion, self.get_other_user(opinion.user))
+        self.assertIn(opinion, review_content_by_status(Opinion, statuses))
+        self.assertNotIn(opinion, review_content_by_status(
+            Opinion, [QueryStatus.UNDER_REVIEW]))
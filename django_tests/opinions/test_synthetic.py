@@ -0,0 +1,114 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from categories import STATUS_PUBLISHED
+from opinions.counters import reconcile_counters
+from opinions.models import Opinion, Comment, Review
+from opinions.synthetic import SyntheticConfig, SyntheticDataGenerator
+from user.models import User
+from user.queries import is_moderator
+
+
+class TestSyntheticData(TestCase):
+    """
+    Test synthetic data generation
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    def test_generate(self):
+        """ Test generated data is consistent """
+        config = SyntheticConfig(
+            users=20, moderators=1, opinions=15, comments=300, max_depth=4,
+            reported=0.1, batch_size=50)
+        counts = SyntheticDataGenerator(config).generate()
+
+        self.assertEqual(User.objects.count(), config.users)
+        self.assertEqual(Opinion.objects.count(), config.opinions)
+        self.assertEqual(Comment.objects.count(), config.comments)
+        self.assertEqual(counts[Comment._meta.model_name], config.comments)
+        self.assertEqual(
+            len([user for user in User.objects.all()
+                 if is_moderator(user)]), config.moderators)
+
+        # comments are only on published opinions
+        self.assertFalse(Comment.objects.exclude(**{
+            f'{Comment.OPINION_FIELD}__{Opinion.STATUS_FIELD}__name':
+                STATUS_PUBLISHED
+        }).exists())
+
+        # comment trees are consistent
+        comments = {
+            comment.id: comment for comment in Comment.objects.all()
+        }
+        for comment in comments.values():
+            self.assertLessEqual(comment.level, config.max_depth)
+            if comment.parent != Comment.NO_PARENT:
+                parent = comments[comment.parent]
+                self.assertEqual(comment.opinion_id, parent.opinion_id)
+                self.assertEqual(comment.level, parent.level + 1)
+                self.assertEqual(comment.path, parent.descendant_path)
+            else:
+                self.assertEqual(comment.level, 0)
+                self.assertEqual(comment.path, Comment.NO_PATH)
+
+        # denormalised counters and review state match
+        for model in [Opinion, Comment]:
+            with self.subTest(model=model):
+                self.assertEqual(reconcile_counters(
+                    model, list(model.objects.values_list(
+                        model.id_field(), flat=True)), fix=False), {})
+                self.assertEqual(
+                    model.objects.filter(**{
+                        model.REPORTED_FIELD: True
+                    }).count(),
+                    Review.objects.filter(**{
+                        f'{Review.content_field(model)}__isnull': False
+                    }).count())
+
+    def test_reproducible(self):
+        """ Test generation is reproducible for a seed """
+        config = SyntheticConfig(users=10, opinions=5, comments=50)
+
+        generated = []
+        for _ in range(2):
+            SyntheticDataGenerator(config).generate()
+            generated.append([
+                (comment.content, comment.level, comment.reply_count,
+                 comment.agree_count)
+                for comment in Comment.objects.order_by(Comment.id_field())
+            ])
+            User.objects.all().delete()
+
+        self.assertEqual(generated[0], generated[1])
+
+    def test_command(self):
+        """ Test generate data command """
+        out = StringIO()
+        call_command('generate_data', users=5, opinions=3, comments=10,
+                     stdout=out)
+        self.assertIn('Generated:', out.getvalue())
+        self.assertEqual(Comment.objects.count(), 10)
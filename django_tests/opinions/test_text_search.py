@@ -0,0 +1,181 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from http import HTTPStatus
+
+from django.db import connection
+
+from categories import STATUS_PUBLISHED
+from categories.registry import status_id
+from opinions.constants import (
+    OPINION_SEARCH_ROUTE_NAME, SEARCH_QUERY, OPINION_LIST_CTX, STATUS_FIELD
+)
+from opinions.models import Opinion, Comment
+from opinions.query_params import QuerySetParams
+from opinions.text_search import (
+    text_search_query, get_search_backend, fts_table, SEARCH_RANK_FIELD
+)
+from soapbox import OPINIONS_APP_NAME
+from utils import reverse_q, namespaced_url
+from .base_opinion_test_cls import BaseOpinionTest
+from ..user.base_user_test_cls import BaseUserTest
+
+SEARCH_WORD = 'zymurgy'
+
+
+def search_word(text: str):
+    """
+    Get longest word in text, so as to avoid stop words which are not indexed
+    :param text: text to get word from
+    :return: word
+    """
+    return max(text.split(), key=len)
+
+
+class TestTextSearch(BaseOpinionTest):
+    """
+    Test full-text search backend
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestTextSearch, cls).setUpTestData()
+
+    @staticmethod
+    def search(model, terms: list[str], **lookups) -> list[int]:
+        """
+        Search content
+        :param model: Opinion or Comment
+        :param terms: search terms
+        :param lookups: additional AND lookups
+        :return: list of ids of matching content
+        """
+        query_set_params = QuerySetParams()
+        text_search_query(query_set_params, SEARCH_QUERY, model, terms)
+        for lookup, value in lookups.items():
+            query_set_params.add_and_lookup(lookup, lookup, value)
+        return list(
+            query_set_params.apply(model.objects).values_list(
+                model.id_field(), flat=True)
+        )
+
+    def test_search_backend(self):
+        """ Test the search backend matches the database vendor """
+        backend = get_search_backend()
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                for model in [Opinion, Comment]:
+                    with self.subTest(model=model):
+                        cursor.execute(
+                            f'SELECT COUNT(*) FROM {fts_table(model)}')
+                        self.assertEqual(
+                            cursor.fetchone()[0], model.objects.count())
+        self.assertIsNotNone(backend.rank(Opinion, [SEARCH_WORD]))
+
+    def test_content_search(self):
+        """ Test searching indexed content """
+        for opinion in self.opinions:
+            for term in [search_word(opinion.title),
+                         search_word(opinion.content)]:
+                with self.subTest(opinion=opinion, term=term):
+                    self.assertIn(opinion.id, self.search(Opinion, [term]))
+        for comment in self.comments:
+            term = search_word(comment.content)
+            with self.subTest(comment=comment, term=term):
+                self.assertIn(comment.id, self.search(Comment, [term]))
+
+    def test_index_maintenance(self):
+        """ Test the index is updated on save and delete """
+        opinion = self.opinions[0]
+        comment = self.comments[0]
+        self.assertEqual(self.search(Opinion, [SEARCH_WORD]), [])
+        self.assertEqual(self.search(Comment, [SEARCH_WORD]), [])
+
+        opinion.title = f'{opinion.title} {SEARCH_WORD}'
+        opinion.save()
+        comment.content = f'{comment.content} {SEARCH_WORD}'
+        comment.save()
+        self.assertEqual(self.search(Opinion, [SEARCH_WORD]), [opinion.id])
+        self.assertEqual(self.search(Comment, [SEARCH_WORD]), [comment.id])
+
+        # saving other fields doesn't affect the index
+        opinion.title = opinion.title.replace(SEARCH_WORD, '')
+        opinion.save(update_fields=[Opinion.SLUG_FIELD])
+        self.assertEqual(self.search(Opinion, [SEARCH_WORD]), [opinion.id])
+
+        comment.delete()
+        self.assertEqual(self.search(Comment, [SEARCH_WORD]), [])
+
+    def test_search_composes(self):
+        """ Test text search composes with other query terms """
+        published = self.published_opinions()
+        not_published = [
+            op for op in self.opinions if op not in published]
+        for opinion in [published[0], not_published[0]]:
+            opinion.content = f'{opinion.content} {SEARCH_WORD}'
+            opinion.save()
+
+        self.assertEqual(
+            sorted(self.search(Opinion, [SEARCH_WORD])),
+            sorted([published[0].id, not_published[0].id])
+        )
+        self.assertEqual(
+            self.search(Opinion, [SEARCH_WORD], **{
+                f'{STATUS_FIELD}': status_id(STATUS_PUBLISHED)
+            }), [published[0].id]
+        )
+
+    def test_rank_ordering(self):
+        """ Test free search results are ordered by relevance """
+        opinion = self.opinions[0]
+        user = BaseUserTest.login_user_by_id(self, opinion.user.id)
+        published = [
+            op for op in self.published_opinions() if op.user == user]
+        self.assertTrue(len(published) >= 2)
+
+        # most relevant has the search term in title and content
+        least, most = published[:2]
+        least.content = f'{least.content} {SEARCH_WORD}'
+        least.save()
+        most.title = f'{most.title} {SEARCH_WORD}'
+        most.content = f'{SEARCH_WORD} {most.content} {SEARCH_WORD}'
+        most.save()
+
+        response = self.client.get(
+            reverse_q(
+                namespaced_url(OPINIONS_APP_NAME, OPINION_SEARCH_ROUTE_NAME),
+                query_kwargs={SEARCH_QUERY: SEARCH_WORD}))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            [op.id for op in response.context[OPINION_LIST_CTX]],
+            [most.id, least.id]
+        )
+
+        ranked = QuerySetParams()
+        text_search_query(ranked, SEARCH_QUERY, Opinion, [SEARCH_WORD])
+        ranks = dict(
+            ranked.apply(Opinion.objects).values_list(
+                Opinion.id_field(), SEARCH_RANK_FIELD)
+        )
+        self.assertGreater(ranks[most.id], ranks[least.id])
@@ -0,0 +1,138 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from django.db import IntegrityError, transaction
+from django.db.models.signals import post_save
+
+from categories import REACTION_AGREE, REACTION_DISAGREE
+from categories.registry import get_status
+from opinions.counters import reconcile_counters
+from opinions.models import (
+    Opinion, AgreementStatus, PinStatus, FollowStatus, FeedEntry
+)
+from opinions.toggles import (
+    insert_if_absent, set_reaction, toggle_agreement
+)
+from .base_opinion_test_cls import BaseOpinionTest
+
+
+class TestToggles(BaseOpinionTest):
+    """
+    Test reaction toggles
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestToggles, cls).setUpTestData()
+
+    def test_unique_reactions(self):
+        """ Test reactions are unique per user and content """
+        opinion = self.published_opinions()[0]
+        lookups = {
+            PinStatus.OPINION_FIELD: opinion,
+            PinStatus.USER_FIELD: TestToggles.get_other_user(opinion.user)
+        }
+        pin = insert_if_absent(PinStatus, **lookups)
+        self.assertIsNotNone(pin)
+        self.assertIsNotNone(pin.id)
+        self.assertIsNone(insert_if_absent(PinStatus, **lookups))
+
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                PinStatus.objects.create(**lookups)
+        self.assertEqual(PinStatus.objects.filter(**lookups).count(), 1)
+
+    def test_set_reaction(self):
+        """ Test adding/removing reactions """
+        opinion = next(filter(
+            lambda op: op.id not in self.reported_opinion_set,
+            self.published_opinions()
+        ))
+        user = TestToggles.get_other_user(opinion.user)
+        lookups = {
+            FollowStatus.AUTHOR_FIELD: opinion.user,
+            FollowStatus.USER_FIELD: user
+        }
+        FollowStatus.objects.filter(**lookups).delete()
+
+        for present, changed in [
+            (True, True), (True, False), (False, True), (False, False)
+        ]:
+            with self.subTest(present=present, changed=changed):
+                self.assertEqual(
+                    set_reaction(FollowStatus, present, **lookups), changed)
+                self.assertEqual(
+                    FollowStatus.objects.filter(**lookups).exists(), present)
+                # post_save/post_delete maintain the feed
+                self.assertEqual(
+                    FeedEntry.objects.filter(**{
+                        FeedEntry.USER_FIELD: user,
+                        FeedEntry.AUTHOR_FIELD: opinion.user
+                    }).exists(), present)
+
+    def test_toggle_agreement(self):
+        """ Test toggling agreement """
+        opinion = self.published_opinions()[0]
+        user = TestToggles.get_other_user(opinion.user)
+        agree = get_status(REACTION_AGREE)
+        disagree = get_status(REACTION_DISAGREE)
+        query = AgreementStatus.objects.filter(**{
+            AgreementStatus.OPINION_FIELD: opinion,
+            AgreementStatus.USER_FIELD: user
+        })
+        query.delete()
+        reconcile_counters(Opinion, opinion.id)
+        opinion.refresh_from_db()
+        agree_count = opinion.agree_count
+        disagree_count = opinion.disagree_count
+
+        saved = []
+
+        def saved_callback(sender, instance, created=False, **kwargs):
+            saved.append((instance.id, created))
+
+        post_save.connect(saved_callback, sender=AgreementStatus)
+        self.addCleanup(
+            post_save.disconnect, saved_callback, sender=AgreementStatus)
+
+        for status, expected, counts, created in [
+            (agree, agree, (1, 0), True), (disagree, disagree, (0, 1), False),
+            (disagree, None, (0, 0), None)
+        ]:
+            with self.subTest(status=status):
+                saved.clear()
+                self.assertEqual(
+                    toggle_agreement(opinion, user, status), expected)
+                # post_save sent as for save()
+                self.assertEqual(
+                    saved, [] if created is None else
+                    [(query.get().id, created)])
+                self.assertEqual(
+                    list(query.values_list(
+                        AgreementStatus.STATUS_FIELD, flat=True)),
+                    [expected.id] if expected else [])
+                opinion.refresh_from_db()
+                self.assertEqual(
+                    (opinion.agree_count - agree_count,
+                     opinion.disagree_count - disagree_count), counts)
@@ -0,0 +1,105 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from django.contrib.auth.models import Permission, AnonymousUser
+from django.test import RequestFactory
+
+from opinions.constants import CLOSE_REVIEW_PERM
+from opinions.models import Opinion, Comment, Review
+from soapbox import OPINIONS_APP_NAME
+from user.constants import MODERATOR_GROUP, AUTHOR_GROUP
+from user.models import User
+from user.permissions import add_to_moderators
+from user.queries import is_moderator, is_author
+from utils import (
+    Crud, permission_check, get_auth_snapshot, AuthSnapshotMiddleware
+)
+from .base_user_test_cls import BaseUserTest
+
+
+class TestAuthSnapshot(BaseUserTest):
+    """
+    Test user authorisation snapshot
+    https://docs.djangoproject.com/en/4.1/topics/testing/tools/
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Set up data for the whole TestCase """
+        super(TestAuthSnapshot, cls).setUpTestData()
+
+    def test_snapshot_matches_user(self):
+        """ Test snapshot matches user groups and permissions """
+        permissions = [
+            f'{perm.content_type.app_label}.{perm.codename}'
+            for perm in Permission.objects.select_related('content_type')
+        ]
+        for user in self.users.values():
+            with self.subTest(user=user.username):
+                # fresh instance, so nothing cached
+                user = User.objects.get(pk=user.pk)
+                snapshot = get_auth_snapshot(user)
+                for group in [MODERATOR_GROUP, AUTHOR_GROUP]:
+                    self.assertEqual(
+                        snapshot.in_group(group),
+                        user.groups.filter(name=group).exists(), group)
+                for perm in permissions:
+                    self.assertEqual(
+                        snapshot.has_perm(perm), user.has_perm(perm), perm)
+
+        snapshot = get_auth_snapshot(AnonymousUser())
+        self.assertFalse(snapshot.in_group(AUTHOR_GROUP))
+        self.assertFalse(snapshot.has_perm(permissions[0]))
+
+    def test_no_repeated_queries(self):
+        """ Test auth checks only query the database once """
+        for user in self.users.values():
+            with self.subTest(user=user.username):
+                request = RequestFactory().get('/')
+                request.user = User.objects.get(pk=user.pk)
+                AuthSnapshotMiddleware(lambda req: None)(request)
+
+                # groups, user permissions and group permissions
+                with self.assertNumQueries(3):
+                    for _ in range(2):
+                        is_moderator(request.user)
+                        is_author(request.user)
+                        for model in [Opinion, Comment, Review]:
+                            for op in Crud:
+                                permission_check(
+                                    request, model, op,
+                                    app_label=OPINIONS_APP_NAME)
+
+    def test_group_change(self):
+        """ Test snapshot is updated when user groups change """
+        user, _ = self.get_user_by_index(0)
+        user = User.objects.get(pk=user.pk)
+        self.assertFalse(is_moderator(user))
+        self.assertFalse(
+            get_auth_snapshot(user).has_perm(
+                f'{OPINIONS_APP_NAME}.{CLOSE_REVIEW_PERM}'))
+
+        add_to_moderators(user)
+        self.assertTrue(is_moderator(user))
+        self.assertTrue(
+            get_auth_snapshot(user).has_perm(
+                f'{OPINIONS_APP_NAME}.{CLOSE_REVIEW_PERM}'))
@@ -0,0 +1,93 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import (
+    run_pending, release_abandoned_jobs, purge_done_jobs, worker_id
+)
+
+POLL_INTERVAL = 5
+""" Default time in seconds to wait when there are no jobs to run """
+BATCH_SIZE = 10
+""" Default number of jobs to claim at a time """
+PURGE_INTERVAL = 60 * 60
+""" Time in seconds between purges of completed jobs """
+
+
+class Command(BaseCommand):
+    """
+    Run background jobs
+    """
+    help = 'Run background jobs from the job queue'
+
+    stopping = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Run the jobs which are ready to run and exit')
+        parser.add_argument(
+            '--sleep', type=float, default=POLL_INTERVAL,
+            help=f'Time in seconds to wait when there are no jobs to run; '
+                 f'default {POLL_INTERVAL}')
+        parser.add_argument(
+            '--batch', type=int, default=BATCH_SIZE,
+            help=f'Number of jobs to claim at a time; default {BATCH_SIZE}')
+
+    def stop(self, signum, frame):
+        """ Stop after the current batch of jobs """
+        self.stopping = True
+
+    def handle(self, *args, **options):
+        worker = worker_id()
+        if options['once']:
+            count = run_pending(worker=worker, batch=options['batch'])
+            purge_done_jobs()
+            self.stdout.write(self.style.SUCCESS(f'Jobs run: {count}'))
+            return
+
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.stdout.write(f'Worker {worker} started')
+
+        next_purge = time.monotonic()
+        while not self.stopping:
+            # discard connections which have been dropped or exceeded
+            # CONN_MAX_AGE, as is done for each request
+            close_old_connections()
+
+            release_abandoned_jobs()
+            if time.monotonic() >= next_purge:
+                purge_done_jobs()
+                next_purge = time.monotonic() + PURGE_INTERVAL
+            count = run_pending(
+                worker=worker, batch=options['batch'],
+                limit=options['batch'])
+            if not count:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(f'Worker {worker} stopped')
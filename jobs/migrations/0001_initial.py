@@ -0,0 +1,58 @@
+# Generated by Django 4.2.2 on 2026-10-17 01:57
+
+from django.db import migrations, models
+import django.utils.timezone
+import utils.models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True, primary_key=True, serialize=False,
+                    verbose_name='ID')),
+                ('name', models.CharField(
+                    max_length=100, verbose_name='name')),
+                ('kwargs', models.JSONField(
+                    blank=True, default=dict, verbose_name='kwargs')),
+                ('state', models.CharField(
+                    choices=[
+                        ('pending', 'Pending'), ('running', 'Running'),
+                        ('done', 'Done'), ('failed', 'Failed')
+                    ],
+                    default='pending', max_length=10, verbose_name='state')),
+                ('attempts', models.PositiveIntegerField(
+                    default=0, verbose_name='attempts')),
+                ('max_attempts', models.PositiveIntegerField(
+                    default=1, verbose_name='max attempts')),
+                ('run_at', models.DateTimeField(
+                    default=django.utils.timezone.now,
+                    verbose_name='run at')),
+                ('locked_by', models.CharField(
+                    blank=True, max_length=64, verbose_name='locked by')),
+                ('locked_at', models.DateTimeField(
+                    blank=True, null=True, verbose_name='locked at')),
+                ('last_error', models.TextField(
+                    blank=True, verbose_name='last error')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['run_at', 'id'],
+                'indexes': [
+                    models.Index(
+                        fields=['state', 'run_at'],
+                        name='jobs_job_state_113284_idx')
+                ],
+            },
+            bases=(utils.models.ModelMixin, models.Model),
+        ),
+    ]
@@ -0,0 +1,97 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from utils import ModelMixin
+from .constants import (
+    NAME_FIELD, KWARGS_FIELD, STATE_FIELD, ATTEMPTS_FIELD,
+    MAX_ATTEMPTS_FIELD, RUN_AT_FIELD, LOCKED_BY_FIELD, LOCKED_AT_FIELD,
+    LAST_ERROR_FIELD, CREATED_FIELD, UPDATED_FIELD,
+    STATE_PENDING, STATE_RUNNING, STATE_DONE, STATE_FAILED
+)
+
+
+class Job(ModelMixin, models.Model):
+    """ Background jobs model """
+
+    # field names
+    NAME_FIELD = NAME_FIELD
+    KWARGS_FIELD = KWARGS_FIELD
+    STATE_FIELD = STATE_FIELD
+    ATTEMPTS_FIELD = ATTEMPTS_FIELD
+    MAX_ATTEMPTS_FIELD = MAX_ATTEMPTS_FIELD
+    RUN_AT_FIELD = RUN_AT_FIELD
+    LOCKED_BY_FIELD = LOCKED_BY_FIELD
+    LOCKED_AT_FIELD = LOCKED_AT_FIELD
+    LAST_ERROR_FIELD = LAST_ERROR_FIELD
+    CREATED_FIELD = CREATED_FIELD
+    UPDATED_FIELD = UPDATED_FIELD
+
+    STATE_CHOICES = [
+        (STATE_PENDING, _('Pending')),
+        (STATE_RUNNING, _('Running')),
+        (STATE_DONE, _('Done')),
+        (STATE_FAILED, _('Failed')),
+    ]
+
+    JOB_ATTRIB_NAME_MAX_LEN: int = 100
+    JOB_ATTRIB_STATE_MAX_LEN: int = 10
+    JOB_ATTRIB_LOCKED_BY_MAX_LEN: int = 64
+
+    name = models.CharField(
+        _('name'), max_length=JOB_ATTRIB_NAME_MAX_LEN, blank=False)
+
+    # keyword arguments of job function, must be json serializable
+    kwargs = models.JSONField(_('kwargs'), default=dict, blank=True)
+
+    state = models.CharField(
+        _('state'), max_length=JOB_ATTRIB_STATE_MAX_LEN,
+        choices=STATE_CHOICES, default=STATE_PENDING)
+
+    attempts = models.PositiveIntegerField(_('attempts'), default=0)
+    max_attempts = models.PositiveIntegerField(_('max attempts'), default=1)
+
+    # earliest time to run job
+    run_at = models.DateTimeField(_('run at'), default=timezone.now)
+
+    # worker which claimed job
+    locked_by = models.CharField(
+        _('locked by'), max_length=JOB_ATTRIB_LOCKED_BY_MAX_LEN, blank=True)
+    locked_at = models.DateTimeField(_('locked at'), null=True, blank=True)
+
+    last_error = models.TextField(_('last error'), blank=True)
+
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = [RUN_AT_FIELD, 'id']
+        indexes = [
+            # jobs ready to run
+            models.Index(fields=[STATE_FIELD, RUN_AT_FIELD]),
+        ]
+
+    def __str__(self):
+        return f'{self.name} {self.state}'
@@ -0,0 +1,274 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+import logging
+import socket
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Union
+
+from django.conf import settings
+from django.db import transaction, connection
+from django.db.models import F, Count
+from django.utils import timezone
+
+from .constants import (
+    STATE_PENDING, STATE_RUNNING, STATE_DONE, STATE_FAILED
+)
+from .models import Job
+
+# Database-backed job queue.
+# Jobs are registered functions taking json serializable keyword arguments.
+# Enqueued jobs are claimed by worker processes (see the run_worker
+# command) using SELECT ... FOR UPDATE SKIP LOCKED where supported, and
+# retried with exponential backoff on failure. With settings.JOBS_SYNC
+# jobs are run immediately when enqueued, e.g. in tests.
+
+logger = logging.getLogger(__name__)
+
+JOB_REGISTRY: dict[str, Callable] = {}
+""" Registered job functions, keyed by job name """
+JOB_LOCK_TIMEOUT = 60 * 30
+""" Time in seconds after which a running job is considered abandoned """
+MAX_RETRY_DELAY = 60 * 60 * 6
+""" Maximum delay in seconds between retries """
+
+
+def job(func: Callable = None, *, name: str = None):
+    """
+    Decorator to register a function as a job
+    :param func: job function
+    :param name: name of job; default module qualified function name
+    :return: decorated function
+    """
+    def register(function: Callable) -> Callable:
+        job_name = name or f'{function.__module__}.{function.__name__}'
+        JOB_REGISTRY[job_name] = function
+        function.job_name = job_name
+        return function
+
+    return register(func) if func else register
+
+
+def job_name_of(func: Union[Callable, str]) -> str:
+    """
+    Get the name of a job
+    :param func: job function or name
+    :return: job name
+    :raises ValueError if not a registered job
+    """
+    name = func if isinstance(func, str) else getattr(func, 'job_name', None)
+    if name not in JOB_REGISTRY:
+        raise ValueError(f'Unknown job: {func}')
+    return name
+
+
+def enqueue(func: Union[Callable, str], run_at: datetime = None,
+            max_attempts: int = None, **kwargs) -> Optional[Job]:
+    """
+    Enqueue a job
+    :param func: job function or name
+    :param run_at: earliest time to run job; default now
+    :param max_attempts: maximum number of attempts;
+                default settings.JOB_MAX_ATTEMPTS
+    :param kwargs: keyword arguments for job function
+    :return: job or None if run synchronously
+    """
+    name = job_name_of(func)
+    if settings.JOBS_SYNC:
+        JOB_REGISTRY[name](**kwargs)
+        return None
+
+    return Job.objects.create(**{
+        Job.NAME_FIELD: name,
+        Job.KWARGS_FIELD: kwargs,
+        Job.RUN_AT_FIELD: run_at or timezone.now(),
+        Job.MAX_ATTEMPTS_FIELD:
+            max_attempts or settings.JOB_MAX_ATTEMPTS,
+    })
+
+
+def worker_id() -> str:
+    """
+    Generate a unique worker id
+    :return: id
+    """
+    return f'{socket.gethostname()}:{uuid.uuid4().hex[:12]}'
+
+
+def claim_jobs(worker: str, limit: int = 1) -> list[Job]:
+    """
+    Claim jobs which are ready to run
+    :param worker: id of worker claiming jobs
+    :param limit: maximum number of jobs to claim
+    :return: list of claimed jobs
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ready = Job.objects.filter(**{
+            Job.STATE_FIELD: STATE_PENDING,
+            f'{Job.RUN_AT_FIELD}__lte': now
+        })
+        if connection.features.has_select_for_update_skip_locked:
+            # rows locked by other workers are skipped rather than waited on
+            ready = ready.select_for_update(skip_locked=True)
+        ids = list(ready.values_list(Job.id_field(), flat=True)[:limit])
+
+        # only jobs still pending are claimed, in case the database doesn't
+        # support row locks
+        Job.objects.filter(**{
+            f'{Job.id_field()}__in': ids,
+            Job.STATE_FIELD: STATE_PENDING
+        }).update(**{
+            Job.STATE_FIELD: STATE_RUNNING,
+            Job.LOCKED_BY_FIELD: worker,
+            Job.LOCKED_AT_FIELD: now,
+            Job.ATTEMPTS_FIELD: F(Job.ATTEMPTS_FIELD) + 1,
+            Job.UPDATED_FIELD: now,
+        })
+
+    return list(Job.objects.filter(**{
+        f'{Job.id_field()}__in': ids,
+        Job.STATE_FIELD: STATE_RUNNING,
+        Job.LOCKED_BY_FIELD: worker
+    }))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Get the delay before retrying a job
+    :param attempts: number of attempts so far
+    :return: delay
+    """
+    return timedelta(seconds=min(
+        settings.JOB_RETRY_DELAY * 2 ** max(attempts - 1, 0),
+        MAX_RETRY_DELAY))
+
+
+def run_job(claimed: Job) -> bool:
+    """
+    Run a claimed job
+    :param claimed: job to run
+    :return: True if job completed successfully
+    """
+    updates = {
+        Job.LOCKED_BY_FIELD: '',
+        Job.LOCKED_AT_FIELD: None,
+    }
+    try:
+        func = JOB_REGISTRY[job_name_of(claimed.name)]
+        func(**claimed.kwargs)
+        updates[Job.STATE_FIELD] = STATE_DONE
+        updates[Job.LAST_ERROR_FIELD] = ''
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s (%s) failed: %s',
+                       claimed.id, claimed.name, error)
+        updates[Job.LAST_ERROR_FIELD] = error
+        if claimed.attempts < claimed.max_attempts:
+            updates[Job.STATE_FIELD] = STATE_PENDING
+            updates[Job.RUN_AT_FIELD] = \
+                timezone.now() + retry_delay(claimed.attempts)
+        else:
+            updates[Job.STATE_FIELD] = STATE_FAILED
+
+    updates[Job.UPDATED_FIELD] = timezone.now()
+    Job.objects.filter(**{
+        f'{Job.id_field()}': claimed.id
+    }).update(**updates)
+    for key, value in updates.items():
+        setattr(claimed, key, value)
+
+    return claimed.state == STATE_DONE
+
+
+def release_abandoned_jobs() -> int:
+    """
+    Make jobs claimed by workers which have stopped available to run again
+    :return: number of jobs released
+    """
+    return Job.objects.filter(**{
+        Job.STATE_FIELD: STATE_RUNNING,
+        f'{Job.LOCKED_AT_FIELD}__lt':
+            timezone.now() - timedelta(seconds=JOB_LOCK_TIMEOUT)
+    }).update(**{
+        Job.STATE_FIELD: STATE_PENDING,
+        Job.LOCKED_BY_FIELD: '',
+        Job.LOCKED_AT_FIELD: None,
+    })
+
+
+def purge_done_jobs(days: int = None) -> int:
+    """
+    Delete jobs which completed successfully more than a number of days ago
+    :param days: age in days of jobs to delete;
+                default settings.JOB_DONE_RETENTION_DAYS
+    :return: number of jobs deleted
+    """
+    if days is None:
+        days = settings.JOB_DONE_RETENTION_DAYS
+    deleted, _ = Job.objects.filter(**{
+        Job.STATE_FIELD: STATE_DONE,
+        f'{Job.UPDATED_FIELD}__lt': timezone.now() - timedelta(days=days)
+    }).delete()
+    return deleted
+
+
+def queue_depth() -> dict[str, int]:
+    """
+    Get the number of jobs waiting to run, running and failed
+    :return: dict of job counts with state as key
+    """
+    depth = dict.fromkeys([STATE_PENDING, STATE_RUNNING, STATE_FAILED], 0)
+    depth.update(
+        Job.objects.filter(**{
+            f'{Job.STATE_FIELD}__in': list(depth)
+        }).values_list(Job.STATE_FIELD).annotate(
+            count=Count('id')).order_by()
+    )
+    return depth
+
+
+def run_pending(worker: str = None, batch: int = 10,
+                limit: int = None) -> int:
+    """
+    Run jobs which are ready to run, until there are none left
+    :param worker: id of worker; default generated id
+    :param batch: number of jobs to claim at a time
+    :param limit: maximum number of jobs to run; default no limit
+    :return: number of jobs run
+    """
+    if worker is None:
+        worker = worker_id()
+
+    count = 0
+    while limit is None or count < limit:
+        claimed = claim_jobs(
+            worker, batch if limit is None else min(batch, limit - count))
+        if not claimed:
+            break
+        for claimed_job in claimed:
+            run_job(claimed_job)
+        count += len(claimed)
+
+    return count
@@ -31,3 +31,7 @@ class OpinionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = OPINIONS_APP_NAME
     verbose_name = _("Opinion Management")
+
+    def ready(self):
+        # Implicitly connect signal handlers decorated with @receiver.
+        from . import signals
@@ -0,0 +1,345 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timezone
+import json
+from statistics import median
+from time import perf_counter
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+
+from base.constants import ALL_FEED_ROUTE_NAME
+from categories import STATUS_PUBLISHED
+from soapbox import OPINIONS_APP_NAME, BASE_APP_NAME
+from user.models import User
+from utils import reverse_q, namespaced_url, QueryTimer
+from .constants import (
+    OPINIONS_ROUTE_NAME, OPINION_SEARCH_ROUTE_NAME, OPINION_ID_ROUTE_NAME,
+    COMMENTS_ROUTE_NAME, COMMENT_MORE_ROUTE_NAME, OPINION_LIKE_ID_ROUTE_NAME,
+    OPINION_HIDE_ID_ROUTE_NAME, OPINION_PIN_ID_ROUTE_NAME,
+    COMMENT_LIKE_ID_ROUTE_NAME, COMMENT_HIDE_ID_ROUTE_NAME, SEARCH_QUERY,
+    STATUS_QUERY, PAGE_QUERY, OPINION_ID_QUERY, REFERENCE_QUERY
+)
+from .enums import ReactionStatus
+from .models import Opinion, Comment, FollowStatus
+from .synthetic import WORDS
+
+# Benchmark suite for the hot views.
+# Each scenario is requested by a logged-in user via the django test
+# client, recording wall time, SQL query count and time, and response
+# size. Mutating requests are rolled back so that each run sees the same
+# data.
+
+DEFAULT_REPEAT = 5
+DEFAULT_WARMUP = 1
+DEFAULT_THRESHOLD = 0.2
+""" Default relative increase in time or size flagged as a regression """
+SEARCH_TERM = WORDS[-1]
+
+GET = 'get'
+PATCH = 'patch'
+
+
+@dataclass
+class BenchmarkTarget:
+    """ Content the scenarios are run against """
+
+    user: User          # user making requests
+    opinion: Opinion    # opinion with the most comments
+    comment: Comment    # top-level comment with the most replies
+
+
+@dataclass
+class Scenario:
+    """ Benchmark scenario """
+
+    name: str
+    method: str
+    url: Callable[[BenchmarkTarget], str]
+
+
+@dataclass
+class ScenarioResult:
+    """ Benchmark scenario result; times in milliseconds """
+
+    name: str
+    status: int
+    runs: int
+    wall_ms: float          # median wall time
+    wall_ms_min: float      # minimum wall time
+    queries: int            # maximum query count
+    sql_ms: float           # median SQL time
+    size: int               # response size in bytes
+
+
+@dataclass
+class Regression:
+    """ Benchmark metric which regressed from a baseline """
+
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    def __str__(self):
+        return f'{self.name}: {self.metric} {self.baseline} -> ' \
+               f'{self.current}'
+
+
+@dataclass
+class BenchmarkRun:
+    """ Results of a benchmark run """
+
+    results: dict[str, ScenarioResult]
+    meta: dict = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        """ Serialise to json """
+        return json.dumps({
+            'meta': self.meta,
+            'results': {
+                name: asdict(result)
+                for name, result in self.results.items()
+            }
+        }, indent=2)
+
+    @staticmethod
+    def from_json(text: str) -> 'BenchmarkRun':
+        """
+        Deserialise from json
+        :param text: json
+        :return: benchmark run
+        """
+        data = json.loads(text)
+        return BenchmarkRun(results={
+            name: ScenarioResult(**result)
+            for name, result in data['results'].items()
+        }, meta=data.get('meta', {}))
+
+
+def _opinion_url(route: str, query_kwargs: Optional[dict] = None):
+    """ Get a url function for an opinion route """
+    return lambda target: reverse_q(
+        namespaced_url(OPINIONS_APP_NAME, route), args=[target.opinion.id],
+        query_kwargs=query_kwargs)
+
+
+def _opinion_ref(target: BenchmarkTarget) -> str:
+    """ Get the reference query value of the opinion page """
+    return reverse_q(
+        namespaced_url(OPINIONS_APP_NAME, OPINION_ID_ROUTE_NAME),
+        args=[target.opinion.id])
+
+
+def _comment_url(route: str, query_kwargs: dict):
+    """ Get a url function for a comment route on the opinion page """
+    return lambda target: reverse_q(
+        namespaced_url(OPINIONS_APP_NAME, route), args=[target.comment.id],
+        query_kwargs={
+            REFERENCE_QUERY: _opinion_ref(target), **query_kwargs
+        })
+
+
+SCENARIOS = [
+    Scenario('opinion_list', GET, lambda target: reverse_q(
+        namespaced_url(OPINIONS_APP_NAME, OPINIONS_ROUTE_NAME))),
+    Scenario('opinion_search', GET, lambda target: reverse_q(
+        namespaced_url(OPINIONS_APP_NAME, OPINION_SEARCH_ROUTE_NAME),
+        query_kwargs={SEARCH_QUERY: SEARCH_TERM})),
+    Scenario('all_feed', GET, lambda target: reverse_q(
+        namespaced_url(BASE_APP_NAME, ALL_FEED_ROUTE_NAME))),
+    Scenario('opinion_detail', GET, _opinion_url(OPINION_ID_ROUTE_NAME)),
+    Scenario('comment_list', GET, lambda target: reverse_q(
+        namespaced_url(OPINIONS_APP_NAME, COMMENTS_ROUTE_NAME))),
+    Scenario('opinion_comments', GET, lambda target: reverse_q(
+        namespaced_url(OPINIONS_APP_NAME, COMMENT_MORE_ROUTE_NAME),
+        query_kwargs={
+            OPINION_ID_QUERY: target.opinion.id,
+            PAGE_QUERY: 2,
+            REFERENCE_QUERY: _opinion_ref(target)
+        })),
+    Scenario('opinion_like', PATCH, _opinion_url(
+        OPINION_LIKE_ID_ROUTE_NAME, {STATUS_QUERY: ReactionStatus.AGREE.arg})),
+    Scenario('opinion_hide', PATCH, _opinion_url(
+        OPINION_HIDE_ID_ROUTE_NAME, {STATUS_QUERY: ReactionStatus.HIDE.arg})),
+    Scenario('opinion_pin', PATCH, _opinion_url(
+        OPINION_PIN_ID_ROUTE_NAME, {STATUS_QUERY: ReactionStatus.PIN.arg})),
+    Scenario('comment_like', PATCH, _comment_url(
+        COMMENT_LIKE_ID_ROUTE_NAME, {STATUS_QUERY: ReactionStatus.AGREE.arg})),
+    Scenario('comment_hide', PATCH, _comment_url(
+        COMMENT_HIDE_ID_ROUTE_NAME, {STATUS_QUERY: ReactionStatus.HIDE.arg})),
+]
+SCENARIO_NAMES = [scenario.name for scenario in SCENARIOS]
+
+
+def find_target(username: Optional[str] = None) -> BenchmarkTarget:
+    """
+    Find the content to run the benchmark against
+    :param username: username of user making requests; default the user
+                following the most authors
+    :return: benchmark target
+    """
+    published = {
+        f'{Opinion.STATUS_FIELD}__name': STATUS_PUBLISHED
+    }
+    users = User.objects.filter(**{
+        f'{User.USERNAME_FIELD}': username
+    }) if username else User.objects.annotate(
+        follows=Count(FollowStatus._meta.model_name)
+    ).order_by('-follows', User.id_field())
+    user = users.first()
+    opinion = Opinion.objects.filter(**published).exclude(**{
+        Opinion.USER_FIELD: user
+    }).order_by(
+        f'-{Opinion.COMMENT_COUNT_FIELD}', Opinion.id_field()).first()
+    comment = Comment.objects.filter(**{
+        Comment.OPINION_FIELD: opinion,
+        Comment.PARENT_FIELD: Comment.NO_PARENT
+    }).exclude(**{
+        Comment.USER_FIELD: user
+    }).order_by(
+        f'-{Comment.REPLY_COUNT_FIELD}', Comment.id_field()).first()
+    if not user or not opinion or not comment:
+        raise ValueError('Benchmark requires a user, and an opinion by '
+                         'another user with comments; see generate_data')
+    return BenchmarkTarget(user=user, opinion=opinion, comment=comment)
+
+
+def _server_name() -> str:
+    """ Get a server name accepted by ALLOWED_HOSTS """
+    hosts = [
+        host for host in settings.ALLOWED_HOSTS
+        if host != '*' and not host.startswith('.')
+    ]
+    return hosts[0] if hosts else 'testserver'
+
+
+def run_scenario(client: Client, scenario: Scenario,
+                 target: BenchmarkTarget, repeat: int = DEFAULT_REPEAT,
+                 warmup: int = DEFAULT_WARMUP) -> ScenarioResult:
+    """
+    Run a benchmark scenario
+    :param client: logged-in client
+    :param scenario: scenario to run
+    :param target: content to run against
+    :param repeat: number of measured runs
+    :param warmup: number of unmeasured runs
+    :return: result
+    """
+    url = scenario.url(target)
+    request = getattr(client, scenario.method)
+    wall_times = []
+    sql_times = []
+    queries = 0
+    response = None
+    for run in range(warmup + max(repeat, 1)):
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer):
+            start = perf_counter()
+            if scenario.method == GET:
+                response = request(url)
+            else:
+                with transaction.atomic():
+                    response = request(url)
+                    transaction.set_rollback(True)
+            elapsed = perf_counter() - start
+        if run >= warmup:
+            wall_times.append(elapsed * 1000)
+            sql_times.append(timer.elapsed * 1000)
+            queries = max(queries, timer.count)
+
+    return ScenarioResult(
+        name=scenario.name, status=response.status_code,
+        runs=len(wall_times), wall_ms=round(median(wall_times), 3),
+        wall_ms_min=round(min(wall_times), 3), queries=queries,
+        sql_ms=round(median(sql_times), 3), size=len(response.content))
+
+
+def run_benchmark(scenarios: Optional[list[str]] = None,
+                  username: Optional[str] = None,
+                  repeat: int = DEFAULT_REPEAT,
+                  warmup: int = DEFAULT_WARMUP) -> BenchmarkRun:
+    """
+    Run the benchmark scenarios
+    :param scenarios: names of scenarios to run; default all
+    :param username: username of user making requests; default the user
+                following the most authors
+    :param repeat: number of measured runs per scenario
+    :param warmup: number of unmeasured runs per scenario
+    :return: benchmark run
+    """
+    target = find_target(username)
+    client = Client(SERVER_NAME=_server_name())
+    client.force_login(target.user)
+
+    results = {}
+    for scenario in SCENARIOS:
+        if not scenarios or scenario.name in scenarios:
+            results[scenario.name] = run_scenario(
+                client, scenario, target, repeat=repeat, warmup=warmup)
+
+    return BenchmarkRun(results=results, meta={
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'database': connection.vendor,
+        'repeat': repeat,
+        'user': target.user.username,
+        'opinion': target.opinion.id,
+        'comment': target.comment.id,
+        'opinions': Opinion.objects.count(),
+        'comments': Comment.objects.count(),
+    })
+
+
+def compare_runs(current: BenchmarkRun, baseline: BenchmarkRun,
+                 threshold: float = DEFAULT_THRESHOLD) -> list[Regression]:
+    """
+    Compare a benchmark run to a baseline.
+    Any increase in query count is a regression, as is an increase in
+    time or response size of more than `threshold`.
+    :param current: benchmark run
+    :param baseline: baseline benchmark run
+    :param threshold: relative increase flagged as a regression
+    :return: list of regressions
+    """
+    regressions = []
+    for name, result in current.results.items():
+        base = baseline.results.get(name)
+        if base is None:
+            continue
+        for metric, allowance in [
+            ('queries', 0),
+            ('wall_ms', threshold),
+            ('sql_ms', threshold),
+            ('size', threshold),
+        ]:
+            base_value = getattr(base, metric)
+            value = getattr(result, metric)
+            if value > base_value * (1 + allowance):
+                regressions.append(Regression(
+                    name=name, metric=metric, baseline=base_value,
+                    current=value))
+    return regressions
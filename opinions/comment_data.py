@@ -25,22 +25,30 @@ from datetime import datetime
 from typing import Union, List, Optional, Type
 from itertools import chain
 
+from django.db.models import QuerySet
+
 from categories import REACTION_AGREE, REACTION_DISAGREE
 from categories.models import Status
+from categories.registry import status_id
 from soapbox import AVATAR_BLANK_URL, OPINIONS_APP_NAME
 from user.models import User
-from utils import reverse_q, namespaced_url, ModelFacadeMixin, ensure_list
+from utils import (
+    reverse_q, namespaced_url, ModelFacadeMixin, ensure_list, timed
+)
 from .constants import (
     PAGE_QUERY, PER_PAGE_QUERY, PARENT_ID_QUERY, COMMENT_DEPTH_QUERY,
     COMMENT_MORE_ROUTE_NAME, OPINION_ID_QUERY, ID_QUERY, OPINION_CTX
 )
 from .models import Comment, Opinion, AgreementStatus, HideStatus, PinStatus
-from .views.comment_queries import get_comment_queryset
+from .views.comment_queries import (
+    get_comment_queryset, get_comment_descendants
+)
 from .views.utils import (
     DEFAULT_COMMENT_DEPTH, query_search_term
 )
 from .enums import QueryArg, PerPage
-from .queries import content_status_check
+from .queries import content_status_check_bulk
+from .counters import count_subquery, deleted_lookup
 
 REPLY_CONTAINER_ID = 'id--comment-collapse'
 REPLY_MORE_CONTAINER_ID = f'{REPLY_CONTAINER_ID}-more'
@@ -277,9 +285,43 @@ def get_comment_tree(
     # get first level comments
     comment_bundles = get_comments_page(query_params, user)
 
+    depth = comment_tree_depth(query_params)
+
+    # get all the lower level comments required in one go; levels up to
+    # depth are displayed, the level below is only checked for existence
+    children = get_comment_descendants([
+            bundle.comment for bundle in comment_bundles
+            if not bundle.is_more_placeholder
+        ], query_params, user, max(depth, 1))
+
+    build_comment_tree(comment_bundles, query_params, children)
+
+    return comment_bundles
+
+
+def comment_tree_depth(query_params: dict[str, QueryArg]) -> int:
+    """
+    Get the comment depth from query parameters
+    :param query_params: query parameters
+    :return: depth
+    """
     depth = query_params.get(COMMENT_DEPTH_QUERY, DEFAULT_COMMENT_DEPTH)
     if isinstance(depth, QueryArg):
         depth = depth.value_arg_or_value
+    return depth
+
+
+def build_comment_tree(
+    comment_bundles: list[CommentBundle], query_params: dict[str, QueryArg],
+    children: dict[int, list[Comment]]
+):
+    """
+    Build the lower levels of a comment tree from preloaded comments
+    :param comment_bundles: comments at the top level of the tree
+    :param query_params: query parameters used to get `comment_bundles`
+    :param children: lists of child comments with parent comment id as key
+    """
+    depth = comment_tree_depth(query_params)
 
     sub_query_params = query_params.copy()
     if depth > 1:
@@ -293,8 +335,10 @@ def get_comment_tree(
 
         def next_level_comments(
                 bundle: CommentBundle, sq_params: dict[str, QueryArg]):
-            # recursive call to get next level comments
-            bundle.comments = get_comment_tree(sq_params, user)
+            # next level comments
+            bundle.comments = comments_page(
+                level_comments(bundle, sq_params), sq_params)
+            build_comment_tree(bundle.comments, sq_params, children)
 
         next_level_func = next_level_comments
     else:
@@ -315,20 +359,32 @@ def get_comment_tree(
         def next_level_query(
                 bundle: CommentBundle, sq_params: dict[str, QueryArg]):
             # query to retrieve next level comments
-            query_set = get_comment_queryset(sq_params, user)
-            if query_set.exists():
+            if level_comments(bundle, sq_params):
                 bundle.comment_query = query_search_term(sq_params)
 
         next_level_func = next_level_query
 
+    def level_comments(
+            bundle: CommentBundle,
+            sq_params: dict[str, QueryArg]) -> list[Comment]:
+        # child comments of bundle satisfying any id query
+        comments = children.get(bundle.comment.id, [])
+        comment_id = sq_params.get(ID_QUERY)
+        if isinstance(comment_id, QueryArg):
+            comment_id = comment_id.value \
+                if comment_id.value or comment_id.was_set else None
+        if comment_id:
+            comments = [
+                cmt for cmt in comments if cmt.id == int(comment_id)
+            ]
+        return comments
+
     for comment_bundle in comment_bundles:
         if comment_bundle.is_more_placeholder:
             continue
         sub_query_params[PARENT_ID_QUERY] = comment_bundle.comment.id
         next_level_func(comment_bundle, sub_query_params)
 
-    return comment_bundles
-
 
 def get_comments_page(
         query_params: dict[str, QueryArg], user: User) -> list[CommentBundle]:
@@ -338,23 +394,48 @@ def get_comments_page(
     :param user: current user
     :return: list of comments (including a 'more' element if necessary)
     """
-    query_set = get_comment_queryset(query_params, user)
+    return comments_page(get_comment_queryset(query_params, user),
+                         query_params)
+
 
+def fetch_page(
+    items: Union[QuerySet, list], page: int, per_page: int
+) -> list:
+    """
+    Fetch a page of items along with the first item of the following page,
+    if any; i.e. there are more items if more than `per_page` are returned.
+    For a query set this requires a single limited query rather than a
+    count and a slice.
+    :param items: query set or list of all items
+    :param page: 1-based page number
+    :param per_page: items per page
+    :return: list of up to `per_page` + 1 items
+    """
+    start = per_page * (page - 1)
+    return list(items[start:start + per_page + 1])
+
+
+def comments_page(
+    comments: Union[QuerySet, list[Comment]],
+    query_params: dict[str, QueryArg]
+) -> list[CommentBundle]:
+    """
+    Get a page of comments from a query set or a list of comments
+    :param comments: all comments
+    :param query_params: query parameters; default page 1, PerPage.DEFAULT
+    :return: list of comments (including a 'more' element if necessary)
+    """
     per_page = query_params.get(
         PER_PAGE_QUERY, PerPage.DEFAULT).value_arg_or_value
     page = query_params.get(PAGE_QUERY, 1)
     if isinstance(page, QueryArg):
         page = page.value_arg_or_value
-    start = per_page * (page - 1)
-    end = start + per_page
-
-    count = query_set.count()
-    add_more_placeholder = end < count
-    if add_more_placeholder:
-        end += 1    # add extra for more placeholder
+    # extra comment, if any, is used for the more placeholder
+    comments = fetch_page(comments, page, per_page)
+    add_more_placeholder = len(comments) > per_page
 
     comments = [
-        CommentBundle(comment) for comment in list(query_set[start:end])
+        CommentBundle(comment) for comment in comments
     ]
 
     if add_more_placeholder:
@@ -398,12 +479,13 @@ def get_comments_review_status(
         comments_review_status = {}
 
     # get review status of comments
-    for comment in ensure_list(comment_bundles):
-        comments_review_status.update({
-            # key: comment id, value: ContentStatus
-            cmt.id: content_status_check(cmt, current_user=current_user)
+    comments_review_status.update(
+        # key: comment id, value: ContentStatus
+        content_status_check_bulk(Comment, [
+            cmt.id for comment in ensure_list(comment_bundles)
             for cmt in comment.comment_iterable()
-        })
+        ], current_user=current_user)
+    )
 
     return comments_review_status
 
@@ -417,6 +499,7 @@ PopularityLevel = namedtuple("PopularityLevel", [
 ], defaults=[0, 0, 0, 0, 0])
 
 
+@timed()
 def get_popularity_levels(opinions: Union[Opinion, list[Opinion]]) -> dict:
     """
     Get popularity levels for specified opinion(s)
@@ -425,29 +508,33 @@ def get_popularity_levels(opinions: Union[Opinion, list[Opinion]]) -> dict:
     """
     if isinstance(opinions, Opinion):
         opinions = [opinions]
-    levels = {}
-
-    for opinion in opinions:
-        levels[f'opinion_{opinion.id}'] = PopularityLevel(
-            comments=Comment.objects.filter(**{
-                f'{Comment.OPINION_FIELD}': opinion
-            }).count(),
-            agree=AgreementStatus.objects.filter(**{
-                f'{AgreementStatus.OPINION_FIELD}': opinion,
-                f'{AgreementStatus.STATUS_FIELD}__{Status.NAME_FIELD}':
-                    REACTION_AGREE
-            }).count(),
-            disagree=AgreementStatus.objects.filter(**{
-                f'{AgreementStatus.OPINION_FIELD}': opinion,
-                f'{AgreementStatus.STATUS_FIELD}__{Status.NAME_FIELD}':
-                    REACTION_DISAGREE
-            }).count(),
-            hide=HideStatus.objects.filter(**{
-                f'{HideStatus.OPINION_FIELD}': opinion
-            }).count(),
-            pin=PinStatus.objects.filter(**{
-                f'{PinStatus.OPINION_FIELD}': opinion
-            }).count(),
-        )
+    levels = {
+        f'opinion_{opinion.id}': PopularityLevel() for opinion in opinions
+    }
+
+    opinion_ids = [opinion.id for opinion in opinions]
+    if opinion_ids:
+        # all counts in a single query, using a count subquery per level
+        agree_lookup = f'{AgreementStatus.STATUS_FIELD}'
+        for opinion_id, *counts in Opinion.objects.filter(**{
+            f'{Opinion.id_field()}__in': opinion_ids
+        }).annotate(
+            comments_cnt=count_subquery(
+                Comment, Comment.OPINION_FIELD, exclude=deleted_lookup()),
+            agree_cnt=count_subquery(
+                AgreementStatus, AgreementStatus.OPINION_FIELD, **{
+                    agree_lookup: status_id(REACTION_AGREE)
+                }),
+            disagree_cnt=count_subquery(
+                AgreementStatus, AgreementStatus.OPINION_FIELD, **{
+                    agree_lookup: status_id(REACTION_DISAGREE)
+                }),
+            hide_cnt=count_subquery(HideStatus, HideStatus.OPINION_FIELD),
+            pin_cnt=count_subquery(PinStatus, PinStatus.OPINION_FIELD),
+        ).order_by().values_list(
+            Opinion.id_field(), 'comments_cnt', 'agree_cnt',
+            'disagree_cnt', 'hide_cnt', 'pin_cnt'
+        ):
+            levels[f'opinion_{opinion_id}'] = PopularityLevel(*counts)
 
     return levels
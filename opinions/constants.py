@@ -37,6 +37,7 @@ UPDATED_FIELD = 'updated'
 PUBLISHED_FIELD = 'published'
 PARENT_FIELD = 'parent'
 LEVEL_FIELD = 'level'
+PATH_FIELD = 'path'
 
 OPINION_FIELD = 'opinion'
 REQUESTED_FIELD = 'requested'
@@ -46,6 +47,22 @@ COMMENT_FIELD = 'comment'
 RESOLVED_FIELD = 'resolved'
 AUTHOR_FIELD = 'author'
 REVIEW_RESULT_FIELD = 'review_result'
+IDS_FIELD = 'ids'
+CLAIM_COUNT_FIELD = 'count'
+
+COMMENT_COUNT_FIELD = 'comment_count'
+REPLY_COUNT_FIELD = 'reply_count'
+AGREE_COUNT_FIELD = 'agree_count'
+DISAGREE_COUNT_FIELD = 'disagree_count'
+HIDE_COUNT_FIELD = 'hide_count'
+PIN_COUNT_FIELD = 'pin_count'
+SEARCH_VECTOR_FIELD = 'search_vector'
+REVIEW_STATUS_FIELD = 'review_status'
+REPORTED_FIELD = 'reported'
+SINCE_FIELD = 'since'
+TAGGED_COUNT_FIELD = 'tagged_count'
+OPINION_REVIEWS_FIELD = 'opinion_reviews'
+COMMENT_REVIEWS_FIELD = 'comment_reviews'
 
 # Opinion routes related
 PK_PARAM_NAME = "pk"
@@ -55,6 +72,8 @@ OPINION_NEW_URL = append_slash("new")
 OPINION_SEARCH_URL = append_slash("search")
 OPINION_FOLLOWED_URL = append_slash("followed")
 OPINION_IN_REVIEW_URL = append_slash("in_review")
+OPINION_REVIEW_BULK_URL = append_slash("review_decision")
+OPINION_REVIEW_CLAIM_URL = append_slash("review_claim")
 OPINION_ID_URL = append_slash(f"<int:{PK_PARAM_NAME}>")
 OPINION_SLUG_URL = append_slash(f"<slug:{SLUG_PARAM_NAME}>")
 OPINION_PREVIEW_ID_URL = url_path(OPINION_ID_URL, "preview")
@@ -72,6 +91,8 @@ COMMENTS_URL = append_slash("comments")
 COMMENT_SEARCH_URL = url_path(COMMENTS_URL, "search")
 COMMENT_MORE_URL = url_path(COMMENTS_URL, "more")
 COMMENT_IN_REVIEW_URL = url_path(COMMENTS_URL, "in_review")
+COMMENT_REVIEW_BULK_URL = url_path(COMMENTS_URL, "review_decision")
+COMMENT_REVIEW_CLAIM_URL = url_path(COMMENTS_URL, "review_claim")
 COMMENT_ID_URL = url_path(COMMENTS_URL, f"<int:{PK_PARAM_NAME}>")
 COMMENT_SLUG_URL = url_path(COMMENTS_URL, f"<slug:{SLUG_PARAM_NAME}>")
 COMMENT_LIKE_ID_URL = url_path(COMMENT_ID_URL, "like")
@@ -88,6 +109,8 @@ OPINION_NEW_ROUTE_NAME = "opinion_new"
 OPINION_SEARCH_ROUTE_NAME = "opinion_search"
 OPINION_FOLLOWED_ROUTE_NAME = "opinion_followed"
 OPINION_IN_REVIEW_ROUTE_NAME = "opinion_in_review"
+OPINION_REVIEW_BULK_ROUTE_NAME = "opinion_review_bulk"
+OPINION_REVIEW_CLAIM_ROUTE_NAME = "opinion_review_claim"
 OPINION_ID_ROUTE_NAME = "opinion_id"
 OPINION_SLUG_ROUTE_NAME = "opinion_slug"
 SINGLE_OPINION_ROUTE_NAMES = [OPINION_ID_ROUTE_NAME, OPINION_SLUG_ROUTE_NAME]
@@ -111,6 +134,8 @@ SINGLE_COMMENT_ROUTE_NAMES = [COMMENT_ID_ROUTE_NAME, COMMENT_SLUG_ROUTE_NAME]
 COMMENT_SEARCH_ROUTE_NAME = "comment_search"
 COMMENT_MORE_ROUTE_NAME = "comment_more"
 COMMENT_IN_REVIEW_ROUTE_NAME = "comment_in_review"
+COMMENT_REVIEW_BULK_ROUTE_NAME = "comment_review_bulk"
+COMMENT_REVIEW_CLAIM_ROUTE_NAME = "comment_review_claim"
 COMMENT_LIKE_ID_ROUTE_NAME = f"{COMMENT_ID_ROUTE_NAME}_like"
 COMMENT_HIDE_ID_ROUTE_NAME = f"{COMMENT_ID_ROUTE_NAME}_hide"
 COMMENT_REPORT_ID_ROUTE_NAME = f"{COMMENT_ID_ROUTE_NAME}_report"
@@ -127,6 +152,7 @@ SINGLE_CONTENT_ROUTE_NAMES.extend(SINGLE_COMMENT_ROUTE_NAMES)
 ORDER_QUERY: str = 'order'              # opinion order
 PAGE_QUERY: str = 'page'                # page number
 PER_PAGE_QUERY: str = 'per-page'        # pagination per page
+CURSOR_QUERY: str = 'cursor'            # keyset pagination cursor
 REORDER_QUERY: str = 'reorder'          # reordering of previous query
 SEARCH_QUERY: str = 'search'            # search from search box in header
 # Note: a search can have any of the following queries embedded in its
@@ -222,6 +248,9 @@ COMMENT_REVIEWS_CTX = "comment_reviews"
 # templates/opinions/snippet/tagged_author_opinions.html
 TAGGED_COUNT_CTX = "tagged_count"
 
+# templates/opinions/snippet/pagination.html
+CURSOR_PAGINATION_CTX = "cursor_pagination"
+
 # templates/opinions/opinion_feed.html
 IS_FOLLOWING_FEED_CTX = "is_following_feed"
 IS_CATEGORY_FEED_CTX = "is_category_feed"
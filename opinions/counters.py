@@ -0,0 +1,211 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from typing import Type, Union, Optional, List
+
+from django.db import transaction
+from django.db.models import Model, OuterRef, Subquery, Count, F
+from django.db.models.functions import Coalesce, Greatest
+
+from categories import REACTION_AGREE, REACTION_DISAGREE
+from categories.constants import STATUS_DELETED
+from categories.models import Status
+from categories.registry import status_id
+from utils import ensure_list
+from .models import Opinion, Comment, AgreementStatus, HideStatus, PinStatus
+
+
+def count_subquery(
+        model: Type[Model], field: str, exclude: Optional[dict] = None,
+        **kwargs) -> Coalesce:
+    """
+    Get a subquery to count the entries of a model related to the outer
+    query's content
+    :param model: model to count
+    :param field: field of `model` referencing the outer content
+    :param exclude: lookups to exclude; default None
+    :param kwargs: additional filter lookups
+    :return: count expression
+    """
+    query = model.objects.filter(**{
+        f'{field}': OuterRef(model.id_field()),
+    }, **kwargs)
+    if exclude:
+        query = query.exclude(**exclude)
+    return Coalesce(
+        Subquery(
+            query.order_by().values(field).annotate(
+                count=Count(model.id_field())
+            ).values('count')
+        ), 0
+    )
+
+
+def deleted_lookup() -> dict:
+    """
+    Get the lookup for deleted comments, which are excluded from comment
+    and reply counts
+    :return: lookup dict
+    """
+    return {
+        f'{Comment.STATUS_FIELD}': status_id(STATUS_DELETED)
+    }
+
+
+def agreement_count_field(status: Union[Status, str]) -> str:
+    """
+    Get the counter field for an agreement status
+    :param status: agreement status or status name
+    :return: counter field name
+    """
+    name = status.name if isinstance(status, Status) else status
+    return Opinion.AGREE_COUNT_FIELD if name == REACTION_AGREE else \
+        Opinion.DISAGREE_COUNT_FIELD
+
+
+def adjust_counters(content: Union[Opinion, Comment], **deltas: int):
+    """
+    Adjust the denormalised counters of content.
+    The update is performed in the database, so is safe with respect to
+    concurrent updates. Counters are not decremented below zero.
+    :param content: opinion/comment to update
+    :param deltas: amount to adjust by with counter field name as key
+    """
+    deltas = update_counters(content.__class__, content.id, **deltas)
+    for field, delta in deltas.items():
+        setattr(content, field, max(getattr(content, field) + delta, 0))
+
+
+def update_counters(model: Type[Model], pk: int, **deltas: int) -> dict:
+    """
+    Update the denormalised counters of content in the database
+    :param model: Opinion or Comment
+    :param pk: id of content to update
+    :param deltas: amount to adjust by with counter field name as key
+    :return: dict of applied adjustments
+    """
+    deltas = {
+        field: delta for field, delta in deltas.items() if delta
+    }
+    if deltas:
+        model.objects.filter(**{
+            f'{model.id_field()}': pk
+        }).update(**{
+            # counters may have drifted, so never decrement below zero
+            field: F(field) + delta if delta > 0 else
+            Greatest(F(field) + delta, 0)
+            for field, delta in deltas.items()
+        })
+    return deltas
+
+
+def adjust_comment_counters(comment: Comment, delta: int):
+    """
+    Adjust the counters affected by the addition/removal of a comment, i.e.
+    the comment count of its opinion and the reply count of its parent
+    :param comment: comment added/removed
+    :param delta: amount to adjust by
+    """
+    update_counters(Opinion, comment.opinion_id, **{
+        Opinion.COMMENT_COUNT_FIELD: delta
+    })
+    if comment.parent != Comment.NO_PARENT:
+        update_counters(Comment, comment.parent, **{
+            Comment.REPLY_COUNT_FIELD: delta
+        })
+
+
+def counter_expressions(model: Type[Model]) -> dict:
+    """
+    Get the expressions to count the actual values of the denormalised
+    counters of a model
+    :param model: Opinion or Comment
+    :return: dict of count expressions with counter field name as key
+    """
+    content_field = AgreementStatus.content_field(model)
+    agreement_lookup = f'{AgreementStatus.STATUS_FIELD}'
+    expressions = {
+        model.AGREE_COUNT_FIELD: count_subquery(
+            AgreementStatus, content_field,
+            **{agreement_lookup: status_id(REACTION_AGREE)}),
+        model.DISAGREE_COUNT_FIELD: count_subquery(
+            AgreementStatus, content_field,
+            **{agreement_lookup: status_id(REACTION_DISAGREE)}),
+        model.HIDE_COUNT_FIELD: count_subquery(
+            HideStatus, HideStatus.content_field(model)),
+    }
+    if model == Opinion:
+        expressions.update({
+            Opinion.COMMENT_COUNT_FIELD: count_subquery(
+                Comment, Comment.OPINION_FIELD, exclude=deleted_lookup()),
+            Opinion.PIN_COUNT_FIELD: count_subquery(
+                PinStatus, PinStatus.OPINION_FIELD),
+        })
+    else:
+        expressions.update({
+            Comment.REPLY_COUNT_FIELD: count_subquery(
+                Comment, Comment.PARENT_FIELD, exclude=deleted_lookup()),
+        })
+    return expressions
+
+
+def reconcile_counters(
+        model: Type[Model], ids: Union[int, List[int]],
+        fix: bool = True) -> dict[int, dict[str, tuple[int, int]]]:
+    """
+    Recompute the denormalised counters of content
+    :param model: Opinion or Comment
+    :param ids: ids of content to reconcile
+    :param fix: update counters flag; default True
+    :return: drift dict of the form {
+                   key: content id
+                   value: dict of (stored, actual) values with counter field
+                        name as key, for counters which differ
+               }
+    """
+    expressions = counter_expressions(model)
+    annotations = {
+        f'actual_{field}': expression
+        for field, expression in expressions.items()
+    }
+    drift = {}
+    with transaction.atomic():
+        for content in model.objects.filter(**{
+            f'{model.id_field()}__in': ensure_list(ids)
+        }).annotate(**annotations).order_by().select_for_update(of=('self',)):
+            differences = {
+                field: (getattr(content, field),
+                        getattr(content, f'actual_{field}'))
+                for field in expressions
+                if getattr(content, field) !=
+                getattr(content, f'actual_{field}')
+            }
+            if differences:
+                drift[content.id] = differences
+                if fix:
+                    model.objects.filter(**{
+                        f'{model.id_field()}': content.id
+                    }).update(**{
+                        field: actual
+                        for field, (_, actual) in differences.items()
+                    })
+    return drift
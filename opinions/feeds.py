@@ -0,0 +1,256 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from typing import Optional, Union
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+
+from categories import STATUS_PUBLISHED
+from categories.registry import status_id, STATUS_REGISTRY
+from jobs.queue import job, enqueue
+from user.models import User
+from .models import Opinion, FollowStatus, FeedEntry
+from .queries import IN_REVIEW_STATUSES
+
+# Following feed store.
+# Entries are written when an opinion is published (fan-out on write), and
+# removed when it is unpublished or goes into review, or its author is
+# unfollowed. For authors with more than FEED_FANOUT_LIMIT followers a
+# single entry without a user is written instead, which is read by all
+# followers of the author (fan-out on read).
+# Changes to the status, review state or published date of an opinion are
+# applied by a background job, once the change is committed.
+
+FEED_BATCH_SIZE = 1000
+""" Number of feed entries per bulk insert """
+
+
+def feed_eligible(opinion: Opinion) -> bool:
+    """
+    Check if an opinion belongs in following feeds
+    :param opinion: opinion to check
+    :return: True if eligible
+    """
+    return opinion.status_id == status_id(STATUS_PUBLISHED) and \
+        opinion.review_status_id not in STATUS_REGISTRY.ids_of(
+            IN_REVIEW_STATUSES)
+
+
+def eligible_opinions(author: User) -> QuerySet:
+    """
+    Get the opinions by an author which belong in following feeds
+    :param author: author
+    :return: query set of opinions
+    """
+    return Opinion.objects.filter(**{
+        Opinion.USER_FIELD: author,
+        Opinion.STATUS_FIELD: status_id(STATUS_PUBLISHED)
+    }).exclude(**{
+        f'{Opinion.REVIEW_STATUS_FIELD}__in':
+            STATUS_REGISTRY.ids_of(IN_REVIEW_STATUSES)
+    })
+
+
+def follower_ids(author: Union[User, int]) -> QuerySet:
+    """
+    Get the ids of the followers of an author
+    :param author: author
+    :return: query set of user ids
+    """
+    return FollowStatus.objects.filter(**{
+        FollowStatus.AUTHOR_FIELD: author
+    }).values_list(FollowStatus.USER_FIELD, flat=True)
+
+
+def is_fan_out_on_read(author: Union[User, int]) -> bool:
+    """
+    Check if the feed entries of an author are read by followers rather
+    than written for each follower
+    :param author: author
+    :return: True if fan-out on read
+    """
+    return follower_ids(author).count() > settings.FEED_FANOUT_LIMIT
+
+
+def feed_entry(opinion: Opinion, user: Optional[int]) -> FeedEntry:
+    """
+    Generate a feed entry
+    :param opinion: opinion
+    :param user: id of user, or None for a fan-out on read entry
+    :return: feed entry
+    """
+    return FeedEntry(**{
+        f'{FeedEntry.USER_FIELD}_id': user,
+        FeedEntry.OPINION_FIELD: opinion,
+        f'{FeedEntry.AUTHOR_FIELD}_id': opinion.user_id,
+        FeedEntry.PUBLISHED_FIELD: opinion.published,
+    })
+
+
+def add_feed_entries(opinions: list[Opinion], users: list[Optional[int]]):
+    """
+    Add feed entries for all combinations of opinions and users
+    :param opinions: opinions
+    :param users: ids of users, or [None] for fan-out on read entries
+    """
+    entries = [
+        feed_entry(opinion, user) for opinion in opinions for user in users
+    ]
+    if entries:
+        FeedEntry.objects.bulk_create(
+            entries, batch_size=FEED_BATCH_SIZE, ignore_conflicts=True)
+
+
+def publish_to_feeds(opinion: Opinion):
+    """
+    Add an opinion to the feeds of the followers of its author, or update
+    its published date if already in feeds
+    :param opinion: opinion
+    """
+    entries = FeedEntry.objects.filter(**{
+        FeedEntry.OPINION_FIELD: opinion
+    })
+    if entries.exists():
+        # already in feeds, refresh published date in case of re-publish
+        entries.exclude(**{
+            FeedEntry.PUBLISHED_FIELD: opinion.published
+        }).update(**{
+            FeedEntry.PUBLISHED_FIELD: opinion.published
+        })
+        return
+
+    add_feed_entries(
+        [opinion],
+        [None] if is_fan_out_on_read(opinion.user_id) else
+        list(follower_ids(opinion.user_id))
+    )
+
+
+def remove_from_feeds(opinion: Opinion):
+    """
+    Remove an opinion from all feeds
+    :param opinion: opinion
+    """
+    FeedEntry.objects.filter(**{
+        FeedEntry.OPINION_FIELD: opinion
+    }).delete()
+
+
+def update_feeds(opinion: Opinion):
+    """
+    Add or remove an opinion from feeds depending on its status
+    :param opinion: opinion
+    """
+    if feed_eligible(opinion):
+        publish_to_feeds(opinion)
+    else:
+        remove_from_feeds(opinion)
+
+
+def follow_author(user: Union[User, int], author: Union[User, int]):
+    """
+    Add the opinions of a newly followed author to a user's feed
+    :param user: follower
+    :param author: followed author
+    """
+    user_id = user if isinstance(user, int) else user.id
+    add_feed_entries(
+        list(
+            eligible_opinions(author).exclude(**{
+                # fan-out on read entries are already visible
+                f'{Opinion.id_field()}__in': FeedEntry.objects.filter(**{
+                    f'{FeedEntry.USER_FIELD}__isnull': True,
+                    FeedEntry.AUTHOR_FIELD: author
+                }).values(FeedEntry.OPINION_FIELD)
+            })
+        ), [user_id]
+    )
+
+
+def enqueue_feed_update(opinion: Opinion):
+    """
+    Update the feed entries of an opinion in the background, once the
+    current transaction is committed
+    :param opinion: opinion
+    """
+    opinion_id = opinion.id
+    transaction.on_commit(
+        lambda: enqueue(update_feeds_job, opinion_ids=[opinion_id]))
+
+
+@job
+def update_feeds_job(opinion_ids: list[int]):
+    """
+    Job to update the feed entries of opinions
+    :param opinion_ids: ids of opinions
+    """
+    for opinion in Opinion.objects.filter(**{
+        f'{Opinion.id_field()}__in': opinion_ids
+    }):
+        update_feeds(opinion)
+
+
+@job
+def follow_author_job(user_id: int, author_id: int):
+    """
+    Job to add the opinions of a newly followed author to a user's feed
+    :param user_id: id of follower
+    :param author_id: id of followed author
+    """
+    if FollowStatus.objects.filter(**{
+        f'{FollowStatus.USER_FIELD}_id': user_id,
+        f'{FollowStatus.AUTHOR_FIELD}_id': author_id
+    }).exists():
+        # still following
+        follow_author(user_id, author_id)
+
+
+def unfollow_author(user: Union[User, int], author: Union[User, int]):
+    """
+    Remove the opinions of an unfollowed author from a user's feed
+    :param user: follower
+    :param author: unfollowed author
+    """
+    FeedEntry.objects.filter(**{
+        FeedEntry.USER_FIELD: user,
+        FeedEntry.AUTHOR_FIELD: author
+    }).delete()
+
+
+def rebuild_author_feeds(author: Union[User, int]) -> int:
+    """
+    Rebuild the feed entries for the opinions of an author
+    :param author: author
+    :return: number of opinions in feeds
+    """
+    FeedEntry.objects.filter(**{
+        FeedEntry.AUTHOR_FIELD: author
+    }).delete()
+
+    opinions = list(eligible_opinions(author))
+    add_feed_entries(
+        opinions,
+        [None] if is_fan_out_on_read(author) else list(follower_ids(author))
+    )
+    return len(opinions)
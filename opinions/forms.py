@@ -32,7 +32,7 @@ from .constants import (
     TITLE_FIELD, CONTENT_FIELD, CATEGORIES_FIELD, STATUS_FIELD, SLUG_FIELD,
     CREATED_FIELD, UPDATED_FIELD, PUBLISHED_FIELD, REASON_FIELD, OPINION_FIELD,
     REQUESTED_FIELD, REVIEWER_FIELD, COMMENT_FIELD, RESOLVED_FIELD,
-    REVIEW_RESULT_FIELD
+    REVIEW_RESULT_FIELD, IDS_FIELD, CLAIM_COUNT_FIELD
 )
 from .enums import QueryStatus
 from .models import Opinion, Category, Comment, Review
@@ -252,3 +252,66 @@ class ReviewForm(ReportForm):
             [field for field in ReviewForm.Meta.fields
              if field not in ReviewForm.Meta.non_bootstrap_fields],
             {'class': 'form-control'})
+
+
+class BulkReviewForm(forms.Form):
+    """
+    Form to make a review decision for multiple content items.
+    """
+
+    IDS_FF = IDS_FIELD
+    REVIEW_RESULT_FF = REVIEW_RESULT_FIELD
+
+    MAX_IDS: int = 1000
+
+    ids = CharField(help_text='Comma-separated list of content ids.')
+
+    review_result = ChoiceField(
+        choices=[
+            (choice.arg, choice.display)
+            for choice in QueryStatus.review_result_statuses()
+        ],
+        label="Review Decision"
+    )
+
+    def clean_ids(self) -> list[int]:
+        """
+        Validate the content ids
+        :return: list of ids
+        """
+        try:
+            ids = [
+                int(pk) for pk in self.cleaned_data[IDS_FIELD].split(',')
+                if pk.strip()
+            ]
+        except ValueError:
+            raise forms.ValidationError(_('Invalid content id.'))
+        if not ids:
+            raise forms.ValidationError(_('No content ids.'))
+        if len(ids) > BulkReviewForm.MAX_IDS:
+            raise forms.ValidationError(
+                _('Too many content ids, maximum %(max)d.'),
+                params={'max': BulkReviewForm.MAX_IDS})
+        return ids
+
+
+class ReviewClaimForm(forms.Form):
+    """
+    Form to claim content pending review.
+    """
+
+    COUNT_FF = CLAIM_COUNT_FIELD
+
+    MAX_COUNT: int = 100
+
+    count = forms.IntegerField(
+        min_value=1, max_value=MAX_COUNT, required=False,
+        help_text='Number of items to claim.')
+
+    def clean_count(self) -> int:
+        """
+        Validate the number of items to claim
+        :return: number of items, default 1
+        """
+        count = self.cleaned_data[CLAIM_COUNT_FIELD]
+        return 1 if count is None else count
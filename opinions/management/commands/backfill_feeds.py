@@ -0,0 +1,61 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from django.core.management.base import BaseCommand
+
+from opinions.feeds import rebuild_author_feeds
+from opinions.models import Opinion
+from user.models import User
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the following feed entries from the opinions of all authors
+    """
+    help = 'Rebuild the following feed entries from the published ' \
+           'opinions of all authors'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--author', action='append', default=[],
+            help='Username of author to rebuild feeds for; may be '
+                 'repeated; default all')
+
+    def handle(self, *args, **options):
+        authors = User.objects.filter(**{
+            f'{User.id_field()}__in': Opinion.objects.values(
+                Opinion.USER_FIELD)
+        }).order_by(User.id_field())
+        if options['author']:
+            authors = authors.filter(**{
+                f'{User.USERNAME_FIELD}__in': options['author']
+            })
+
+        author_count = 0
+        opinion_count = 0
+        for author in authors.iterator():
+            author_count += 1
+            opinion_count += rebuild_author_feeds(author)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Feeds rebuilt: {author_count} authors, '
+            f'{opinion_count} opinions'))
@@ -0,0 +1,99 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from opinions.benchmark import (
+    run_benchmark, compare_runs, BenchmarkRun, SCENARIO_NAMES,
+    DEFAULT_REPEAT, DEFAULT_WARMUP, DEFAULT_THRESHOLD
+)
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the hot views against the current database
+    """
+    help = 'Benchmark the hot views, recording wall time, SQL query ' \
+           'count and time, and response size'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario', action='append', default=[],
+            choices=SCENARIO_NAMES,
+            help='Scenario to run; may be repeated; default all')
+        parser.add_argument(
+            '--user', help='Username of user making requests; default the '
+                           'user following the most authors')
+        parser.add_argument(
+            '--repeat', type=int, default=DEFAULT_REPEAT,
+            help=f'Number of measured runs per scenario; '
+                 f'default {DEFAULT_REPEAT}')
+        parser.add_argument(
+            '--warmup', type=int, default=DEFAULT_WARMUP,
+            help=f'Number of unmeasured runs per scenario; '
+                 f'default {DEFAULT_WARMUP}')
+        parser.add_argument(
+            '--output', help='Path of json file to save results to')
+        parser.add_argument(
+            '--baseline',
+            help='Path of json file of baseline results to compare to')
+        parser.add_argument(
+            '--threshold', type=float, default=DEFAULT_THRESHOLD,
+            help=f'Relative increase in time or size flagged as a '
+                 f'regression; default {DEFAULT_THRESHOLD}')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            baseline = BenchmarkRun.from_json(
+                Path(options['baseline']).read_text())
+
+        try:
+            run = run_benchmark(
+                scenarios=options['scenario'], username=options['user'],
+                repeat=options['repeat'], warmup=options['warmup'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(
+            f'{"scenario":<20}{"status":>7}{"wall ms":>10}{"queries":>9}'
+            f'{"sql ms":>10}{"bytes":>10}')
+        for result in run.results.values():
+            self.stdout.write(
+                f'{result.name:<20}{result.status:>7}{result.wall_ms:>10.1f}'
+                f'{result.queries:>9}{result.sql_ms:>10.1f}'
+                f'{result.size:>10}')
+
+        if options['output']:
+            Path(options['output']).write_text(run.to_json())
+
+        if baseline:
+            regressions = compare_runs(
+                run, baseline, threshold=options['threshold'])
+            for regression in regressions:
+                self.stdout.write(self.style.WARNING(str(regression)))
+            if regressions:
+                raise CommandError(
+                    f'{len(regressions)} regression(s) from baseline')
+            self.stdout.write(self.style.SUCCESS('No regressions'))
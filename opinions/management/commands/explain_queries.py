@@ -0,0 +1,202 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import QuerySet
+
+from categories import STATUS_PUBLISHED
+from categories.registry import status_id
+from opinions.constants import SEARCH_QUERY, ORDER_QUERY
+from opinions.enums import OpinionSortOrder, PerPage, QueryArg
+from opinions.models import (
+    Opinion, Comment, Review, AgreementStatus, HideStatus, FeedEntry
+)
+from opinions.queries import followed_author_publications
+from opinions.query_params import QuerySetParams
+from opinions.text_search import text_search_query
+from opinions.views.opinion_list import OpinionList
+from user.models import User
+from utils import DESC_LOOKUP
+
+INDEXED_MODELS = [
+    Opinion, Comment, Review, AgreementStatus, HideStatus, FeedEntry
+]
+""" Models whose Meta.indexes are dropped for the 'without' plans """
+SAMPLE_SIZE = 20
+""" Number of opinions used for id lookups """
+
+
+def explain(query: QuerySet, label: str, **options) -> str:
+    """
+    Get the execution plan of a query
+    :param query: query set to explain
+    :param label: label appended to the statement
+    :param options: explain options
+    :return: plan
+    """
+    sql, params = query.query.sql_with_params()
+    prefix = connection.ops.explain_query_prefix(**options)
+    with connection.cursor() as cursor:
+        # the label makes the statement text unique, so a plan prepared
+        # before the indexes were dropped is not reused
+        cursor.execute(f'{prefix} {sql} -- {label}', params)
+        return '\n'.join(
+            ' '.join(str(column) for column in row)
+            for row in cursor.fetchall()
+        )
+
+
+def list_query(query: QuerySet, order: OpinionSortOrder) -> QuerySet:
+    """
+    Get the first page of the opinion list, ordered as by the list view
+    :param query: query set to order
+    :param order: sort order
+    :return: query set
+    """
+    view = OpinionList()
+    view.queryset = query
+    view.set_ordering({ORDER_QUERY: QueryArg(order, True)})
+    return query.order_by(*view.get_ordering())[:PerPage.DEFAULT.arg]
+
+
+def hot_queries(user: User, opinion: Opinion, term: str) -> dict:
+    """
+    Get the hot path list and search queries
+    :param user: user to query for
+    :param opinion: opinion to query comments of
+    :param term: search term
+    :return: dict of query set by description
+    """
+    published = Opinion.objects.filter(**{
+        Opinion.STATUS_FIELD: status_id(STATUS_PUBLISHED)
+    })
+    ids = list(
+        published.values_list(Opinion.id_field(), flat=True)[:SAMPLE_SIZE])
+
+    search_params = QuerySetParams()
+    text_search_query(search_params, SEARCH_QUERY, Opinion, [term])
+
+    return {
+        'Opinion list, newest first': list_query(
+            published, OpinionSortOrder.NEWEST),
+        'Opinion list, title A-Z': list_query(
+            published, OpinionSortOrder.TITLE_AZ),
+        'Opinion list, author A-Z': list_query(
+            published, OpinionSortOrder.AUTHOR_AZ),
+        'Opinion search': search_params.apply(published),
+        'Following feed': followed_author_publications(user).order_by(
+            f'{DESC_LOOKUP}{Opinion.PUBLISHED_FIELD}'),
+        'Current review of opinion': Review.objects.filter(**{
+            Review.OPINION_FIELD: opinion,
+            Review.IS_CURRENT_FIELD: True
+        }).order_by(f'{DESC_LOOKUP}{Review.UPDATED_FIELD}'),
+        'Agreement status': AgreementStatus.objects.filter(**{
+            AgreementStatus.USER_FIELD: user,
+            f'{AgreementStatus.OPINION_FIELD}__in': ids
+        }),
+        'Hide status': HideStatus.objects.filter(**{
+            HideStatus.USER_FIELD: user,
+            f'{HideStatus.OPINION_FIELD}__in': ids
+        }),
+        'Comment tree, first level': Comment.objects.filter(**{
+            Comment.OPINION_FIELD: opinion,
+            Comment.PARENT_FIELD: Comment.NO_PARENT
+        }).order_by(Comment.id_field()),
+    }
+
+
+class Command(BaseCommand):
+    """
+    EXPLAIN the hot path list and search queries, with and without the
+    declared model indexes
+    """
+    help = 'EXPLAIN the hot path list and search queries with and without ' \
+           'the declared model indexes. The indexes are dropped inside a ' \
+           'transaction which is rolled back; on PostgreSQL this locks ' \
+           'the tables, so do not run against a live database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', help='Username of user to query for; default first '
+                           'user with followed authors')
+        parser.add_argument(
+            '--term', default='opinion',
+            help='Search term; default "opinion"')
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='Execute the queries and report actual timings '
+                 '(PostgreSQL only)')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(**{
+                User.USERNAME_FIELD: options['user']
+            }).first()
+        else:
+            user = User.objects.filter(**{
+                'followstatus__isnull': False
+            }).first() or User.objects.first()
+        opinion = Opinion.objects.filter(**{
+            'comment__isnull': False
+        }).first() or Opinion.objects.first()
+        if user is None or opinion is None:
+            raise CommandError('No users or opinions to query')
+
+        explain_options = {
+            'analyze': True
+        } if options['analyze'] and connection.vendor == 'postgresql' \
+            else {}
+
+        index_names = [
+            index.name for model in INDEXED_MODELS
+            for index in model._meta.indexes
+        ]
+
+        def explain_all(label: str) -> dict:
+            return {
+                description: explain(query, label, **explain_options)
+                for description, query in hot_queries(
+                    user, opinion, options['term']).items()
+            }
+
+        with transaction.atomic():
+            with_plans = explain_all('with indexes')
+            with connection.cursor() as cursor:
+                for name in index_names:
+                    cursor.execute(
+                        f'DROP INDEX {connection.ops.quote_name(name)}')
+            without_plans = explain_all('without indexes')
+            # restore indexes
+            transaction.set_rollback(True)
+
+        for description, plan in with_plans.items():
+            used = [name for name in index_names if name in plan]
+            self.stdout.write(self.style.MIGRATE_HEADING(description))
+            self.stdout.write('-- without indexes')
+            self.stdout.write(without_plans[description])
+            self.stdout.write('-- with indexes')
+            self.stdout.write(plan)
+            self.stdout.write(
+                self.style.SUCCESS(f'uses: {", ".join(used)}') if used else
+                self.style.WARNING('uses: no declared index'))
+            self.stdout.write('')
@@ -0,0 +1,70 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand
+
+from opinions.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    """
+    Generate a reproducible synthetic data set for load and benchmark
+    testing
+    """
+    help = 'Generate reproducible synthetic users, opinions, comment ' \
+           'trees, reactions, follows and reviews'
+
+    def add_arguments(self, parser):
+        defaults = SyntheticConfig()
+        for field, help_text in [
+            ('users', 'Number of users'),
+            ('moderators', 'Number of users who are also moderators'),
+            ('opinions', 'Number of opinions'),
+            ('comments', 'Number of comments'),
+            ('max_depth', 'Maximum comment reply depth'),
+            ('reply_ratio', 'Ratio of comments which are replies'),
+            ('reactions', 'Mean reactions per opinion/comment'),
+            ('follows', 'Mean authors followed per user'),
+            ('reported', 'Ratio of content reported for review'),
+            ('password', 'Password of all users'),
+            ('seed', 'Random number generator seed'),
+            ('batch_size', 'Number of rows per table per bulk insert'),
+        ]:
+            default = getattr(defaults, field)
+            parser.add_argument(
+                f'--{field.replace("_", "-")}', type=type(default),
+                default=default, help=f'{help_text}; default {default}')
+
+    def handle(self, *args, **options):
+        config = SyntheticConfig(**{
+            field.name: options[field.name]
+            for field in fields(SyntheticConfig)
+        })
+        counts = SyntheticDataGenerator(
+            config, progress=self.stdout.write).generate()
+
+        self.stdout.write(self.style.SUCCESS(
+            'Generated: ' + ', '.join([
+                f'{count} {name}' for name, count in counts.items()
+            ])))
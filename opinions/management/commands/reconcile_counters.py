@@ -0,0 +1,92 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from django.core.management.base import BaseCommand
+
+from opinions.counters import reconcile_counters
+from opinions.models import Opinion, Comment
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    """
+    Recompute the denormalised opinion/comment counters and report drift
+    """
+    help = 'Recompute the denormalised opinion/comment counters and ' \
+           'report any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f'Number of content items per batch; '
+                 f'default {DEFAULT_BATCH_SIZE}')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report drift without updating counters')
+        parser.add_argument(
+            '--model', choices=[
+                Opinion.model_name(), Comment.model_name()
+            ], help='Model to reconcile; default all')
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        fix = not options['dry_run']
+
+        for model in [Opinion, Comment]:
+            if options['model'] and options['model'] != model.model_name():
+                continue
+
+            checked = 0
+            drift_count = 0
+            last_id = 0
+            while True:
+                ids = list(
+                    model.objects.filter(**{
+                        f'{model.id_field()}__gt': last_id
+                    }).order_by(model.id_field()).values_list(
+                        model.id_field(), flat=True)[:batch_size]
+                )
+                if not ids:
+                    break
+                checked += len(ids)
+                last_id = ids[-1]
+
+                drift = reconcile_counters(model, ids, fix=fix)
+                drift_count += len(drift)
+                for pk, differences in drift.items():
+                    self.stdout.write(
+                        f'{model.model_name_caps()} {pk}: ' + ', '.join([
+                            f'{field} {stored} -> {actual}'
+                            for field, (stored, actual) in
+                            differences.items()
+                        ])
+                    )
+
+            message = f'{model.model_name_caps()}: {checked} checked, ' \
+                      f'{drift_count} with drift'
+            if drift_count and fix:
+                message = f'{message}, fixed'
+            self.stdout.write(
+                self.style.WARNING(message) if drift_count else
+                self.style.SUCCESS(message)
+            )
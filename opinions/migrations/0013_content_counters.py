@@ -0,0 +1,67 @@
+# Generated by Django 4.2.2 on 2026-10-16 23:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opinions', '0012_review_is_current'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='agree_count',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='agree count'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='disagree_count',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='disagree count'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='hide_count',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='hide count'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='reply count'),
+        ),
+        migrations.AddField(
+            model_name='opinion',
+            name='agree_count',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='agree count'),
+        ),
+        migrations.AddField(
+            model_name='opinion',
+            name='comment_count',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='comment count'),
+        ),
+        migrations.AddField(
+            model_name='opinion',
+            name='disagree_count',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='disagree count'),
+        ),
+        migrations.AddField(
+            model_name='opinion',
+            name='hide_count',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='hide count'),
+        ),
+        migrations.AddField(
+            model_name='opinion',
+            name='pin_count',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='pin count'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.2 on 2026-10-16 23:40
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Count
+from django.db.models.functions import Coalesce
+
+STATUS_DELETED = 'Deleted'
+REACTION_AGREE = 'Agree'
+REACTION_DISAGREE = 'Disagree'
+
+
+def count_of(model, field, exclude=None, **kwargs):
+    """ Count subquery of entries of `model` referencing outer content """
+    query = model.objects.filter(**{field: OuterRef('id')}, **kwargs)
+    if exclude:
+        query = query.exclude(**exclude)
+    return Coalesce(
+        Subquery(
+            query.order_by().values(field).annotate(
+                count=Count('id')).values('count')
+        ), 0
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    """ Set the initial values of the content counters """
+    opinion = apps.get_model('opinions', 'Opinion')
+    comment = apps.get_model('opinions', 'Comment')
+    agreement = apps.get_model('opinions', 'AgreementStatus')
+    hide = apps.get_model('opinions', 'HideStatus')
+    pin = apps.get_model('opinions', 'PinStatus')
+
+    not_deleted = {'status__name': STATUS_DELETED}
+    for model, field in [(opinion, 'opinion'), (comment, 'comment')]:
+        counts = {
+            'agree_count': count_of(
+                agreement, field, status__name=REACTION_AGREE),
+            'disagree_count': count_of(
+                agreement, field, status__name=REACTION_DISAGREE),
+            'hide_count': count_of(hide, field),
+        }
+        if model == opinion:
+            counts.update({
+                'comment_count': count_of(
+                    comment, 'opinion', exclude=not_deleted),
+                'pin_count': count_of(pin, 'opinion'),
+            })
+        else:
+            counts.update({
+                'reply_count': count_of(
+                    comment, 'parent', exclude=not_deleted),
+            })
+        model.objects.update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opinions', '0013_content_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
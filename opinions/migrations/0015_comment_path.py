@@ -0,0 +1,26 @@
+# Generated by Django 4.2.2 on 2026-10-16 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opinions', '0014_backfill_content_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(
+                blank=True, db_index=True, default='', max_length=1300,
+                verbose_name='path'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(
+                fields=['parent', 'id'],
+                name='opinions_co_parent_ebe3b1_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.2 on 2026-10-16 23:45
+
+from django.db import migrations
+
+NO_PARENT = 0
+PATH_SEPARATOR = '/'
+PATH_SEGMENT_LEN = 12
+BATCH_SIZE = 500
+
+
+def backfill_paths(apps, schema_editor):
+    """ Set the paths of existing comments, a level at a time """
+    comment = apps.get_model('opinions', 'Comment')
+
+    # comments on opinions have an empty path, so start from the level below
+    parent_paths = {
+        pk: f'{pk:0{PATH_SEGMENT_LEN}d}{PATH_SEPARATOR}'
+        for pk in comment.objects.filter(
+            parent=NO_PARENT).values_list('id', flat=True)
+    }
+    while parent_paths:
+        level_paths = {}
+        parent_ids = list(parent_paths.keys())
+        for start in range(0, len(parent_ids), BATCH_SIZE):
+            batch = list(
+                comment.objects.filter(
+                    parent__in=parent_ids[start:start + BATCH_SIZE]
+                ).only('id', 'parent')
+            )
+            for entry in batch:
+                entry.path = parent_paths[entry.parent]
+                level_paths[entry.id] = f'{entry.path}' \
+                    f'{entry.id:0{PATH_SEGMENT_LEN}d}{PATH_SEPARATOR}'
+            comment.objects.bulk_update(batch, ['path'], batch_size=BATCH_SIZE)
+        parent_paths = level_paths
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opinions', '0015_comment_path'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.2 on 2026-10-17 00:06
+
+from django.db import migrations
+
+# search fields of the content tables
+SEARCH_FIELDS = {
+    'opinions_opinion': ['title', 'content'],
+    'opinions_comment': ['content'],
+}
+SEARCH_WEIGHTS = {
+    'title': 'A',
+    'content': 'B',
+}
+SEARCH_CONFIG = 'english'
+
+
+def create_search_index(apps, schema_editor):
+    """ Create and populate the text search index of opinions & comments """
+    vendor = schema_editor.connection.vendor
+    for table, fields in SEARCH_FIELDS.items():
+        if vendor == 'postgresql':
+            vector = ' || '.join([
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+                f"coalesce({field}, '')), '{SEARCH_WEIGHTS[field]}')"
+                for field in fields
+            ])
+            schema_editor.execute(
+                f'UPDATE {table} SET search_vector = {vector}')
+            schema_editor.execute(
+                f'CREATE INDEX {table}_search_vector_gin ON {table} '
+                f'USING gin (search_vector)')
+        elif vendor == 'sqlite':
+            columns = ', '.join(fields)
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE {table}_fts USING fts5('
+                f"{columns}, tokenize = 'porter unicode61')")
+            schema_editor.execute(
+                f'INSERT INTO {table}_fts(rowid, {columns}) '
+                f'SELECT id, {columns} FROM {table}')
+
+
+def drop_search_index(apps, schema_editor):
+    """ Drop the text search index of opinions & comments """
+    vendor = schema_editor.connection.vendor
+    for table in SEARCH_FIELDS:
+        if vendor == 'postgresql':
+            schema_editor.execute(
+                f'DROP INDEX IF EXISTS {table}_search_vector_gin')
+        elif vendor == 'sqlite':
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opinions', '0017_content_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.2 on 2026-10-17 01:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import utils.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('opinions', '0018_content_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True, primary_key=True, serialize=False,
+                    verbose_name='ID')),
+                ('published', models.DateTimeField()),
+                ('author', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('opinion', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='feed_entries', to='opinions.opinion')),
+                ('user', models.ForeignKey(
+                    blank=True, null=True,
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='feed_entries',
+                    to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['user', '-published'],
+                                 name='opinions_fe_user_id_67a0fa_idx'),
+                    models.Index(fields=['author', 'user'],
+                                 name='opinions_fe_author__0d3729_idx')
+                ],
+            },
+            bases=(utils.models.ModelMixin, models.Model),
+        ),
+        migrations.AddConstraint(
+            model_name='feedentry',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'opinion'), name='unique_feed_entry'),
+        ),
+        migrations.AddConstraint(
+            model_name='feedentry',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('user__isnull', True)),
+                fields=('opinion',), name='unique_feed_broadcast'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.2 on 2026-10-17 01:16
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opinions', '0019_feedentry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(
+                fields=['opinion', 'parent', 'id'],
+                name='opinions_co_opinion_ef63fa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opinion',
+            index=models.Index(
+                fields=['status', 'published'],
+                name='opinions_op_status__3e7618_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opinion',
+            index=models.Index(
+                django.db.models.functions.text.Lower('title'),
+                name='opinion_title_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(
+                fields=['opinion', 'is_current', 'updated'],
+                name='opinions_re_opinion_24e234_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(
+                fields=['comment', 'is_current', 'updated'],
+                name='opinions_re_comment_fac47e_idx'),
+        ),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 4.2.2 on 2026-10-17 01:45
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Count
+from django.db.models.functions import Coalesce
+
+UNIQUE_FIELDS = [
+    ('AgreementStatus', ['user', 'opinion']),
+    ('AgreementStatus', ['user', 'comment']),
+    ('HideStatus', ['user', 'opinion']),
+    ('HideStatus', ['user', 'comment']),
+    ('PinStatus', ['user', 'opinion']),
+    ('FollowStatus', ['user', 'author']),
+]
+
+
+REACTION_AGREE = 'Agree'
+REACTION_DISAGREE = 'Disagree'
+
+# reaction models and their content fields contributing to content counters
+COUNTED_REACTIONS = {
+    'AgreementStatus': ['opinion', 'comment'],
+    'HideStatus': ['opinion', 'comment'],
+    'PinStatus': ['opinion'],
+}
+
+
+def count_of(model, field, **kwargs):
+    """ Count subquery of entries of `model` referencing outer content """
+    query = model.objects.filter(**{field: OuterRef('id')}, **kwargs)
+    return Coalesce(
+        Subquery(
+            query.order_by().values(field).annotate(
+                count=Count('id')).values('count')
+        ), 0
+    )
+
+
+def recount_reactions(apps, affected):
+    """
+    Recompute the reaction counters of content, as per
+    opinions.counters.reconcile_counters
+    :param apps: app registry
+    :param affected: dict of content ids with content field as key
+    """
+    agreement = apps.get_model('opinions', 'AgreementStatus')
+    hide = apps.get_model('opinions', 'HideStatus')
+    pin = apps.get_model('opinions', 'PinStatus')
+
+    for field, ids in affected.items():
+        if not ids:
+            continue
+        model = apps.get_model('opinions', field.capitalize())
+        counts = {
+            'agree_count': count_of(
+                agreement, field, status__name=REACTION_AGREE),
+            'disagree_count': count_of(
+                agreement, field, status__name=REACTION_DISAGREE),
+            'hide_count': count_of(hide, field),
+        }
+        if field == 'opinion':
+            counts['pin_count'] = count_of(pin, 'opinion')
+        model.objects.filter(id__in=ids).update(**counts)
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Remove duplicate reactions, keeping the latest, and recompute the
+    counters of the affected content
+    """
+    affected = {'opinion': set(), 'comment': set()}
+    for model_name, fields in UNIQUE_FIELDS:
+        model = apps.get_model('opinions', model_name)
+        reactions = model.objects.filter(**{
+            f'{field}__isnull': False for field in fields
+        })
+        latest = reactions.values(*fields).annotate(
+            latest=models.Max('id')).values_list('latest', flat=True)
+        duplicates = reactions.exclude(id__in=latest)
+
+        for field in COUNTED_REACTIONS.get(model_name, []):
+            if field in fields:
+                affected[field].update(
+                    duplicates.order_by().values_list(
+                        field, flat=True).distinct())
+
+        duplicates.delete()
+
+    recount_reactions(apps, affected)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opinions', '0020_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='agreementstatus',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'opinion'), name='unique_agreement_opinion'),
+        ),
+        migrations.AddConstraint(
+            model_name='agreementstatus',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'comment'), name='unique_agreement_comment'),
+        ),
+        migrations.AddConstraint(
+            model_name='followstatus',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_follow'),
+        ),
+        migrations.AddConstraint(
+            model_name='hidestatus',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'opinion'), name='unique_hide_opinion'),
+        ),
+        migrations.AddConstraint(
+            model_name='hidestatus',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'comment'), name='unique_hide_comment'),
+        ),
+        migrations.AddConstraint(
+            model_name='pinstatus',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'opinion'), name='unique_pin_opinion'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.2 on 2026-10-17 01:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+CONTENT_FIELDS = [
+    ('Opinion', 'opinion'),
+    ('Comment', 'comment'),
+]
+# status priority in ascending order, as per QueryStatus.ordinal_list()
+STATUS_PRIORITY = [
+    'Draft', 'Preview', 'Published', 'Pending Review', 'Under Review',
+    'Withdrawn', 'Acceptable', 'Unacceptable'
+]
+
+
+def set_review_state(apps, schema_editor):
+    """
+    Set review state of content from its current review records, using the
+    highest priority status of the current records
+    """
+    review_model = apps.get_model('opinions', 'Review')
+    for model_name, content_field in CONTENT_FIELDS:
+        model = apps.get_model('opinions', model_name)
+
+        review_status = {}
+        for content_id, status_id, name in review_model.objects.filter(**{
+            f'{content_field}__isnull': False,
+            'is_current': True,
+            'status__name__in': STATUS_PRIORITY,
+        }).order_by().values_list(content_field, 'status', 'status__name'):
+            priority = STATUS_PRIORITY.index(name)
+            if priority > review_status.get(content_id, (-1, None))[0]:
+                review_status[content_id] = (priority, status_id)
+
+        by_status = {}
+        for content_id, (_, status_id) in review_status.items():
+            by_status.setdefault(status_id, []).append(content_id)
+        for status_id, ids in by_status.items():
+            model.objects.filter(id__in=ids).update(
+                review_status=status_id, reported=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0008_rename_approved_rejected'),
+        ('opinions', '0021_reaction_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='reported',
+            field=models.BooleanField(default=False, verbose_name='reported'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='review_status',
+            field=models.ForeignKey(
+                blank=True, null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+', to='categories.status'),
+        ),
+        migrations.AddField(
+            model_name='opinion',
+            name='reported',
+            field=models.BooleanField(default=False, verbose_name='reported'),
+        ),
+        migrations.AddField(
+            model_name='opinion',
+            name='review_status',
+            field=models.ForeignKey(
+                blank=True, null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+', to='categories.status'),
+        ),
+        migrations.RunPython(set_review_state, migrations.RunPython.noop),
+    ]
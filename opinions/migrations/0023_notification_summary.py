@@ -0,0 +1,34 @@
+# Generated by Django 4.2.2 on 2026-10-17 03:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import utils.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('opinions', '0022_review_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationSummary',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True, primary_key=True, serialize=False,
+                    verbose_name='ID')),
+                ('since', models.DateTimeField(blank=True, null=True)),
+                ('tagged_count', models.PositiveIntegerField(default=0)),
+                ('opinion_reviews', models.PositiveIntegerField(default=0)),
+                ('comment_reviews', models.PositiveIntegerField(default=0)),
+                ('created', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            bases=(utils.models.ModelMixin, models.Model),
+        ),
+    ]
@@ -23,7 +23,9 @@
 from datetime import datetime, MINYEAR, timezone
 from typing import Type, Optional
 
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.html import strip_tags
 from django.utils.translation import gettext_lazy as _
 from django.template.defaultfilters import truncatechars
@@ -34,10 +36,15 @@ from utils import SlugMixin, ModelMixin, ModelFacadeMixin
 from .constants import (
     ID_FIELD, TITLE_FIELD, CONTENT_FIELD, EXCERPT_FIELD, CATEGORIES_FIELD,
     STATUS_FIELD, USER_FIELD, SLUG_FIELD, CREATED_FIELD, UPDATED_FIELD,
-    PUBLISHED_FIELD, PARENT_FIELD, LEVEL_FIELD, IS_CURRENT_FIELD,
+    PUBLISHED_FIELD, PARENT_FIELD, LEVEL_FIELD, PATH_FIELD,
+    IS_CURRENT_FIELD,
     OPINION_FIELD, REQUESTED_FIELD, REASON_FIELD,
     REVIEWER_FIELD, COMMENT_FIELD, RESOLVED_FIELD, CLOSE_REVIEW_PERM,
-    WITHDRAW_REVIEW_PERM, AUTHOR_FIELD
+    WITHDRAW_REVIEW_PERM, AUTHOR_FIELD, COMMENT_COUNT_FIELD,
+    REPLY_COUNT_FIELD, AGREE_COUNT_FIELD, DISAGREE_COUNT_FIELD,
+    HIDE_COUNT_FIELD, PIN_COUNT_FIELD, SEARCH_VECTOR_FIELD,
+    REVIEW_STATUS_FIELD, REPORTED_FIELD, SINCE_FIELD, TAGGED_COUNT_FIELD,
+    OPINION_REVIEWS_FIELD, COMMENT_REVIEWS_FIELD
 )
 
 
@@ -55,6 +62,14 @@ class Opinion(ModelFacadeMixin, ModelMixin, SlugMixin, models.Model):
     CREATED_FIELD = CREATED_FIELD
     UPDATED_FIELD = UPDATED_FIELD
     PUBLISHED_FIELD = PUBLISHED_FIELD
+    COMMENT_COUNT_FIELD = COMMENT_COUNT_FIELD
+    AGREE_COUNT_FIELD = AGREE_COUNT_FIELD
+    DISAGREE_COUNT_FIELD = DISAGREE_COUNT_FIELD
+    HIDE_COUNT_FIELD = HIDE_COUNT_FIELD
+    PIN_COUNT_FIELD = PIN_COUNT_FIELD
+    SEARCH_VECTOR_FIELD = SEARCH_VECTOR_FIELD
+    REVIEW_STATUS_FIELD = REVIEW_STATUS_FIELD
+    REPORTED_FIELD = REPORTED_FIELD
     ALL_FIELDS = [
         ID_FIELD, TITLE_FIELD, CONTENT_FIELD, EXCERPT_FIELD,
         CATEGORIES_FIELD, STATUS_FIELD, USER_FIELD, SLUG_FIELD,
@@ -63,6 +78,10 @@ class Opinion(ModelFacadeMixin, ModelMixin, SlugMixin, models.Model):
 
     SEARCH_DATE_FIELD = PUBLISHED_FIELD
     DATE_FIELDS = [CREATED_FIELD, UPDATED_FIELD, PUBLISHED_FIELD]
+    COUNTER_FIELDS = [
+        COMMENT_COUNT_FIELD, AGREE_COUNT_FIELD, DISAGREE_COUNT_FIELD,
+        HIDE_COUNT_FIELD, PIN_COUNT_FIELD
+    ]
 
     OPINION_ATTRIB_TITLE_MAX_LEN: int = 100
     OPINION_ATTRIB_CONTENT_MAX_LEN: int = 2500
@@ -96,12 +115,61 @@ class Opinion(ModelFacadeMixin, ModelMixin, SlugMixin, models.Model):
     published = models.DateTimeField(
         default=datetime(MINYEAR, 1, 1, tzinfo=timezone.utc))
 
+    # denormalised counters, maintained by the reaction/comment views
+    comment_count = models.PositiveIntegerField(
+        _('comment count'), default=0)
+    agree_count = models.PositiveIntegerField(_('agree count'), default=0)
+    disagree_count = models.PositiveIntegerField(
+        _('disagree count'), default=0)
+    hide_count = models.PositiveIntegerField(_('hide count'), default=0)
+    pin_count = models.PositiveIntegerField(_('pin count'), default=0)
+
+    # full-text search document, maintained by the search backend
+    # (only used with PostgreSQL, see opinions/text_search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # denormalised current review state, maintained by the review views,
+    # see opinions/review_state.py
+    review_status = models.ForeignKey(
+        Status, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='+')
+    reported = models.BooleanField(_('reported'), default=False)
+
     class Meta:
         ordering = [TITLE_FIELD]
+        indexes = [
+            # published opinions in date order
+            models.Index(fields=[STATUS_FIELD, PUBLISHED_FIELD]),
+            # case-insensitive title ordering, see
+            # ContentListMixin.get_ordering()
+            models.Index(Lower(TITLE_FIELD), name='opinion_title_lower_idx'),
+        ]
+
+    FEED_STATE_FIELDS = [
+        f'{STATUS_FIELD}_id', f'{REVIEW_STATUS_FIELD}_id', PUBLISHED_FIELD
+    ]
+    """ Attributes determining the following feed entries of an opinion """
 
     def __str__(self):
         return f'{truncatechars(self.title, 20)} {self.status.short_name}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # keep the loaded feed state to detect changes on save,
+        # see opinions/signals.py
+        instance.loaded_feed_state = instance.feed_state()
+        return instance
+
+    def feed_state(self) -> tuple:
+        """
+        Get the values which determine the following feed entries of this
+        opinion; deferred values are None
+        :return: tuple of values
+        """
+        return tuple(self.__dict__.get(attname)
+                     for attname in Opinion.FEED_STATE_FIELDS)
+
     def set_slug(self, title: str):
         """
         Set slug from specified title
@@ -124,24 +192,47 @@ class Comment(ModelFacadeMixin, ModelMixin, SlugMixin, models.Model):
 
     NO_PARENT = 0
     """ Value representing no parent """
+    NO_PATH = ''
+    """ Value representing the path of a comment with no parent """
+    PATH_SEPARATOR = '/'
+    PATH_SEGMENT_LEN = 12
+    """ Length of the zero-padded comment ids in a path """
+    MAX_LEVEL = 100
+    """
+    Maximum reply level, limited by the path length; replies to comments
+    at this level are added as siblings of the comment replied to
+    """
 
     # field names
     CONTENT_FIELD = CONTENT_FIELD
     OPINION_FIELD = OPINION_FIELD
     PARENT_FIELD = PARENT_FIELD
     LEVEL_FIELD = LEVEL_FIELD
+    PATH_FIELD = PATH_FIELD
     USER_FIELD = USER_FIELD
     STATUS_FIELD = STATUS_FIELD
     SLUG_FIELD = SLUG_FIELD
     CREATED_FIELD = CREATED_FIELD
     UPDATED_FIELD = UPDATED_FIELD
     PUBLISHED_FIELD = PUBLISHED_FIELD
+    REPLY_COUNT_FIELD = REPLY_COUNT_FIELD
+    AGREE_COUNT_FIELD = AGREE_COUNT_FIELD
+    DISAGREE_COUNT_FIELD = DISAGREE_COUNT_FIELD
+    HIDE_COUNT_FIELD = HIDE_COUNT_FIELD
+    SEARCH_VECTOR_FIELD = SEARCH_VECTOR_FIELD
+    REVIEW_STATUS_FIELD = REVIEW_STATUS_FIELD
+    REPORTED_FIELD = REPORTED_FIELD
 
     SEARCH_DATE_FIELD = PUBLISHED_FIELD
     DATE_FIELDS = [CREATED_FIELD, UPDATED_FIELD, PUBLISHED_FIELD]
+    COUNTER_FIELDS = [
+        REPLY_COUNT_FIELD, AGREE_COUNT_FIELD, DISAGREE_COUNT_FIELD,
+        HIDE_COUNT_FIELD
+    ]
 
     COMMENT_ATTRIB_CONTENT_MAX_LEN: int = 700
     COMMENT_ATTRIB_SLUG_MAX_LEN: int = Opinion.OPINION_ATTRIB_SLUG_MAX_LEN
+    COMMENT_ATTRIB_PATH_MAX_LEN: int = MAX_LEVEL * (PATH_SEGMENT_LEN + 1)
 
     content = models.CharField(
         _('content'), max_length=COMMENT_ATTRIB_CONTENT_MAX_LEN, blank=False)
@@ -155,6 +246,12 @@ class Comment(ModelFacadeMixin, ModelMixin, SlugMixin, models.Model):
 
     level = models.IntegerField(_('level'), default=0, blank=True)
 
+    # materialised path of ancestor ids, e.g. '000000000012/000000000034/'
+    # for a comment whose parent is 34 and grandparent is 12
+    path = models.CharField(
+        _('path'), max_length=COMMENT_ATTRIB_PATH_MAX_LEN, default=NO_PATH,
+        blank=True, db_index=True)
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
 
     status = models.ForeignKey(Status, on_delete=models.CASCADE)
@@ -168,12 +265,80 @@ class Comment(ModelFacadeMixin, ModelMixin, SlugMixin, models.Model):
     published = models.DateTimeField(
         default=datetime(MINYEAR, 1, 1, tzinfo=timezone.utc))
 
+    # denormalised counters, maintained by the reaction/comment views
+    reply_count = models.PositiveIntegerField(_('reply count'), default=0)
+    agree_count = models.PositiveIntegerField(_('agree count'), default=0)
+    disagree_count = models.PositiveIntegerField(
+        _('disagree count'), default=0)
+    hide_count = models.PositiveIntegerField(_('hide count'), default=0)
+
+    # full-text search document, maintained by the search backend
+    # (only used with PostgreSQL, see opinions/text_search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # denormalised current review state, maintained by the review views,
+    # see opinions/review_state.py
+    review_status = models.ForeignKey(
+        Status, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='+')
+    reported = models.BooleanField(_('reported'), default=False)
+
     class Meta:
         ordering = [ID_FIELD]
+        indexes = [
+            # replies to a comment in display order
+            models.Index(fields=[PARENT_FIELD, ID_FIELD]),
+            # comments on an opinion in display order
+            models.Index(fields=[OPINION_FIELD, PARENT_FIELD, ID_FIELD]),
+        ]
 
     def __str__(self):
         return f'{truncatechars(self.content, 20)} {self.status.short_name}'
 
+    @staticmethod
+    def path_segment(pk: int) -> str:
+        """
+        Get the path segment for the specified comment id
+        :param pk: comment id
+        :return: path segment
+        """
+        return f'{pk:0{Comment.PATH_SEGMENT_LEN}d}{Comment.PATH_SEPARATOR}'
+
+    @property
+    def descendant_path(self) -> str:
+        """ Path prefix shared by all descendants of this comment """
+        return f'{self.path}{Comment.path_segment(self.id)}'
+
+    @property
+    def ancestor_ids(self) -> list[int]:
+        """ Ids of the ancestors of this comment, top level first """
+        return [
+            int(segment) for segment in self.path.split(Comment.PATH_SEPARATOR)
+            if segment
+        ]
+
+    def set_hierarchy(self, parent: Optional['Comment'] = None):
+        """
+        Set the hierarchy fields for a comment on the specified parent.
+        Replies beyond the maximum level are flattened, see `MAX_LEVEL`
+        :param parent: parent comment; default None for comment on opinion
+        """
+        if parent and parent.level >= Comment.MAX_LEVEL:
+            # path is full, so flatten to a reply to the parent's parent
+            self.opinion = parent.opinion
+            self.level = parent.level
+            self.parent = parent.ancestor_ids[-1]
+            self.path = parent.path
+        elif parent:
+            self.opinion = parent.opinion
+            self.level = parent.level + 1
+            self.parent = parent.id
+            self.path = parent.descendant_path
+        else:
+            self.level = 0
+            self.parent = Comment.NO_PARENT
+            self.path = Comment.NO_PATH
+
     def set_slug(self, content: str):
         """
         Set slug from specified content
@@ -259,6 +424,13 @@ class Review(OpinionCommentMixin, ModelMixin, models.Model):
         default=datetime(MINYEAR, 1, 1, tzinfo=timezone.utc))
 
     class Meta:
+        indexes = [
+            # current review records of content, latest first
+            models.Index(
+                fields=[OPINION_FIELD, IS_CURRENT_FIELD, UPDATED_FIELD]),
+            models.Index(
+                fields=[COMMENT_FIELD, IS_CURRENT_FIELD, UPDATED_FIELD]),
+        ]
         # https://docs.djangoproject.com/en/4.1/ref/models/options/#permissions
         # list or tuple of 2-tuples in the format
         # (permission_code, human_readable_permission_name)
@@ -295,6 +467,17 @@ class AgreementStatus(OpinionCommentMixin, ModelMixin, models.Model):
 
     updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # one reaction per user per content
+            models.UniqueConstraint(
+                fields=[USER_FIELD, OPINION_FIELD],
+                name='unique_agreement_opinion'),
+            models.UniqueConstraint(
+                fields=[USER_FIELD, COMMENT_FIELD],
+                name='unique_agreement_comment'),
+        ]
+
     def __str__(self):
         return f'{self.opinion if self.opinion else self.comment} - ' \
                f'{self.status.short_name}'
@@ -319,6 +502,17 @@ class HideStatus(OpinionCommentMixin, ModelMixin, models.Model):
 
     updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # one reaction per user per content
+            models.UniqueConstraint(
+                fields=[USER_FIELD, OPINION_FIELD],
+                name='unique_hide_opinion'),
+            models.UniqueConstraint(
+                fields=[USER_FIELD, COMMENT_FIELD],
+                name='unique_hide_comment'),
+        ]
+
     def __str__(self):
         return f'Hide {self.opinion if self.opinion else self.comment}'
 
@@ -338,6 +532,13 @@ class PinStatus(ModelMixin, models.Model):
 
     updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=[USER_FIELD, OPINION_FIELD],
+                name='unique_pin_opinion'),
+        ]
+
     def __str__(self):
         return f'Pin {self.model_name()}[{self.id}]: {self.opinion}'
 
@@ -358,5 +559,93 @@ class FollowStatus(ModelMixin, models.Model):
 
     updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=[USER_FIELD, AUTHOR_FIELD],
+                name='unique_follow'),
+        ]
+
     def __str__(self):
         return f'{self.user} following {self.author}'
+
+
+class FeedEntry(ModelMixin, models.Model):
+    """
+    FeedEntry model; an opinion in the following feed of a user.
+    Entries without a user are read by all followers of the author, see
+    opinions/feeds.py.
+    """
+
+    # field names
+    USER_FIELD = USER_FIELD
+    OPINION_FIELD = OPINION_FIELD
+    AUTHOR_FIELD = AUTHOR_FIELD
+    PUBLISHED_FIELD = PUBLISHED_FIELD
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='feed_entries'
+    )
+
+    opinion = models.ForeignKey(
+        Opinion, on_delete=models.CASCADE, related_name='feed_entries'
+    )
+
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+'
+    )
+
+    published = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=[USER_FIELD, OPINION_FIELD],
+                name='unique_feed_entry'),
+            models.UniqueConstraint(
+                fields=[OPINION_FIELD],
+                condition=models.Q(**{f'{USER_FIELD}__isnull': True}),
+                name='unique_feed_broadcast'),
+        ]
+        indexes = [
+            # user's feed in publication order
+            models.Index(fields=[USER_FIELD, f'-{PUBLISHED_FIELD}']),
+            # unfollow pruning and author broadcasts
+            models.Index(fields=[AUTHOR_FIELD, USER_FIELD]),
+        ]
+
+    def __str__(self):
+        return f'{self.user} feed: {self.opinion}'
+
+
+class NotificationSummary(ModelMixin, models.Model):
+    """
+    NotificationSummary model; the login notification counts of a user,
+    generated in the background and displayed on the next page load, see
+    opinions/notifications.py.
+    """
+
+    # field names
+    USER_FIELD = USER_FIELD
+    SINCE_FIELD = SINCE_FIELD
+    TAGGED_COUNT_FIELD = TAGGED_COUNT_FIELD
+    OPINION_REVIEWS_FIELD = OPINION_REVIEWS_FIELD
+    COMMENT_REVIEWS_FIELD = COMMENT_REVIEWS_FIELD
+    CREATED_FIELD = CREATED_FIELD
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name='+'
+    )
+
+    # previous login of user, i.e. updates since; None for all
+    since = models.DateTimeField(null=True, blank=True)
+
+    tagged_count = models.PositiveIntegerField(default=0)
+    opinion_reviews = models.PositiveIntegerField(default=0)
+    comment_reviews = models.PositiveIntegerField(default=0)
+
+    created = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.user} notifications since {self.since}'
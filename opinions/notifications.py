@@ -20,19 +20,24 @@
 #  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 #  DEALINGS IN THE SOFTWARE.
 #
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
 from django.contrib import messages
-from django.http import HttpRequest
+from django.http import HttpRequest, HttpResponse
 from django.template.loader import render_to_string
+from django.utils import timezone
 
+from jobs.queue import job, enqueue
 from opinions.constants import (
     COUNT_CTX, OPINION_REVIEWS_CTX, COMMENT_REVIEWS_CTX, USER_CTX,
     TAGGED_COUNT_CTX
 )
-from opinions.models import Opinion, Comment
+from opinions.models import Opinion, Comment, NotificationSummary
 from opinions.queries import (
     followed_author_publications, own_content_status_changes
 )
-from soapbox import OPINIONS_APP_NAME, USER_APP_NAME
+from soapbox import OPINIONS_APP_NAME, USER_APP_NAME, GET
 from user.models import User
 from utils import app_template_path
 
@@ -45,40 +50,188 @@ NEW_USER_TEMPLATE = app_template_path(
     USER_APP_NAME, "snippet", "new_user_notification.html")
 
 
+NOTIFICATIONS_PENDING_SESSION_KEY = 'notifications_since'
+""" Session key of previous login of a user with pending notifications """
+NOTIFICATIONS_PENDING_AT_SESSION_KEY = 'notifications_pending_at'
+""" Session key of time at which notifications became pending """
+NOTIFICATIONS_PENDING_TIMEOUT = 60
+"""
+Time in seconds to wait for the notification summary to be generated in
+the background, after which it is generated during the request
+"""
+_NO_PREVIOUS_LOGIN = ''
+
+
 def process_login_opinions(request: HttpRequest, user: User):
     """
-    Process a user login
+    Process a user login.
+    The notifications are not generated during the login request, the
+    notification summary is generated by a background job and displayed
+    on the next page load after it is ready; see `NotificationMiddleware`.
     :param user: user which logged in
     :param request: http request
     """
+    if user and request is not None and hasattr(request, 'session'):
+        since = user.previous_login.isoformat() if user.previous_login \
+            else _NO_PREVIOUS_LOGIN
+        request.session[NOTIFICATIONS_PENDING_SESSION_KEY] = since
+        request.session[NOTIFICATIONS_PENDING_AT_SESSION_KEY] = \
+            timezone.now().isoformat()
+        # generate the summary in the background, ready for the next page
+        enqueue(generate_notification_summary, user_id=user.id, since=since)
+
+
+def parse_since(since: str) -> Optional[datetime]:
+    """
+    Parse a previous login as stored by `process_login_opinions`
+    :param since: iso format datetime or empty string for none
+    :return: datetime or None
+    """
+    return datetime.fromisoformat(since) \
+        if since != _NO_PREVIOUS_LOGIN else None
+
+
+@job
+def generate_notification_summary(user_id: int, since: str):
+    """
+    Job to generate and save the notification summary for a user
+    :param user_id: id of user
+    :param since: iso format datetime or empty string for none
+    """
+    user = User.objects.filter(**{
+        f'{User.id_field()}': user_id
+    }).first()
     if user:
-        # tagged author new opinions
-        query = followed_author_publications(user, since=user.previous_login)
-
-        context = {
-            USER_CTX: user,
-            TAGGED_COUNT_CTX: query.count() if query else 0
-        }
-
-        # content updates
-        for key, model in [
-            (OPINION_REVIEWS_CTX, Opinion), (COMMENT_REVIEWS_CTX, Comment)
-        ]:
-            query = own_content_status_changes(
-                model, user=user, since=user.previous_login)
-            context[key] = query.count() if query else 0
-
-        context[COUNT_CTX] = \
-            context[OPINION_REVIEWS_CTX] + context[COMMENT_REVIEWS_CTX]
-
-        for count, template in [
-            (TAGGED_COUNT_CTX, TAGGED_AUTHOR_TEMPLATE),
-            (COUNT_CTX, CONTENT_UPDATES_TEMPLATE),
-        ]:
-            if context[count]:
-                messages.info(
-                    request, render_to_string(template, context=context)
-                )
+        since = parse_since(since)
+        summary = notification_summary(user, since)
+        NotificationSummary.objects.update_or_create(**{
+            NotificationSummary.USER_FIELD: user
+        }, defaults={
+            NotificationSummary.SINCE_FIELD: since,
+            NotificationSummary.TAGGED_COUNT_FIELD: summary[TAGGED_COUNT_CTX],
+            NotificationSummary.OPINION_REVIEWS_FIELD:
+                summary[OPINION_REVIEWS_CTX],
+            NotificationSummary.COMMENT_REVIEWS_FIELD:
+                summary[COMMENT_REVIEWS_CTX],
+        })
+
+
+def notification_summary(user: User, since: Optional[datetime]) -> dict:
+    """
+    Generate the notification summary for a user, i.e. the number of new
+    opinions by followed authors and content review status changes
+    :param user: user
+    :param since: updates since datetime; None, i.e. all
+    :return: summary
+    """
+    # tagged author new opinions
+    query = followed_author_publications(user, since=since)
+
+    summary = {
+        TAGGED_COUNT_CTX: query.count() if query else 0
+    }
+
+    # content updates
+    for key, model in [
+        (OPINION_REVIEWS_CTX, Opinion), (COMMENT_REVIEWS_CTX, Comment)
+    ]:
+        query = own_content_status_changes(model, user=user, since=since)
+        summary[key] = query.count() if query else 0
+
+    summary[COUNT_CTX] = \
+        summary[OPINION_REVIEWS_CTX] + summary[COMMENT_REVIEWS_CTX]
+    return summary
+
+
+def take_notification_summary(
+        user: User, since: Optional[datetime]) -> Optional[dict]:
+    """
+    Get and remove the saved notification summary for a user
+    :param user: user
+    :param since: updates since datetime; None, i.e. all
+    :return: summary or None if not generated yet
+    """
+    saved = NotificationSummary.objects.filter(**{
+        NotificationSummary.USER_FIELD: user,
+        NotificationSummary.SINCE_FIELD: since,
+    } if since else {
+        NotificationSummary.USER_FIELD: user,
+        f'{NotificationSummary.SINCE_FIELD}__isnull': True,
+    }).first()
+    if saved is None:
+        return None
+    saved.delete()
+
+    return {
+        TAGGED_COUNT_CTX: saved.tagged_count,
+        OPINION_REVIEWS_CTX: saved.opinion_reviews,
+        COMMENT_REVIEWS_CTX: saved.comment_reviews,
+        COUNT_CTX: saved.opinion_reviews + saved.comment_reviews,
+    }
+
+
+def pending_timed_out(request: HttpRequest) -> bool:
+    """
+    Check if the wait for the notification summary to be generated in the
+    background has timed out, e.g. the job failed or no worker is running
+    :param request: http request
+    :return: True if timed out
+    """
+    pending_at = request.session.get(NOTIFICATIONS_PENDING_AT_SESSION_KEY)
+    return pending_at is None or \
+        datetime.fromisoformat(pending_at) + timedelta(
+            seconds=NOTIFICATIONS_PENDING_TIMEOUT) <= timezone.now()
+
+
+def process_pending_notifications(request: HttpRequest):
+    """
+    Display the login notifications for the request user, if pending and
+    the notification summary has been generated, or generate the summary
+    if the wait for it has timed out
+    :param request: http request
+    """
+    since = request.session.get(NOTIFICATIONS_PENDING_SESSION_KEY, None)
+    if since is None or not request.user.is_authenticated:
+        request.session.pop(NOTIFICATIONS_PENDING_SESSION_KEY, None)
+        request.session.pop(NOTIFICATIONS_PENDING_AT_SESSION_KEY, None)
+        return
+
+    since = parse_since(since)
+    context = take_notification_summary(request.user, since)
+    if context is None:
+        if not pending_timed_out(request):
+            return  # not generated yet, try again on the next page load
+        context = notification_summary(request.user, since)
+    del request.session[NOTIFICATIONS_PENDING_SESSION_KEY]
+    request.session.pop(NOTIFICATIONS_PENDING_AT_SESSION_KEY, None)
+    context[USER_CTX] = request.user
+
+    for count, template in [
+        (TAGGED_COUNT_CTX, TAGGED_AUTHOR_TEMPLATE),
+        (COUNT_CTX, CONTENT_UPDATES_TEMPLATE),
+    ]:
+        if context[count]:
+            messages.info(
+                request, render_to_string(template, context=context)
+            )
+
+
+class NotificationMiddleware:
+    """
+    Middleware displaying pending login notifications on the first page
+    load after login at which the notification summary is ready.
+    Must be placed after SessionMiddleware, AuthenticationMiddleware and
+    MessageMiddleware.
+    """
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if request.method == GET and \
+                request.headers.get('x-requested-with') != 'XMLHttpRequest' \
+                and NOTIFICATIONS_PENDING_SESSION_KEY in request.session:
+            process_pending_notifications(request)
+        return self.get_response(request)
 
 
 def process_register_new_user(request: HttpRequest, user: User):
@@ -23,20 +23,23 @@
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum, auto
+from functools import cached_property
 from typing import Optional, Union, Type, List
 
 from django.db import models
-from django.db.models import QuerySet, Q
+from django.db.models import QuerySet, Q, Exists, OuterRef
 
 from categories import STATUS_PUBLISHED
 from categories.constants import STATUS_DELETED
 from categories.models import Status
+from categories.registry import STATUS_REGISTRY, status_id, get_status
 from user.queries import is_moderator
 from user.models import User
 from utils import ModelFacadeMixin, ensure_list, DATE_NEWEST_LOOKUP
 from .enums import QueryStatus
 from .models import (
-    Opinion, PinStatus, Review, Comment, HideStatus, FollowStatus
+    Opinion, PinStatus, Review, Comment, HideStatus, FollowStatus,
+    AgreementStatus, FeedEntry
 )
 from .query_params import QuerySetParams
 
@@ -190,22 +193,36 @@ def get_content_status(
     hidden = StatusCheck.ALL in args or StatusCheck.HIDDEN in args
     deleted = StatusCheck.ALL in args or StatusCheck.DELETED in args
 
-    review_record = None
+    mod_view = is_moderator(current_user)
+    review_status = None
+    reviewer_id = None
     if reported or review_wip or viewable:
         # check if reported
-        query_args = {
-            Review.REQUESTED_FIELD: user
-        } if user else None
-        review_record = content_review_record(content, query_args=query_args)
-        reported = review_record is not None
+        if user:
+            # reported by a specific user, so check the user's review record
+            review_record = content_review_record(content, query_args={
+                Review.REQUESTED_FIELD: user
+            })
+            if review_record is not None:
+                review_status = STATUS_REGISTRY.name_of(
+                    review_record.status_id)
+                reviewer_id = review_record.reviewer_id
+        else:
+            review_status = content_review_state(content)
+            if review_status is not None and mod_view:
+                # only a moderator can be the assigned reviewer
+                reviewer_id = content_review_history(content).filter(**{
+                    f'{Review.IS_CURRENT_FIELD}': True
+                }).values_list(
+                    f'{Review.REVIEWER_FIELD}_id', flat=True).first()
+        reported = review_status is not None
         checked[StatusCheck.REPORTED] = True
 
         if review_wip:
             # review process under way if:
             # - status is review pending or under review
             # - status is review unacceptable, i.e. complaint upheld
-            review_wip = False if review_record is None else \
-                review_record.status.name in IN_REVIEW_STATUSES
+            review_wip = review_status in IN_REVIEW_STATUSES
             checked[StatusCheck.REVIEW_WIP] = True
 
         if viewable:
@@ -213,10 +230,8 @@ def get_content_status(
             # - not reported
             # - current user is a moderator
             # - status is review withdrawn or review acceptable
-            viewable = not reported or is_moderator(current_user)
-            if not viewable:
-                viewable = False if review_record is None else \
-                    review_record.status.name in REVIEW_OVER_STATUSES
+            viewable = not reported or mod_view or \
+                review_status in REVIEW_OVER_STATUSES
             checked[StatusCheck.VIEWABLE] = True
 
     if hidden:
@@ -239,13 +254,295 @@ def get_content_status(
         reported=reported, viewable=viewable, review_wip=review_wip,
         hidden=hidden,
         mine=content.user.id == current_user.id if current_user else False,
-        mod_view=is_moderator(current_user),
-        assigned_view=False if review_record is None else
-        review_record.reviewer == current_user,
+        mod_view=mod_view,
+        assigned_view=reported and current_user is not None and
+        reviewer_id == current_user.id,
         deleted=deleted
     )
 
 
+def content_status_check_bulk(
+        model: Type[ModelFacadeMixin], ids: List[int], user: User = None,
+        current_user: User = None) -> dict[int, ContentStatus]:
+    """
+    Check the status of multiple content items, using a fixed number of
+    queries regardless of the number of items.
+    Equivalent to calling `content_status_check` for each item.
+    :param model: model of content, i.e. Opinion or Comment
+    :param ids: ids of content to check
+    :param user: user to check with; default None, i.e. any user
+    :param current_user: user making request; default None
+    :return: dict of the form {
+                   key: content id
+                   value: ContentStatus
+               }
+    """
+    ids = list(ensure_list(ids))
+    if not ids:
+        return {}
+
+    model = model.lookup_clazz()
+    content_field = Review.content_field(model)
+
+    mod_view = is_moderator(current_user)
+    current_user_id = current_user.id if current_user else None
+
+    # content author, status and cached current review status
+    content_info = {}
+    cached_review_status = {}
+    for pk, user_id, status_pk, review_status_pk in model.objects.filter(**{
+        f'{model.id_field()}__in': ids
+    }).values_list(
+        model.id_field(), f'{model.USER_FIELD}_id',
+        f'{model.STATUS_FIELD}_id', f'{model.REVIEW_STATUS_FIELD}_id'
+    ):
+        content_info[pk] = (user_id, STATUS_REGISTRY.name_of(status_pk))
+        if review_status_pk is not None:
+            cached_review_status[pk] = \
+                STATUS_REGISTRY.name_of(review_status_pk)
+
+    # current review records are only required for the status with
+    # respect to a reporting user, or the assigned reviewer for moderators
+    review_records = {}
+    if user or (mod_view and cached_review_status):
+        # updated descending order so first is current
+        query_args = {
+            f'{content_field}__in':
+                ids if user else list(cached_review_status.keys()),
+            f'{Review.IS_CURRENT_FIELD}': True
+        }
+        if user:
+            query_args[Review.REQUESTED_FIELD] = user
+        for content_id, status_pk, reviewer_id in Review.objects.filter(
+            **query_args
+        ).order_by(
+            f'{DATE_NEWEST_LOOKUP}{Review.UPDATED_FIELD}'
+        ).values_list(
+            content_field, f'{Review.STATUS_FIELD}_id',
+            f'{Review.REVIEWER_FIELD}_id'
+        ):
+            review_records.setdefault(
+                content_id, (STATUS_REGISTRY.name_of(status_pk), reviewer_id))
+    if not user:
+        review_records = {
+            pk: (name, review_records.get(pk, (None, None))[1])
+            for pk, name in cached_review_status.items()
+        }
+
+    # hidden content
+    query_args = {
+        f'{HideStatus.content_field(model)}__in': ids
+    }
+    hide_user = user if user else current_user
+    if hide_user:
+        query_args[HideStatus.USER_FIELD] = hide_user
+    hidden_ids = set(
+        HideStatus.objects.filter(**query_args).values_list(
+            HideStatus.content_field(model), flat=True)
+    )
+
+    statuses = {}
+    for pk in ids:
+        review_status, reviewer_id = review_records.get(pk, (None, None))
+        reported = review_status is not None
+        author_id, content_status = content_info.get(pk, (None, None))
+
+        viewable = not reported or mod_view
+        if not viewable:
+            viewable = review_status in REVIEW_OVER_STATUSES
+
+        statuses[pk] = ContentStatus(
+            reported=reported, viewable=viewable,
+            review_wip=review_status in IN_REVIEW_STATUSES
+            if reported else False,
+            hidden=pk in hidden_ids,
+            mine=author_id == current_user_id if current_user else False,
+            mod_view=mod_view,
+            assigned_view=reported and reviewer_id == current_user_id,
+            deleted=content_status is None or
+            content_status == STATUS_DELETED
+        )
+
+    return statuses
+
+
+class ReactionState:
+    """
+    Reaction state of a set of opinions/comments with respect to a user.
+    Each status table is queried once for the whole set, the first time
+    a status from it is required.
+    """
+    user: Optional[User]
+    """ User to check with; None, i.e. any user """
+    opinion_ids: set[int]
+    """ Ids of opinions in set """
+    comment_ids: set[int]
+    """ Ids of comments in set """
+    author_ids: set[int]
+    """ Ids of authors of content in set """
+
+    def __init__(self, user: Optional[User],
+                 content: [Opinion, Comment, List[Union[Opinion, Comment]]]):
+        """
+        Constructor
+        :param user: user to check with; None, i.e. any user
+        :param content: opinion/comment or list thereof
+        """
+        self.user = user if user else None
+        self.opinion_ids = set()
+        self.comment_ids = set()
+        self.author_ids = set()
+        for item in ensure_list(content):
+            if isinstance(item, Opinion):
+                self.opinion_ids.add(item.id)
+            else:
+                self.comment_ids.add(item.id)
+            self.author_ids.add(item.user_id)
+
+    @staticmethod
+    def key(content: Union[Opinion, Comment]) -> tuple[str, int]:
+        """
+        Get the lookup key for the specified content
+        :param content: content to get key for
+        :return: key
+        """
+        return content.model_name(), content.id
+
+    def _user_args(self, user_field: str, query_args: dict = None) -> dict:
+        """ Add user to query args if required """
+        if query_args is None:
+            query_args = {}
+        if self.user:
+            query_args[user_field] = self.user
+        return query_args
+
+    def _content_q(self, model: Type[models.Model]) -> Q:
+        """ Get query for all content in set """
+        return Q(**{
+            f'{model.content_field(Opinion)}__in': self.opinion_ids
+        }) | Q(**{
+            f'{model.content_field(Comment)}__in': self.comment_ids
+        })
+
+    @staticmethod
+    def _content_keys(values) -> set[tuple[str, int]]:
+        """ Get set of keys from opinion id/comment id values list """
+        return {
+            (Opinion.model_name(), opinion_id) if opinion_id else
+            (Comment.model_name(), comment_id)
+            for opinion_id, comment_id in values
+        }
+
+    @cached_property
+    def deleted(self) -> set[tuple[str, int]]:
+        """ Keys of deleted content """
+        deleted = set()
+        for model, ids in [
+            (Opinion, self.opinion_ids), (Comment, self.comment_ids)
+        ]:
+            if ids:
+                # content which no longer exists is also deleted
+                deleted_id = status_id(STATUS_DELETED)
+                existing = {
+                    pk: status for pk, status in model.objects.filter(**{
+                        f'{model.id_field()}__in': ids
+                    }).values_list(
+                        model.id_field(), f'{model.STATUS_FIELD}_id')
+                }
+                deleted.update({
+                    (model.model_name(), pk) for pk in ids
+                    if existing.get(pk, deleted_id) == deleted_id
+                })
+        return deleted
+
+    @cached_property
+    def agreements(self) -> dict[tuple[str, int], str]:
+        """ Agreement status names of content """
+        agreements = {}
+        if self.user:
+            for opinion_id, comment_id, status in \
+                    AgreementStatus.objects.filter(
+                        self._content_q(AgreementStatus), **{
+                            AgreementStatus.USER_FIELD: self.user
+                        }).order_by(AgreementStatus.id_field()).values_list(
+                        f'{AgreementStatus.OPINION_FIELD}_id',
+                        f'{AgreementStatus.COMMENT_FIELD}_id',
+                        f'{AgreementStatus.STATUS_FIELD}_id'):
+                key = (Opinion.model_name(), opinion_id) if opinion_id else \
+                    (Comment.model_name(), comment_id)
+                agreements.setdefault(key, STATUS_REGISTRY.name_of(status))
+        return agreements
+
+    @cached_property
+    def pinned(self) -> set[int]:
+        """ Ids of pinned opinions """
+        return set(
+            PinStatus.objects.filter(**self._user_args(
+                PinStatus.USER_FIELD, {
+                    f'{PinStatus.OPINION_FIELD}__in': self.opinion_ids
+                })).values_list(PinStatus.OPINION_FIELD, flat=True)
+        ) if self.opinion_ids else set()
+
+    @cached_property
+    def following(self) -> set[int]:
+        """ Ids of followed authors """
+        return set(
+            FollowStatus.objects.filter(**self._user_args(
+                FollowStatus.USER_FIELD, {
+                    f'{FollowStatus.AUTHOR_FIELD}__in': self.author_ids
+                })).values_list(FollowStatus.AUTHOR_FIELD, flat=True)
+        ) if self.author_ids else set()
+
+    @cached_property
+    def hidden(self) -> set[tuple[str, int]]:
+        """ Keys of hidden content """
+        return self._content_keys(
+            HideStatus.objects.filter(
+                self._content_q(HideStatus),
+                **self._user_args(HideStatus.USER_FIELD)
+            ).values_list(
+                f'{HideStatus.OPINION_FIELD}_id',
+                f'{HideStatus.COMMENT_FIELD}_id')
+        )
+
+    @cached_property
+    def reported(self) -> set[tuple[str, int]]:
+        """ Keys of reported content """
+        return self._content_keys(
+            Review.objects.filter(
+                self._content_q(Review),
+                **self._user_args(Review.REQUESTED_FIELD, {
+                    f'{Review.IS_CURRENT_FIELD}': True
+                })
+            ).values_list(
+                f'{Review.OPINION_FIELD}_id', f'{Review.COMMENT_FIELD}_id')
+        )
+
+    def is_deleted(self, content: Union[Opinion, Comment]) -> bool:
+        """ Check if content is deleted """
+        return self.key(content) in self.deleted
+
+    def agreement(self, content: Union[Opinion, Comment]) -> Optional[str]:
+        """ Get agreement status name for content """
+        return self.agreements.get(self.key(content))
+
+    def is_pinned(self, content: Opinion) -> bool:
+        """ Check if opinion is pinned """
+        return isinstance(content, Opinion) and content.id in self.pinned
+
+    def is_following(self, content: Union[Opinion, Comment]) -> bool:
+        """ Check if content author is followed """
+        return content.user_id in self.following
+
+    def is_hidden(self, content: Union[Opinion, Comment]) -> bool:
+        """ Check if content is hidden """
+        return self.key(content) in self.hidden
+
+    def is_reported(self, content: Union[Opinion, Comment]) -> bool:
+        """ Check if content is reported """
+        return self.key(content) in self.reported
+
+
 def content_review_history(
     content: [Opinion, Comment], query_args: dict = None,
     order: str = f'{DATE_NEWEST_LOOKUP}{Review.UPDATED_FIELD}'
@@ -297,15 +594,31 @@ def content_review_record(
     }).first()
 
 
+def content_review_state(content: [Opinion, Comment]) -> Optional[str]:
+    """
+    Get the name of the current review status for the specified content,
+    from the review state cached on the content
+    :param content: content to check
+    :return: status name or None if not in review
+    """
+    return None if content.review_status_id is None else \
+        STATUS_REGISTRY.name_of(content.review_status_id)
+
+
 def content_review_status(
     content: [Opinion, Comment], query_args: dict = None
 ) -> Optional[Status]:
     """
     Get the review status for the specified content
     :param content: content to check
-    :param query_args: additional query params: default None
+    :param query_args: additional query params: default None, i.e. the
+                current review status cached on the content
     :return: status
     """
+    if not query_args:
+        name = content_review_state(content)
+        return get_status(name) if name else None
+
     review = content_review_record(content, query_args)
     return review.status if review else None
 
@@ -347,23 +660,14 @@ def effective_content_status(content: [Opinion, Comment]) -> QueryStatus:
     :param content: content to check
     :return: status
     """
-    status = None
-    reviews = content_review_records_list(content)
-    if reviews:
-        query_stats = map(
-            lambda rev: QueryStatus.from_display(rev.status.name),
-            reviews
-        )
-        ordinal = max(
-            list(
-                map(lambda qry_stat: qry_stat.ordinal(), query_stats)
-            )
-        )
-        status = QueryStatus.ordinal_list()[ordinal] if ordinal >= 0 else None
+    review_status = content_review_state(content)
+    status = QueryStatus.from_display(review_status) \
+        if review_status else None
 
     if status is None or status.is_review_over_status:
         # no reviews or review passed so use content status
-        status = QueryStatus.from_display(content.status.name)
+        status = QueryStatus.from_display(
+            STATUS_REGISTRY.name_of(content.status_id))
 
     return status
 
@@ -378,29 +682,29 @@ def followed_author_publications(
     :param as_params: return dict of params flag: default False
     :return: query set or query param dict
     """
-    query = None
-
-    followed_ids = FollowStatus.objects.filter(**{
-        FollowStatus.USER_FIELD: user
-    }).values_list(FollowStatus.AUTHOR_FIELD, flat=True)
-
-    if len(followed_ids) > 0:
-        query_set_params = QuerySetParams()
-        query_set_params.add_and_lookup(
-            Opinion.USER_FIELD, f"{Opinion.USER_FIELD}__in", followed_ids)
-        query_set_params.add_and_lookup(
-            Opinion.STATUS_FIELD,
-            f"{Opinion.STATUS_FIELD}__{Status.NAME_FIELD}", STATUS_PUBLISHED)
-
-        if since:
-            query_set_params.add_and_lookup(
-                Opinion.PUBLISHED_FIELD,
-                f"{Opinion.PUBLISHED_FIELD}__gte", since)
+    # feed entries for the user, and fan-out on read entries of followed
+    # authors; see opinions/feeds.py
+    entries = FeedEntry.objects.filter(
+        Q(**{FeedEntry.USER_FIELD: user}) |
+        Q(**{
+            f'{FeedEntry.USER_FIELD}__isnull': True,
+            f'{FeedEntry.AUTHOR_FIELD}__in': FollowStatus.objects.filter(**{
+                FollowStatus.USER_FIELD: user
+            }).values(FollowStatus.AUTHOR_FIELD)
+        })
+    )
+    if since:
+        entries = entries.filter(**{
+            f'{FeedEntry.PUBLISHED_FIELD}__gte': since
+        })
 
-        query = query_set_params if as_params else \
-            query_set_params.apply(Opinion.objects)
+    query_set_params = QuerySetParams()
+    query_set_params.add_and_lookup(
+        FeedEntry.model_name_lower(), f'{Opinion.id_field()}__in',
+        entries.values(FeedEntry.OPINION_FIELD))
 
-    return query
+    return query_set_params if as_params else \
+        query_set_params.apply(Opinion.objects)
 
 
 def basic_review_query_params(
@@ -462,35 +766,25 @@ def review_content_by_status(
     :param as_params: return dict of params flag: default False
     :return: query set or query param dict
     """
-    query_set_params = basic_review_query_params(
-        model, user=user, since=since)
-
-    query_set_params.add_or_lookup(
-        Review.STATUS_FIELD,
-        Q(_connector=Q.OR, *[
-            Q(**{f'{Review.STATUS_FIELD}__{Status.NAME_FIELD}': stat.display})
-            for stat in ensure_list(statuses)
+    query_set_params = QuerySetParams()
+    query_set_params.add_and_lookup(
+        model.REVIEW_STATUS_FIELD, f'{model.REVIEW_STATUS_FIELD}__in', [
+            status_id(stat.display) for stat in ensure_list(statuses)
         ])
-    )
-
-    # get list of ids of content in required statuses
-    content_field = Review.content_field(model)
-    in_review = query_set_params.apply(
-        # exclude different content type entries and historical data
-        Review.objects.exclude(**{
-            f'{content_field}': None,
-        }).exclude(**{
-            f'{Review.IS_CURRENT_FIELD}': False,
-        })
-    ).values_list(content_field, flat=True)
-
-    query_set_params.clear()
-    if in_review:
+    if user:
         query_set_params.add_and_lookup(
-            model.model_name(), f'{model.id_field()}__in', in_review
-        )
-    else:
-        query_set_params.is_none = True
+            model.USER_FIELD, model.USER_FIELD, user)
+    if since:
+        # review status changed since, from the current review records;
+        # a correlated EXISTS lets the database semi-join on the review
+        # index rather than building the set of reviewed content ids
+        changed_since = Exists(Review.objects.filter(**{
+            Review.content_field(model): OuterRef(model.id_field()),
+            f'{Review.IS_CURRENT_FIELD}': True,
+            f'{Review.UPDATED_FIELD}__gte': since
+        }))
+        query_set_params.add_qs_func(
+            Review.UPDATED_FIELD, lambda qs: qs.filter(changed_since))
 
     return query_set_params if as_params else \
         query_set_params.apply(model.objects)
@@ -21,12 +21,12 @@
 #  DEALINGS IN THE SOFTWARE.
 #
 from enum import Enum, auto
-from typing import Callable, Any, Type, TypeVar, Union
+from typing import Callable, Any, Type, TypeVar
 
-from django.db.models import Q, QuerySet, Model
+from django.db.models import Q, QuerySet
 
+from categories.registry import NameRegistry
 from opinions.enums import ChoiceArg
-from utils import ModelMixin
 
 # workaround for self type hints from https://peps.python.org/pep-0673/
 TypeQuerySetParams = TypeVar("TypeQuerySetParams", bound="QuerySetParams")
@@ -221,8 +221,7 @@ class QuerySetParams:
 def choice_arg_query(
     query_set_params: QuerySetParams, name: str,
     choice_arg: Type[ChoiceArg], all_options: ChoiceArg,
-    model: Type[Union[Model, ModelMixin]], search_field: str,
-    query: str, and_lookup: str
+    registry: NameRegistry, query: str, and_lookup: str
 ):
     """
     Process a ChoiceArg query
@@ -230,14 +229,13 @@ def choice_arg_query(
     :param name: query param
     :param choice_arg: ChoiceArg sub class
     :param all_options: all-inclusive option from `choice_arg`
-    :param model: model to search
-    :param search_field: field in model to search
+    :param registry: registry of model to search
     :param query: request query
-    :param and_lookup: filed lookup for query
+    :param and_lookup: field lookup for query, taking the model id
     """
     name = name.lower()
     option = choice_arg.from_arg(name)
-    inner_qs = None
+    option_id = None
     if option is not None:
         # term exactly matches a ChoiceArg arg
         if option == all_options:
@@ -245,19 +243,14 @@ def choice_arg_query(
             query_set_params.add_all_inclusive(query)
         else:
             # get required option
-            inner_qs = model.objects.get(**{
-                f'{search_field}': option.display
-            })
+            option_id = registry.id_of(option.display)
     else:
-        # no exact match to ChoiceArg arg, try to match part of search field
-        status_param = {
-            f'{search_field}__icontains': name
-        }
-        status_qs = model.objects.filter(**status_param)
-        if status_qs.count() == 1:
+        # no exact match to ChoiceArg arg, try to match part of name
+        names = registry.names_containing(name)
+        if len(names) == 1:
             # only 1 match, get required option
-            inner_qs = model.objects.get(**status_param)
-        elif status_qs.count() == 0:
+            option_id = registry.id_of(names[0])
+        elif len(names) == 0:
             # TODO no match will result in none result
             pass
         else:
@@ -266,11 +259,10 @@ def choice_arg_query(
             # https://docs.djangoproject.com/en/4.1/topics/db/queries/#complex-lookups-with-q
             query_set_params.add_or_lookup(
                 f'{query}-{name}',
-                Q(_connector=Q.OR, **{
-                    f'{model.id_field()}':
-                        stat.id for stat in status_qs.all()
+                Q(**{
+                    f'{and_lookup}__in': registry.ids_of(names)
                 })
             )
 
-    if inner_qs is not None:
-        query_set_params.add_and_lookup(query, and_lookup, inner_qs)
+    if option_id is not None:
+        query_set_params.add_and_lookup(query, and_lookup, option_id)
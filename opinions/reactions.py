@@ -24,7 +24,7 @@ from typing import Callable, Union, Any
 
 from soapbox import OPINIONS_APP_NAME
 from user.models import User
-from utils import namespaced_url, ensure_list
+from utils import namespaced_url, ensure_list, timed
 from .comment_data import CommentBundle, CommentData
 from .constants import (
     OPINION_LIKE_ID_ROUTE_NAME,
@@ -39,12 +39,8 @@ from .constants import (
 from .data_structures import (
     Reaction, ReactionCtrl, HtmlTag, UrlType
 )
-from .models import Opinion, Comment, AgreementStatus, PinStatus
-from .queries import (
-    opinion_is_pinned, get_content_status, StatusCheck,
-    following_content_author, content_is_hidden, ContentStatus,
-    is_content_deleted
-)
+from .models import Opinion, Comment, PinStatus
+from .queries import ContentStatus, ReactionState
 from .templatetags.reaction_button_id import reaction_button_id
 from .enums import ReactionStatus
 
@@ -304,12 +300,14 @@ NON_SELECTABLE = ALWAYS_AVAILABLE.copy()
 NON_SELECTABLE.extend(AUTHOR_ONLY)
 
 
+@timed()
 def get_reaction_status(
     user: User,
     content: Union[Opinion, Comment, CommentData, CommentBundle, list],
     statuses: dict = None, reactions: list[str] = None,
     enablers: dict = None, visibility: dict = None,
-    status_by_id: dict[int, ContentStatus] = None
+    status_by_id: dict[int, ContentStatus] = None,
+    reaction_state: ReactionState = None
 ) -> dict:
     """
     Get the reaction status for the specified content
@@ -327,206 +325,190 @@ def get_reaction_status(
                 boolean
     :param status_by_id: dict of ContentStatus values with
                 Opinion/Comment id as key
+    :param reaction_state: preloaded reaction state of content; default
+                None, i.e. load for content
     :return: statuses dict
     """
     if statuses is None:
         statuses = {}
 
     if content:
-        content = ensure_list(content)
-
-        for entry in content:
+        # flatten content to list of opinions/comments
+        targets = []
+        for entry in ensure_list(content):
             if isinstance(entry, CommentBundle):
-                reaction_kwargs = {
-                    'statuses': statuses,
-                    'reactions': reactions,
-                    'enablers': enablers,
-                    'visibility': visibility,
-                    'status_by_id': status_by_id
-                }
-                for cmt in entry.comment_iterable():
-                    get_reaction_status(user, cmt, **reaction_kwargs)
+                targets.extend(entry.comment_iterable())
+            elif isinstance(entry, CommentData):
+                targets.append(entry.comment)
+            elif isinstance(entry, (Opinion, Comment)):
+                targets.append(entry)
             else:
-                entry_is_opinion = isinstance(entry, Opinion)
-                target = entry
-                if entry_is_opinion:
-                    # get status for opinion
-                    content_field = AgreementStatus.OPINION_FIELD
-                    reaction_fields = OPINION_REACTION_FIELDS
-                    pin_field = PinStatus.OPINION_FIELD
-                    reactions_list = OPINION_REACTIONS_LIST
-                elif isinstance(entry, (Comment, CommentData)):
-                    # get status for comment
-                    content_field = AgreementStatus.COMMENT_FIELD
-                    reaction_fields = COMMENT_REACTION_FIELDS
-                    pin_field = None    # no pin in COMMENT_REACTIONS_LIST
-                    reactions_list = COMMENT_REACTIONS_LIST
-                    if isinstance(entry, CommentData):
-                        target = entry.comment
-                else:
-                    raise ValueError(f'Unknown content {content}')
-
-                if reactions is None:
-                    reactions = reaction_fields
-                elif isinstance(reactions, str):
-                    reactions = [reactions]
-
-                def enablers_check(fld: str):
-                    return field_check(enablers, target, fld)
-
-                def visibility_check(fld: str):
-                    return field_check(visibility, target, fld)
-
-                # set enabled and visibility conditions for reactions
-                enabled = {}
-                displayer = {}
-                deleted = is_content_deleted(target.lookup_clazz(), target.id)
-
-                def two_icon_single_display(
-                    ctrl_param: list[tuple[ReactionsList, bool, bool]],
-                    active_field: str,
-                    inactive_field: str,
-                    check_func: Callable[[[Opinion, Comment], User], bool]
-                ):
-                    """
-                    Process reaction with 2 separate icons but only 1 is ever
-                    displayed
-                    :param ctrl_param: list of tuples to control reactions
-                    :param active_field: reaction active field
-                    :param inactive_field: reaction inactive field
-                    :param check_func: function to check status
-                    """
-                    active = check_func(target, user=user) \
-                        if any_true(displayer, [
-                            active_field, inactive_field
-                        ]) else False
-
-                    ctrl_param.extend([
-                        # reaction, selected, visible
-                        (getattr(reactions_list, active_field), active,
-                         displayer[active_field] and not active),
-                        (getattr(reactions_list, inactive_field), active,
-                         displayer[inactive_field] and active),
-                    ])
-
-                for field in ReactionsList.ALL_FIELDS:
-                    if field in ReactionsList.PIN_FIELDS and \
-                            pin_field is None:
-                        # False if pin field not in reactions_list
-                        enabled[field] = False
-                        displayer[field] = False
-                    elif field in ALWAYS_AVAILABLE:
-                        enabled[field] = not deleted
-                        displayer[field] = True
-                    elif field in AUTHOR_ONLY:
-                        # delete/edit comment via reactions only available to
-                        # comment author
-                        enabled[field] = \
-                            False if entry_is_opinion or deleted else \
-                            target.user == user
-                        displayer[field] = enabled[field]
-                    else:
-                        # False if deleted or,
-                        # ContentStatus.view_ok if specified or,
-                        # enabler if specified or, True for ALWAYS_AVAILABLE
-                        # or disabled for users' own stuff
-                        enabled[field] = \
-                            False if deleted else \
-                            field_check(
-                                status_by_id, target, target.id,
-                                default=ContentStatus.VIEW_OK).view_ok \
-                            if status_by_id else \
-                            enablers_check(field) if enablers else \
-                            True if field in ALWAYS_AVAILABLE else \
-                            target.user != user
-
-                        # visibility if specified or, True for fields in
-                        # reactions
-                        displayer[field] = \
-                            visibility_check(field) if visibility else \
-                            field in reactions
-
-                control_param = [
-                    # reaction, selected, visible
-                    (getattr(reactions_list, field), False, displayer[field])
-                    for field in NON_SELECTABLE if field in reactions
-                ]
-
-                # get agree & disagree statuses for comment/opinion
-                # (2 separate icons)
-                agree = False
-                disagree = False
-                if any_true(displayer, ReactionsList.AGREE_FIELDS):
-                    # need to display agree/disagree
-                    query = AgreementStatus.objects.filter(**{
-                        AgreementStatus.USER_FIELD: user,
-                        content_field: target
-                    })
-                    if query.exists():
-                        agreement = query.first()
-                        agree = \
-                            agreement.status.name == \
-                            ReactionStatus.AGREE.display
-                        disagree = \
-                            agreement.status.name == \
-                            ReactionStatus.DISAGREE.display
-
-                control_param.extend([
+                raise ValueError(f'Unknown content {content}')
+
+        if reaction_state is None:
+            reaction_state = ReactionState(user, targets)
+        user_id = user.id if user else None
+
+        for target in targets:
+            entry_is_opinion = isinstance(target, Opinion)
+            if entry_is_opinion:
+                # get status for opinion
+                reaction_fields = OPINION_REACTION_FIELDS
+                pin_field = PinStatus.OPINION_FIELD
+                reactions_list = OPINION_REACTIONS_LIST
+            else:
+                # get status for comment
+                reaction_fields = COMMENT_REACTION_FIELDS
+                pin_field = None    # no pin in COMMENT_REACTIONS_LIST
+                reactions_list = COMMENT_REACTIONS_LIST
+
+            target_reactions = reaction_fields if reactions is None else \
+                [reactions] if isinstance(reactions, str) else reactions
+
+            def enablers_check(fld: str):
+                return field_check(enablers, target, fld)
+
+            def visibility_check(fld: str):
+                return field_check(visibility, target, fld)
+
+            # set enabled and visibility conditions for reactions
+            enabled = {}
+            displayer = {}
+            deleted = reaction_state.is_deleted(target)
+
+            def two_icon_single_display(
+                ctrl_param: list[tuple[ReactionsList, bool, bool]],
+                active_field: str,
+                inactive_field: str,
+                check_func: Callable[[Union[Opinion, Comment]], bool]
+            ):
+                """
+                Process reaction with 2 separate icons but only 1 is ever
+                displayed
+                :param ctrl_param: list of tuples to control reactions
+                :param active_field: reaction active field
+                :param inactive_field: reaction inactive field
+                :param check_func: function to check status
+                """
+                active = check_func(target) \
+                    if any_true(displayer, [
+                        active_field, inactive_field
+                    ]) else False
+
+                ctrl_param.extend([
                     # reaction, selected, visible
-                    (reactions_list.agree, agree,
-                     displayer[ReactionsList.AGREE_FIELD]),
-                    (reactions_list.disagree, disagree,
-                     displayer[ReactionsList.DISAGREE_FIELD]),
+                    (getattr(reactions_list, active_field), active,
+                     displayer[active_field] and not active),
+                    (getattr(reactions_list, inactive_field), active,
+                     displayer[inactive_field] and active),
                 ])
 
-                # get pin status for opinion
-                if pin_field is not None:
-                    two_icon_single_display(
-                        control_param,
-                        ReactionsList.PIN_FIELD,
-                        ReactionsList.UNPIN_FIELD,
-                        opinion_is_pinned
-                    )
-
-                # get following status
-                two_icon_single_display(
-                    control_param,
-                    ReactionsList.FOLLOW_FIELD,
-                    ReactionsList.UNFOLLOW_FIELD,
-                    following_content_author
-                )
-
-                # get hidden status
+            for field in ReactionsList.ALL_FIELDS:
+                if field in ReactionsList.PIN_FIELDS and \
+                        pin_field is None:
+                    # False if pin field not in reactions_list
+                    enabled[field] = False
+                    displayer[field] = False
+                elif field in ALWAYS_AVAILABLE:
+                    enabled[field] = not deleted
+                    displayer[field] = True
+                elif field in AUTHOR_ONLY:
+                    # delete/edit comment via reactions only available to
+                    # comment author
+                    enabled[field] = \
+                        False if entry_is_opinion or deleted else \
+                        target.user_id == user_id
+                    displayer[field] = enabled[field]
+                else:
+                    # False if deleted or,
+                    # ContentStatus.view_ok if specified or,
+                    # enabler if specified or, True for ALWAYS_AVAILABLE
+                    # or disabled for users' own stuff
+                    enabled[field] = \
+                        False if deleted else \
+                        field_check(
+                            status_by_id, target, target.id,
+                            default=ContentStatus.VIEW_OK).view_ok \
+                        if status_by_id else \
+                        enablers_check(field) if enablers else \
+                        True if field in ALWAYS_AVAILABLE else \
+                        target.user_id != user_id
+
+                    # visibility if specified or, True for fields in
+                    # reactions
+                    displayer[field] = \
+                        visibility_check(field) if visibility else \
+                        field in target_reactions
+
+            control_param = [
+                # reaction, selected, visible
+                (getattr(reactions_list, field), False, displayer[field])
+                for field in NON_SELECTABLE if field in target_reactions
+            ]
+
+            # get agree & disagree statuses for comment/opinion
+            # (2 separate icons)
+            agree = False
+            disagree = False
+            if any_true(displayer, ReactionsList.AGREE_FIELDS):
+                # need to display agree/disagree
+                agreement = reaction_state.agreement(target)
+                agree = agreement == ReactionStatus.AGREE.display
+                disagree = agreement == ReactionStatus.DISAGREE.display
+
+            control_param.extend([
+                # reaction, selected, visible
+                (reactions_list.agree, agree,
+                 displayer[ReactionsList.AGREE_FIELD]),
+                (reactions_list.disagree, disagree,
+                 displayer[ReactionsList.DISAGREE_FIELD]),
+            ])
+
+            # get pin status for opinion
+            if pin_field is not None:
                 two_icon_single_display(
                     control_param,
-                    ReactionsList.HIDE_FIELD,
-                    ReactionsList.SHOW_FIELD,
-                    content_is_hidden
+                    ReactionsList.PIN_FIELD,
+                    ReactionsList.UNPIN_FIELD,
+                    reaction_state.is_pinned
                 )
 
-                # get reported status
-                reported = False
-                if any_true(displayer, ReactionsList.REPORT_FIELD):
-                    reported = get_content_status(
-                        target, StatusCheck.REPORTED, user=user,
-                        current_user=user
-                    ).reported
-
-                control_param.extend([
-                    # reaction, selected, visible
-                    (reactions_list.report, reported,
-                     displayer[ReactionsList.REPORT_FIELD]),
-                ])
-
-                statuses.update({
-                    # key is button id, value is Reaction
-                    reaction_button_id(reaction, target.id):
-                        ReactionCtrl(
-                            selected=selected,
-                            disabled=not enabled[reaction.field],
-                            visible=visible)
-                        for reaction, selected, visible in control_param
-                })
+            # get following status
+            two_icon_single_display(
+                control_param,
+                ReactionsList.FOLLOW_FIELD,
+                ReactionsList.UNFOLLOW_FIELD,
+                reaction_state.is_following
+            )
+
+            # get hidden status
+            two_icon_single_display(
+                control_param,
+                ReactionsList.HIDE_FIELD,
+                ReactionsList.SHOW_FIELD,
+                reaction_state.is_hidden
+            )
+
+            # get reported status
+            reported = False
+            if any_true(displayer, ReactionsList.REPORT_FIELD):
+                reported = reaction_state.is_reported(target)
+
+            control_param.extend([
+                # reaction, selected, visible
+                (reactions_list.report, reported,
+                 displayer[ReactionsList.REPORT_FIELD]),
+            ])
+
+            statuses.update({
+                # key is button id, value is Reaction
+                reaction_button_id(reaction, target.id):
+                    ReactionCtrl(
+                        selected=selected,
+                        disabled=not enabled[reaction.field],
+                        visible=visible)
+                    for reaction, selected, visible in control_param
+            })
 
     return statuses
 
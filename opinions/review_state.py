@@ -0,0 +1,223 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from typing import Optional, Union, Type, List
+
+from django.db import transaction, connection
+
+from categories.registry import get_status, status_id, STATUS_REGISTRY
+from jobs.queue import enqueue
+from user.models import User
+from utils import ensure_list
+from .enums import QueryStatus
+from .feeds import enqueue_feed_update, update_feeds_job
+from .models import Opinion, Comment, Review
+
+# Current review state cache.
+# Opinion/Comment carry the status of their current review record and a
+# reported flag, so that viewability checks, in-review lists and status
+# badges don't need to query Review. The state must be updated in the
+# same transaction as the review records are saved.
+
+
+def review_status_ordinal(status_pk: int) -> int:
+    """
+    Get the priority order ordinal of a review status
+    :param status_pk: status id
+    :return: ordinal as per QueryStatus.ordinal_list(), or -1 if none
+    """
+    status = QueryStatus.from_display(STATUS_REGISTRY.name_of(status_pk))
+    return status.ordinal() if status else -1
+
+
+def current_review_status_id(
+        content: Union[Opinion, Comment]) -> Optional[int]:
+    """
+    Get the id of the status of the current review records for content.
+    Content may have multiple current review records, e.g. if reported
+    again while under review, so the highest priority status is used.
+    :param content: content to check
+    :return: status id or None if not in review
+    """
+    ordinal, status_pk = max([
+        (review_status_ordinal(pk), pk)
+        for pk in Review.objects.filter(**{
+            Review.content_field(content): content,
+            Review.IS_CURRENT_FIELD: True
+        }).order_by().values_list(
+            f'{Review.STATUS_FIELD}_id', flat=True).distinct()
+    ], default=(-1, None))
+    return status_pk if ordinal >= 0 else None
+
+
+def update_review_state(content: Union[Opinion, Comment]):
+    """
+    Update the cached review state of content from its current review
+    records
+    :param content: content to update
+    """
+    status_pk = current_review_status_id(content)
+    changed = status_pk != getattr(
+        content, f'{content.REVIEW_STATUS_FIELD}_id')
+    setattr(content, f'{content.REVIEW_STATUS_FIELD}_id', status_pk)
+    setattr(content, content.REPORTED_FIELD, status_pk is not None)
+
+    type(content).objects.filter(**{
+        f'{content.id_field()}': content.id
+    }).update(**{
+        f'{content.REVIEW_STATUS_FIELD}_id': status_pk,
+        content.REPORTED_FIELD: status_pk is not None
+    })
+
+    if isinstance(content, Opinion):
+        if changed:
+            # opinions in review are removed from following feeds
+            enqueue_feed_update(content)
+        content.loaded_feed_state = content.feed_state()
+
+
+REVIEW_BULK_BATCH_SIZE = 500
+""" Number of review records per bulk insert """
+REVIEW_COPY_FIELDS = [
+    Review.OPINION_FIELD, Review.COMMENT_FIELD,
+    Review.REASON_FIELD, Review.REQUESTED_FIELD
+]
+""" Fields copied from current review records to new review records """
+
+
+def bulk_review_decision(
+    model: Type[Union[Opinion, Comment]], ids: List[int],
+    decision: QueryStatus, reviewer: User
+) -> List[int]:
+    """
+    Set the review status of multiple content items in review, using a
+    fixed number of queries regardless of the number of items.
+    Equivalent to a review decision for each item.
+    :param model: model of content, i.e. Opinion or Comment
+    :param ids: ids of content
+    :param decision: new review status
+    :param reviewer: reviewer making decision
+    :return: ids of content which were in review
+    """
+    with transaction.atomic():
+        return _set_review_status(model, {
+            f'{Review.content_field(model)}__in': ensure_list(ids)
+        }, decision, reviewer)
+
+
+def claim_reviews(
+    model: Type[Union[Opinion, Comment]], moderator: User,
+    count: int = 1
+) -> List[int]:
+    """
+    Claim the next content items pending review for a moderator.
+    The claimed items are moved to under review, with the moderator
+    recorded as reviewer of their current review records.
+    Content rows locked by a concurrent claim are skipped, so moderators
+    claiming at the same time get different items. Databases without
+    SKIP LOCKED support (e.g. SQLite) rely on writes being serialised.
+    :param model: model of content, i.e. Opinion or Comment
+    :param moderator: moderator claiming reviews
+    :param count: maximum number of items to claim; default 1
+    :return: ids of claimed content, oldest first
+    """
+    with transaction.atomic():
+        pending = model.objects.filter(**{
+            f'{model.REVIEW_STATUS_FIELD}_id':
+                status_id(QueryStatus.PENDING_REVIEW.display)
+        }).order_by(model.id_field())
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+
+        claimed = list(
+            pending.values_list(model.id_field(), flat=True)[:count])
+
+        return _set_review_status(model, {
+            f'{Review.content_field(model)}__in': claimed
+        }, QueryStatus.UNDER_REVIEW, moderator) if claimed else []
+
+
+def _set_review_status(
+    model: Type[Union[Opinion, Comment]], content_lookup: dict,
+    new_status: QueryStatus, reviewer: User
+) -> List[int]:
+    """
+    Set the review status of the content matching a lookup.
+    Must be called in a transaction.
+    :param model: model of content, i.e. Opinion or Comment
+    :param content_lookup: Review lookup to select content
+    :param new_status: new review status
+    :param reviewer: reviewer making change
+    :return: ids of content which were in review
+    """
+    content_field = Review.content_field(model)
+    status = get_status(new_status.display)
+    is_current = not new_status.is_review_over_status
+
+    current_reviews = list(
+        Review.objects.select_for_update().filter(**{
+            Review.IS_CURRENT_FIELD: True
+        }, **content_lookup).only(Review.id_field(), *REVIEW_COPY_FIELDS)
+    )
+    if not current_reviews:
+        return []
+
+    # mark current review records as historical
+    Review.objects.filter(**{
+        f'{Review.id_field()}__in': [
+            review.id for review in current_reviews]
+    }).update(**{
+        Review.IS_CURRENT_FIELD: False
+    })
+
+    # add new records
+    copy_fields = [
+        Review._meta.get_field(field).attname
+        for field in REVIEW_COPY_FIELDS
+    ]
+    Review.objects.bulk_create([
+        Review(**{
+            Review.STATUS_FIELD: status,
+            Review.REVIEWER_FIELD: reviewer,
+            Review.IS_CURRENT_FIELD: is_current,
+        }, **{
+            field: getattr(review, field) for field in copy_fields
+        }) for review in current_reviews
+    ], batch_size=REVIEW_BULK_BATCH_SIZE)
+
+    # all current records have the new status
+    content_ids = sorted(set(
+        getattr(review, f'{content_field}_id')
+        for review in current_reviews
+    ))
+    model.objects.filter(**{
+        f'{model.id_field()}__in': content_ids
+    }).update(**{
+        f'{model.REVIEW_STATUS_FIELD}_id':
+            status.id if is_current else None,
+        model.REPORTED_FIELD: is_current
+    })
+
+    if model == Opinion:
+        enqueue(update_feeds_job, opinion_ids=content_ids)
+
+    return content_ids
@@ -0,0 +1,68 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+from .feeds import (
+    feed_eligible, enqueue_feed_update, follow_author_job, unfollow_author
+)
+from .models import Opinion, Comment, FollowStatus
+from .text_search import (
+    search_fields, update_search_index, remove_from_search_index
+)
+
+
+@receiver(post_save, sender=Opinion)
+@receiver(post_save, sender=Comment)
+def content_saved_callback(sender, instance, created=False,
+                           update_fields=None, **kwargs):
+    if update_fields is None or \
+            not update_fields.isdisjoint(search_fields(sender)):
+        update_search_index(instance)
+    if sender == Opinion and (
+            update_fields is None or Opinion.STATUS_FIELD in update_fields):
+        feed_state = instance.feed_state()
+        if feed_state != getattr(instance, 'loaded_feed_state', None) and \
+                (not created or feed_eligible(instance)):
+            # feed state changed, fan-out in the background
+            enqueue_feed_update(instance)
+        instance.loaded_feed_state = feed_state
+
+
+@receiver(post_delete, sender=Opinion)
+@receiver(post_delete, sender=Comment)
+def content_deleted_callback(sender, instance, **kwargs):
+    remove_from_search_index(instance)
+
+
+@receiver(post_save, sender=FollowStatus)
+def follow_saved_callback(sender, instance, created=False, **kwargs):
+    if created:
+        enqueue(follow_author_job, user_id=instance.user_id,
+                author_id=instance.author_id)
+
+
+@receiver(post_delete, sender=FollowStatus)
+def follow_deleted_callback(sender, instance, **kwargs):
+    unfollow_author(instance.user_id, instance.author_id)
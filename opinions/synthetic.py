@@ -0,0 +1,523 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from itertools import accumulate
+import random
+from typing import Optional, Callable, Type
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Model, Max
+
+from categories import (
+    STATUS_PUBLISHED, STATUS_DRAFT, STATUS_PREVIEW, STATUS_PENDING_REVIEW,
+    REACTION_AGREE, REACTION_DISAGREE
+)
+from categories.models import Category
+from categories.registry import status_id
+from user.constants import AUTHOR_GROUP, MODERATOR_GROUP
+from user.models import User
+from .feeds import rebuild_author_feeds
+from .models import (
+    Opinion, Comment, AgreementStatus, HideStatus, PinStatus, FollowStatus,
+    Review
+)
+from .text_search import get_search_backend
+
+# Synthetic data generator.
+# Rows are generated in python from a seeded random number generator, with
+# explicitly assigned ids so that comment paths and the denormalised
+# counters can be computed before insertion. Rows are written with COPY on
+# Postgres and executemany on other databases.
+
+DEFAULT_SEED = 1
+BASE_DATE = datetime(2022, 1, 1, tzinfo=timezone.utc)
+""" Start of the period over which content is published """
+DATE_SPAN = timedelta(days=365)
+""" Period over which content is published """
+DEFAULT_BATCH_SIZE = 5000
+""" Number of rows per table buffered before writing """
+
+AGREE_RATIO = 0.6
+""" Ratio of agreement reactions which are agree """
+HIDE_RATIO = 0.05
+""" Ratio of comment reactions which are hides """
+PIN_RATIO = 0.1
+""" Ratio of opinion reactions which are pins """
+DRAFT_RATIO = 0.05
+""" Ratio of opinions which are drafts or previews """
+POPULARITY_ALPHA = 1.2
+""" Pareto shape of author and opinion popularity; lower is more skewed """
+
+WORDS = (
+    'the of and to in is that for it as was with be by on not he this are '
+    'or his from at which but have an they you were her she there been one '
+    'all we their has would when if so no more what up out who said about '
+    'will than them into could state only new year some time people other '
+    'also just over city football music garden election climate coffee '
+    'traffic weather school holiday market cinema science budget policy '
+    'health rent train cycling recipe festival library'
+).split()
+
+# tables are written in dependency order
+WRITE_ORDER = [
+    User, User.groups.through, FollowStatus, Opinion,
+    Opinion.categories.through, Comment, AgreementStatus, HideStatus,
+    PinStatus, Review
+]
+ASSIGNED_ID_MODELS = [User, Opinion, Comment]
+""" Models whose ids are assigned by the generator """
+
+
+@dataclass
+class SyntheticConfig:
+    """ Synthetic data generation configuration """
+
+    users: int = 100            # number of users
+    moderators: int = 2         # number of users who are also moderators
+    opinions: int = 200         # number of opinions
+    comments: int = 2000        # number of comments
+    max_depth: int = 8          # maximum comment reply depth
+    reply_ratio: float = 0.6    # ratio of comments which are replies
+    reactions: float = 5.0      # mean reactions per opinion/comment
+    follows: float = 5.0        # mean authors followed per user
+    reported: float = 0.01      # ratio of content reported for review
+    password: str = 'password'  # password of all users
+    seed: int = DEFAULT_SEED    # random number generator seed
+    batch_size: int = DEFAULT_BATCH_SIZE
+
+
+class BulkWriter:
+    """
+    Buffered bulk row writer
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.rows = defaultdict(list)
+        self.counts = defaultdict(int)
+        self.model_fields = {}
+
+    def fields(self, model: Type[Model]) -> list:
+        """
+        Get the fields written for a model
+        :param model: model
+        :return: list of fields
+        """
+        if model not in self.model_fields:
+            self.model_fields[model] = [
+                field for field in model._meta.concrete_fields
+                if not field.primary_key or model in ASSIGNED_ID_MODELS
+            ]
+        return self.model_fields[model]
+
+    def add(self, model: Type[Model], **values):
+        """
+        Add a row; unspecified fields take their default value
+        :param model: model
+        :param values: field values with field attribute name as key
+        """
+        self.rows[model].append([
+            values[field.attname] if field.attname in values else
+            field.get_default()
+            for field in self.fields(model)
+        ])
+        if len(self.rows[model]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """ Write all buffered rows """
+        for model in WRITE_ORDER:
+            rows = self.rows.pop(model, None)
+            if rows:
+                insert_rows(model, self.fields(model), rows)
+                self.counts[model] += len(rows)
+
+
+def insert_rows(model: Type[Model], fields: list, rows: list[list]):
+    """
+    Insert rows into the table of a model, using COPY where available
+    :param model: model
+    :param fields: fields of row values
+    :param rows: rows to insert
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ', '.join([
+        connection.ops.quote_name(field.column) for field in fields
+    ])
+    rows = [
+        [
+            field.get_db_prep_save(value, connection)
+            for field, value in zip(fields, row)
+        ] for row in rows
+    ]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql' and \
+                hasattr(cursor.cursor, 'copy_expert'):
+            buffer = StringIO()
+            for row in rows:
+                buffer.write('\t'.join(map(_copy_value, row)))
+                buffer.write('\n')
+            buffer.seek(0)
+            cursor.cursor.copy_expert(
+                f'COPY {table} ({columns}) FROM STDIN', buffer)
+        else:
+            placeholders = ', '.join(['%s'] * len(fields))
+            cursor.executemany(
+                f'INSERT INTO {table} ({columns}) VALUES ({placeholders})',
+                rows)
+
+
+def _copy_value(value) -> str:
+    """
+    Format a value for COPY text format
+    :param value: value
+    :return: formatted value
+    """
+    if value is None:
+        return r'\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return str(value).replace('\\', '\\\\').replace(
+        '\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+class SyntheticDataGenerator:
+    """
+    Generator of reproducible synthetic users, opinions, comment trees,
+    reactions, follows and reviews
+    """
+
+    def __init__(self, config: SyntheticConfig,
+                 progress: Optional[Callable[[str], None]] = None):
+        """
+        Constructor
+        :param config: generation configuration
+        :param progress: progress message callback; default None
+        """
+        self.config = config
+        self.progress = progress
+        self.rng = random.Random(config.seed)
+        self.writer = BulkWriter(batch_size=max(config.batch_size, 1))
+        self.user_ids = []
+        self.author_weights = []
+        self.author_ids = set()
+        self.next_id = {}
+
+    def _log(self, msg: str):
+        if self.progress:
+            self.progress(msg)
+
+    def _allocate_ids(self, model: Type[Model], count: int) -> range:
+        """
+        Allocate ids for new rows of a model
+        :param model: model
+        :param count: number of ids
+        :return: range of ids
+        """
+        if model not in self.next_id:
+            self.next_id[model] = (model.objects.aggregate(
+                max_id=Max(model._meta.pk.name))['max_id'] or 0) + 1
+        start = self.next_id[model]
+        self.next_id[model] += count
+        return range(start, start + count)
+
+    def _date(self) -> datetime:
+        """ Get a random date within the generation period """
+        return BASE_DATE + timedelta(
+            seconds=self.rng.random() * DATE_SPAN.total_seconds())
+
+    def _text(self, min_words: int, max_words: int, max_len: int) -> str:
+        """
+        Get random text
+        :param min_words: minimum number of words
+        :param max_words: maximum number of words
+        :param max_len: maximum length
+        :return: text
+        """
+        text = ' '.join(self.rng.choices(
+            WORDS, k=self.rng.randint(min_words, max_words)))
+        return text[:max_len].strip().capitalize()
+
+    def _popular(self, weights: list, count: int) -> list:
+        """
+        Get a random selection of popularity weighted items
+        :param weights: cumulative weights of item indices
+        :param count: number of items
+        :return: list of item indices
+        """
+        return self.rng.choices(
+            range(len(weights)), cum_weights=weights, k=count)
+
+    def _count(self, mean: float) -> int:
+        """ Get a random count with the specified mean """
+        return int(self.rng.expovariate(1 / mean)) if mean > 0 else 0
+
+    def generate(self) -> dict[str, int]:
+        """
+        Generate the synthetic data
+        :return: dict of number of rows written with model name as key
+        """
+        with transaction.atomic():
+            self.generate_users()
+            self.generate_follows()
+            self.generate_content()
+            self.writer.flush()
+            self._reset_sequences()
+
+        self._log('Rebuilding search index')
+        backend = get_search_backend()
+        for model in [Opinion, Comment]:
+            backend.rebuild(model)
+
+        self._log('Rebuilding feeds')
+        for author_id in sorted(self.author_ids):
+            rebuild_author_feeds(author_id)
+
+        return {
+            model._meta.model_name: count
+            for model, count in self.writer.counts.items()
+        }
+
+    def _reset_sequences(self):
+        """ Reset database sequences following explicit id inserts """
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                    no_style(), ASSIGNED_ID_MODELS):
+                cursor.execute(sql)
+
+    def generate_users(self):
+        """ Generate users """
+        config = self.config
+        self._log(f'Generating {config.users} users')
+        password = make_password(config.password)
+        groups = {
+            name: Group.objects.get(name=name).id
+            for name in [AUTHOR_GROUP, MODERATOR_GROUP]
+        }
+        self.user_ids = list(self._allocate_ids(User, config.users))
+        for index, pk in enumerate(self.user_ids):
+            self.writer.add(
+                User, id=pk, username=f'user{pk}', password=password,
+                first_name='User', last_name=str(pk),
+                email=f'user{pk}@example.com', date_joined=BASE_DATE)
+            self.writer.add(
+                User.groups.through, user_id=pk,
+                group_id=groups[AUTHOR_GROUP])
+            if index < config.moderators:
+                self.writer.add(
+                    User.groups.through, user_id=pk,
+                    group_id=groups[MODERATOR_GROUP])
+
+        # a few popular authors write most opinions and attract most
+        # followers
+        self.author_weights = list(accumulate([
+            self.rng.paretovariate(POPULARITY_ALPHA) for _ in self.user_ids
+        ]))
+
+    def generate_follows(self):
+        """ Generate follows of authors by users """
+        config = self.config
+        self._log('Generating follows')
+        for pk in self.user_ids:
+            authors = set(
+                self.user_ids[index] for index in self._popular(
+                    self.author_weights, self._count(config.follows))
+            )
+            authors.discard(pk)
+            for author_id in sorted(authors):
+                self.writer.add(
+                    FollowStatus, user_id=pk, author_id=author_id,
+                    updated=BASE_DATE)
+
+    def generate_content(self):
+        """ Generate opinions and their comments """
+        config = self.config
+        self._log(f'Generating {config.opinions} opinions and '
+                  f'{config.comments} comments')
+        published_id = status_id(STATUS_PUBLISHED)
+        pre_publish_ids = [status_id(STATUS_DRAFT), status_id(STATUS_PREVIEW)]
+        category_ids = list(
+            Category.objects.order_by(Category.id_field()).values_list(
+                Category.id_field(), flat=True))
+
+        # comments are distributed over published opinions by popularity
+        opinion_ids = list(self._allocate_ids(Opinion, config.opinions))
+        published = [
+            self.rng.random() >= DRAFT_RATIO for _ in opinion_ids
+        ]
+        weights = [
+            self.rng.paretovariate(POPULARITY_ALPHA) if is_published else 0
+            for is_published in published
+        ]
+        comment_counts = [0] * len(opinion_ids)
+        if any(published):
+            for index in self.rng.choices(
+                    range(len(opinion_ids)), weights=weights,
+                    k=config.comments):
+                comment_counts[index] += 1
+
+        for pk, is_published, comment_count in zip(
+                opinion_ids, published, comment_counts):
+            author_id = self.user_ids[
+                self._popular(self.author_weights, 1)[0]]
+            self.author_ids.add(author_id)
+            date = self._date()
+            title = self._text(3, 10, Opinion.OPINION_ATTRIB_TITLE_MAX_LEN -
+                               len(f'{pk} '))
+            content = self._text(
+                50, 300, Opinion.OPINION_ATTRIB_CONTENT_MAX_LEN)
+            counters = self.generate_reactions(Opinion, pk, date)
+            counters[Opinion.COMMENT_COUNT_FIELD] = comment_count
+            dates = {
+                Opinion.CREATED_FIELD: date, Opinion.UPDATED_FIELD: date
+            }
+            if is_published:
+                dates[Opinion.PUBLISHED_FIELD] = date
+            self.writer.add(
+                Opinion, id=pk, title=f'{pk} {title}', content=content,
+                excerpt=content[:Opinion.OPINION_ATTRIB_EXCERPT_MAX_LEN],
+                user_id=author_id,
+                status_id=published_id if is_published else
+                self.rng.choice(pre_publish_ids),
+                slug=f'opinion-{pk}', **dates, **counters,
+                **self.generate_review(Opinion, pk, date))
+            for category_id in sorted(set(self.rng.choices(
+                    category_ids, k=self.rng.randint(1, 3)))):
+                self.writer.add(
+                    Opinion.categories.through, opinion_id=pk,
+                    category_id=category_id)
+
+            self.generate_comments(pk, comment_count, date)
+
+    def generate_comments(self, opinion_id: int, count: int,
+                          opinion_date: datetime):
+        """
+        Generate a comment tree for an opinion
+        :param opinion_id: id of opinion
+        :param count: number of comments
+        :param opinion_date: date opinion was published
+        """
+        config = self.config
+        published_id = status_id(STATUS_PUBLISHED)
+        comments = []
+        reply_counts = defaultdict(int)
+        parents = []    # comments which may be replied to
+        for pk in self._allocate_ids(Comment, count):
+            comment = Comment(id=pk)
+            parent = self.rng.choice(parents) if parents and \
+                self.rng.random() < config.reply_ratio else None
+            if parent:
+                # as Comment.set_hierarchy, without the opinion lookup
+                comment.level = parent.level + 1
+                comment.parent = parent.id
+                comment.path = parent.descendant_path
+                reply_counts[parent.id] += 1
+            if comment.level < min(config.max_depth, Comment.MAX_LEVEL):
+                parents.append(comment)
+            comment.created = (parent.created if parent else opinion_date) + \
+                timedelta(minutes=self.rng.randint(1, 600))
+            comments.append(comment)
+
+        for comment in comments:
+            date = comment.created
+            self.writer.add(
+                Comment, id=comment.id,
+                content=self._text(
+                    5, 100, Comment.COMMENT_ATTRIB_CONTENT_MAX_LEN),
+                opinion_id=opinion_id, parent=comment.parent,
+                level=comment.level, path=comment.path,
+                user_id=self.user_ids[
+                    self.rng.randrange(len(self.user_ids))],
+                status_id=published_id, slug=f'comment-{comment.id}',
+                created=date, updated=date, published=date,
+                reply_count=reply_counts[comment.id],
+                **self.generate_reactions(Comment, comment.id, date),
+                **self.generate_review(Comment, comment.id, date))
+
+    def generate_reactions(self, model: Type[Model], pk: int,
+                           date: datetime) -> dict[str, int]:
+        """
+        Generate reactions to content
+        :param model: Opinion or Comment
+        :param pk: id of content
+        :param date: date content was published
+        :return: dict of counter values with counter field name as key
+        """
+        content_field = f'{AgreementStatus.content_field(model)}_id'
+        counters = defaultdict(int)
+        agree_ids = [status_id(REACTION_AGREE), status_id(REACTION_DISAGREE)]
+        count = min(self._count(self.config.reactions), len(self.user_ids))
+        for user_id in sorted(self.rng.sample(self.user_ids, count)):
+            updated = date + timedelta(minutes=self.rng.randint(1, 6000))
+            chance = self.rng.random()
+            if model == Opinion and chance < PIN_RATIO:
+                self.writer.add(
+                    PinStatus, opinion_id=pk, user_id=user_id,
+                    updated=updated)
+                counters[Opinion.PIN_COUNT_FIELD] += 1
+            elif model == Comment and chance < HIDE_RATIO:
+                self.writer.add(
+                    HideStatus, comment_id=pk, user_id=user_id,
+                    updated=updated)
+                counters[Comment.HIDE_COUNT_FIELD] += 1
+            else:
+                is_agree = self.rng.random() < AGREE_RATIO
+                self.writer.add(
+                    AgreementStatus, **{content_field: pk},
+                    user_id=user_id, updated=updated,
+                    status_id=agree_ids[0 if is_agree else 1])
+                counters[model.AGREE_COUNT_FIELD if is_agree else
+                         model.DISAGREE_COUNT_FIELD] += 1
+        return counters
+
+    def generate_review(self, model: Type[Model], pk: int,
+                        date: datetime) -> dict:
+        """
+        Generate a review request for content
+        :param model: Opinion or Comment
+        :param pk: id of content
+        :param date: date content was published
+        :return: dict of review state field values with field attribute
+                name as key
+        """
+        if self.rng.random() >= self.config.reported:
+            return {}
+
+        updated = date + timedelta(minutes=self.rng.randint(1, 6000))
+        pending_id = status_id(STATUS_PENDING_REVIEW)
+        self.writer.add(
+            Review, **{f'{Review.content_field(model)}_id': pk},
+            requested_id=self.user_ids[
+                self.rng.randrange(len(self.user_ids))],
+            reason=self._text(3, 20, 100), status_id=pending_id,
+            is_current=True, created=updated, updated=updated)
+        return {
+            f'{model.REVIEW_STATUS_FIELD}_id': pending_id,
+            model.REPORTED_FIELD: True
+        }
@@ -0,0 +1,184 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from hashlib import md5
+import re
+from typing import Any, Optional
+
+from django import template
+from django.core.cache import cache
+from django.template import TemplateSyntaxError
+from django.template.base import Node, render_value_in_context
+
+register = template.Library()
+
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+""" Seconds a rendered fragment is held in the cache """
+SLOT_MARKER_CTX = '_fragment_slot_markers'
+""" Context flag for slots to render as markers """
+SLOT_MARKER_RE = re.compile('\x00(\\d+)\x00')
+""" Regex of slot markers in cached html; NUL never appears in content """
+
+# https://docs.djangoproject.com/en/4.1/howto/custom-template-tags/#writing-the-compilation-function
+
+
+def fragment_key(name: str, content: Any, *vary_on) -> str:
+    """
+    Get the cache key for a fragment of opinion/comment html.
+    The key is versioned by the content's updated timestamp, which is
+    bumped on every save of the content, so saves invalidate previously
+    rendered fragments.
+    :param name: fragment name
+    :param content: opinion/comment, or facade with id and updated
+    :param vary_on: additional values the fragment html depends on,
+                    e.g. review state
+    :return: cache key
+    """
+    version = md5(
+        ':'.join(
+            [str(content.updated.timestamp())] +
+            [str(value) for value in vary_on]
+        ).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'fragment:{name}:{content.id}:{version}'
+
+
+class FragmentSlotNode(template.Node):
+    """
+    Node rendering part of a content fragment on every render, e.g. user
+    dependent or time dependent html
+    """
+
+    def __init__(self, nodelist: Optional[template.NodeList] = None,
+                 expression: Optional[template.base.FilterExpression] = None):
+        self.nodelist = nodelist
+        self.expression = expression
+        self.index = 0
+
+    def render(self, context):
+        if context.get(SLOT_MARKER_CTX):
+            return f'\x00{self.index}\x00'
+        return self.render_slot(context)
+
+    def render_slot(self, context):
+        """ Render the slot contents """
+        return self.nodelist.render(context) if self.nodelist is not None \
+            else render_value_in_context(
+                self.expression.resolve(context), context)
+
+
+class ContentFragmentNode(template.Node):
+    """
+    Node rendering a cached fragment of opinion/comment html, with its
+    slots rendered on every render
+    """
+
+    def __init__(self, nodelist, name, content, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.content = content
+        self.vary_on = vary_on
+        self.slots = nodelist.get_nodes_by_type(FragmentSlotNode)
+        for index, slot in enumerate(self.slots):
+            slot.index = index
+        # version of the fragment template, so template changes invalidate
+        # previously rendered fragments
+        self.template_version = md5(
+            ''.join([
+                node.token.contents
+                for node in nodelist.get_nodes_by_type(Node)
+                if getattr(node, 'token', None)
+            ]).encode(), usedforsecurity=False
+        ).hexdigest()[:8]
+
+    def render(self, context):
+        key = fragment_key(
+            self.name.resolve(context), self.content.resolve(context),
+            self.template_version,
+            *[value.resolve(context) for value in self.vary_on]
+        )
+        html = cache.get(key)
+        if html is None:
+            with context.push(**{SLOT_MARKER_CTX: True}):
+                html = self.nodelist.render(context)
+            cache.set(key, html, FRAGMENT_CACHE_TIMEOUT)
+        return SLOT_MARKER_RE.sub(
+            lambda match: self.slots[int(match.group(1))].render_slot(
+                context), html)
+
+
+@register.tag
+def content_fragment(parser, token):
+    """
+    Cache the user-independent html of an opinion/comment.
+    Usage:
+        {% content_fragment name content [vary_on...] %}
+            ...
+            {% fragment_slot %}...{% endfragment_slot %}
+            {% fragment_var expression %}
+            ...
+        {% endcontent_fragment %}
+    Anything dependent on the current user or the current time, e.g.
+    reactions, must be rendered in a slot, or its value included in
+    vary_on. Slots are rendered with the context of the fragment tag, so
+    may not use variables defined within the fragment.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise TemplateSyntaxError(
+            f"'{bits[0]}' tag requires at least 2 arguments.")
+    nodelist = parser.parse((f'end{bits[0]}',))
+    parser.delete_first_token()
+    return ContentFragmentNode(
+        nodelist, parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]]
+    )
+
+
+@register.tag
+def fragment_slot(parser, token):
+    """
+    Render part of a content fragment on every render.
+    Usage:
+        {% fragment_slot %}...{% endfragment_slot %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 1:
+        raise TemplateSyntaxError(f"'{bits[0]}' tag takes no arguments.")
+    nodelist = parser.parse((f'end{bits[0]}',))
+    parser.delete_first_token()
+    return FragmentSlotNode(nodelist=nodelist)
+
+
+@register.tag
+def fragment_var(parser, token):
+    """
+    Render a variable in a content fragment on every render.
+    Usage:
+        {% fragment_var expression %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise TemplateSyntaxError(
+            f"'{bits[0]}' tag requires a single argument.")
+    return FragmentSlotNode(expression=parser.compile_filter(bits[1]))
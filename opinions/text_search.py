@@ -0,0 +1,291 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from functools import reduce
+from operator import or_
+from typing import Type, Union, Optional
+
+from django.contrib.postgres.search import (
+    SearchVector, SearchQuery, SearchRank
+)
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.db.models import Q, F, Expression, FloatField
+from django.db.models.expressions import RawSQL
+
+from .constants import TITLE_FIELD, CONTENT_FIELD, SEARCH_VECTOR_FIELD
+from .models import Opinion, Comment
+from .query_params import QuerySetParams
+
+SEARCH_RANK_FIELD = 'search_rank'
+""" Name of the search rank annotation; higher is more relevant """
+
+SEARCH_CONFIG = 'english'
+""" PostgreSQL text search configuration """
+
+SEARCH_WEIGHTS = {
+    TITLE_FIELD: 'A',
+    CONTENT_FIELD: 'B',
+}
+""" PostgreSQL text search weights of the indexed fields """
+
+TypeContent = Union[Opinion, Comment]
+
+
+def search_fields(model: Type[TypeContent]) -> list[str]:
+    """
+    Get the fields of a model included in text searches
+    :param model: Opinion or Comment
+    :return: list of field names
+    """
+    return [TITLE_FIELD, CONTENT_FIELD] if model == Opinion \
+        else [CONTENT_FIELD]
+
+
+def fts_table(model: Type[TypeContent]) -> str:
+    """
+    Get the name of the SQLite FTS5 table for a model
+    :param model: Opinion or Comment
+    :return: table name
+    """
+    return f'{model._meta.db_table}_fts'
+
+
+class SearchBackend:
+    """
+    Base text search backend; matches content containing any of the
+    search terms, without an index.
+    """
+    def filter_q(self, model: Type[TypeContent], terms: list[str]) -> Q:
+        """
+        Get the lookup matching content containing any of the search terms
+        :param model: Opinion or Comment
+        :param terms: search terms
+        :return: lookup
+        """
+        return Q(_connector=Q.OR, *[
+            Q(**{f'{field}__icontains': term})
+            for field in search_fields(model) for term in terms
+        ])
+
+    def rank(self, model: Type[TypeContent],
+             terms: list[str]) -> Optional[Expression]:
+        """
+        Get the expression ranking the relevance of content to the search
+        terms
+        :param model: Opinion or Comment
+        :param terms: search terms
+        :return: expression or None if ranking is not supported
+        """
+        return None
+
+    def index(self, instance: TypeContent):
+        """
+        Update the search index for an opinion/comment
+        :param instance: opinion/comment
+        """
+        pass
+
+    def remove(self, model: Type[TypeContent], pk: int):
+        """
+        Remove an opinion/comment from the search index
+        :param model: Opinion or Comment
+        :param pk: id of opinion/comment
+        """
+        pass
+
+    def rebuild(self, model: Type[TypeContent]):
+        """
+        Rebuild the search index for a model
+        :param model: Opinion or Comment
+        """
+        pass
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    PostgreSQL text search backend, using a GIN-indexed tsvector field
+    """
+    @staticmethod
+    def vector(model: Type[TypeContent]) -> SearchVector:
+        """
+        Get the search vector for a model
+        :param model: Opinion or Comment
+        :return: search vector
+        """
+        return reduce(lambda vector, field: vector + field, [
+            SearchVector(
+                field, weight=SEARCH_WEIGHTS[field], config=SEARCH_CONFIG)
+            for field in search_fields(model)
+        ])
+
+    @staticmethod
+    def query(terms: list[str]) -> SearchQuery:
+        """
+        Get the search query matching any of the search terms
+        :param terms: search terms
+        :return: search query
+        """
+        return reduce(or_, [
+            SearchQuery(term, config=SEARCH_CONFIG) for term in terms
+        ])
+
+    def filter_q(self, model: Type[TypeContent], terms: list[str]) -> Q:
+        return Q(**{f'{SEARCH_VECTOR_FIELD}': self.query(terms)})
+
+    def rank(self, model: Type[TypeContent],
+             terms: list[str]) -> Optional[Expression]:
+        return SearchRank(F(SEARCH_VECTOR_FIELD), self.query(terms))
+
+    def index(self, instance: TypeContent):
+        model = type(instance)
+        model.objects.filter(**{
+            f'{model.id_field()}': instance.pk
+        }).update(**{
+            f'{SEARCH_VECTOR_FIELD}': self.vector(model)
+        })
+
+    def rebuild(self, model: Type[TypeContent]):
+        model.objects.update(**{
+            f'{SEARCH_VECTOR_FIELD}': self.vector(model)
+        })
+
+
+class SqliteSearchBackend(SearchBackend):
+    """
+    SQLite text search backend, using an FTS5 table per model with the
+    content id as rowid
+    """
+    @staticmethod
+    def match(terms: list[str]) -> str:
+        """
+        Get the FTS5 query matching words starting with any of the search
+        terms
+        :param terms: search terms
+        :return: query string
+        """
+        return ' OR '.join([
+            '"{}"*'.format(term.replace('"', '""')) for term in terms
+        ])
+
+    def filter_q(self, model: Type[TypeContent], terms: list[str]) -> Q:
+        table = fts_table(model)
+        return Q(**{
+            f'{model.id_field()}__in': RawSQL(
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s',
+                (self.match(terms),)
+            )
+        })
+
+    def rank(self, model: Type[TypeContent],
+             terms: list[str]) -> Optional[Expression]:
+        # FTS5 rank is the bm25 score, which is lower for better matches
+        table = fts_table(model)
+        content = model._meta.db_table
+        return RawSQL(
+            f'SELECT -rank FROM {table} WHERE {table} MATCH %s '
+            f'AND rowid = "{content}"."{model.id_field()}"',
+            (self.match(terms),), output_field=FloatField()
+        )
+
+    def index(self, instance: TypeContent):
+        model = type(instance)
+        table = fts_table(model)
+        fields = search_fields(model)
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE rowid = %s', (instance.pk,))
+            cursor.execute(
+                f'INSERT INTO {table}(rowid, {", ".join(fields)}) '
+                f'VALUES (%s{", %s" * len(fields)})',
+                (instance.pk, *[
+                    getattr(instance, field) for field in fields
+                ])
+            )
+
+    def remove(self, model: Type[TypeContent], pk: int):
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {fts_table(model)} WHERE rowid = %s', (pk,))
+
+    def rebuild(self, model: Type[TypeContent]):
+        table = fts_table(model)
+        fields = ", ".join(search_fields(model))
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table}')
+            cursor.execute(
+                f'INSERT INTO {table}(rowid, {fields}) '
+                f'SELECT {model.id_field()}, {fields} '
+                f'FROM {model._meta.db_table}'
+            )
+
+
+_BACKENDS = {
+    'postgresql': PostgresSearchBackend(),
+    'sqlite': SqliteSearchBackend(),
+}
+_DEFAULT_BACKEND = SearchBackend()
+
+
+def get_search_backend() -> SearchBackend:
+    """
+    Get the text search backend for the default database
+    :return: search backend
+    """
+    return _BACKENDS.get(
+        connections[DEFAULT_DB_ALIAS].vendor, _DEFAULT_BACKEND)
+
+
+def text_search_query(query_set_params: QuerySetParams, key: str,
+                      model: Type[TypeContent], terms: list[str]):
+    """
+    Add a text search for content containing any of the search terms to
+    query set params. If the search backend supports ranking, the
+    relevance is annotated as `SEARCH_RANK_FIELD`.
+    :param query_set_params: query set params to update
+    :param key: query key
+    :param model: Opinion or Comment
+    :param terms: search terms
+    """
+    if not terms:
+        return
+    backend = get_search_backend()
+    query_set_params.add_or_lookup(key, backend.filter_q(model, terms))
+    rank = backend.rank(model, terms)
+    if rank is not None:
+        query_set_params.add_qs_func(
+            key, lambda qs: qs.annotate(**{SEARCH_RANK_FIELD: rank}))
+
+
+def update_search_index(instance: TypeContent):
+    """
+    Update the search index for an opinion/comment
+    :param instance: opinion/comment
+    """
+    get_search_backend().index(instance)
+
+
+def remove_from_search_index(instance: TypeContent):
+    """
+    Remove an opinion/comment from the search index
+    :param instance: opinion/comment
+    """
+    get_search_backend().remove(type(instance), instance.pk)
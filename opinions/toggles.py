@@ -0,0 +1,224 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from typing import Any, List, Optional, Tuple, Type, Union
+
+from django.db import connection, models
+from django.db.models.signals import post_save
+
+from categories.models import Status
+from user.models import User
+from .counters import adjust_counters, agreement_count_field
+from .models import Opinion, Comment, AgreementStatus
+
+
+def insert_if_absent(
+    model: Type[models.Model], **values
+) -> Optional[models.Model]:
+    """
+    Insert a row in a single statement, unless it would violate a unique
+    constraint. As with save(), post_save is sent for an inserted row.
+    :param model: model to insert
+    :param values: field values
+    :return: new instance if inserted, otherwise None
+    """
+    instance = model(**values)
+    meta = model._meta
+    fields = [
+        field for field in meta.concrete_fields if not field.primary_key
+    ]
+    quote = connection.ops.quote_name
+    sql = f'INSERT INTO {quote(meta.db_table)} ' \
+          f'({", ".join([quote(field.column) for field in fields])}) ' \
+          f'VALUES ({", ".join(["%s"] * len(fields))}) ' \
+          f'ON CONFLICT DO NOTHING RETURNING {quote(meta.pk.column)}'
+    params = [
+        field.get_db_prep_save(field.pre_save(instance, True), connection)
+        for field in fields
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None     # already exists
+
+    instance.pk = row[0]
+    instance._state.adding = False
+    instance._state.db = connection.alias
+    post_save.send(
+        sender=model, instance=instance, created=True, update_fields=None,
+        raw=False, using=connection.alias)
+    return instance
+
+
+def upsert(
+    model: Type[models.Model], conflict: List[str], update: List[str],
+    **values
+) -> Optional[Tuple[Any, Optional[Any]]]:
+    """
+    Insert a row, or update the existing row which would violate the unique
+    constraint on the `conflict` fields, in a single statement. An existing
+    row is only updated if the value of the first `update` field changes.
+    As with save(), post_save is sent for an inserted or updated row.
+    Note: on PostgreSQL the previous value is read by the same statement,
+    other databases read it with a separate query beforehand.
+    :param model: model to insert/update
+    :param conflict: names of the fields of the unique constraint
+    :param update: names of the fields to update on conflict
+    :param values: field values
+    :return: tuple of (primary key, previous value of first `update` field
+            or None if inserted), or None if no change
+    """
+    instance = model(**values)
+    meta = model._meta
+    fields = [
+        field for field in meta.concrete_fields if not field.primary_key
+    ]
+    conflict_fields = [meta.get_field(name) for name in conflict]
+    update_fields = [meta.get_field(name) for name in update]
+    quote = connection.ops.quote_name
+    table = quote(meta.db_table)
+    changed = quote(update_fields[0].column)
+    conflict_cols = [quote(field.column) for field in conflict_fields]
+    update_cols = [quote(field.column) for field in update_fields]
+    assign = ', '.join(
+        [f'{column} = EXCLUDED.{column}' for column in update_cols])
+    params = [
+        field.get_db_prep_save(field.pre_save(instance, True), connection)
+        for field in fields
+    ]
+    returning = [quote(meta.pk.column)]
+
+    previous_sql = ''
+    read_previous = connection.vendor == 'postgresql'
+    if read_previous:
+        # the statement's snapshot predates the insert/update
+        match = ' AND '.join([f'{column} = %s' for column in conflict_cols])
+        previous_sql = f'WITH previous AS (SELECT {changed} FROM {table} ' \
+                       f'WHERE {match}) '
+        params = [
+            field.get_db_prep_save(
+                getattr(instance, field.attname), connection)
+            for field in conflict_fields
+        ] + params
+        returning.extend([
+            f'(SELECT {changed} FROM previous)',
+            'NOT EXISTS (SELECT 1 FROM previous)'
+        ])
+    else:
+        # e.g. SQLite evaluates RETURNING subqueries after the change
+        existing = model.objects.filter(**{
+            field.attname: getattr(instance, field.attname)
+            for field in conflict_fields
+        }).values_list(update_fields[0].attname).first()
+
+    sql = f'{previous_sql}INSERT INTO {table} ' \
+          f'({", ".join([quote(field.column) for field in fields])}) ' \
+          f'VALUES ({", ".join(["%s"] * len(fields))}) ' \
+          f'ON CONFLICT ({", ".join(conflict_cols)}) ' \
+          f'DO UPDATE SET {assign} ' \
+          f'WHERE {table}.{changed} IS DISTINCT FROM EXCLUDED.{changed} ' \
+          f'RETURNING {", ".join(returning)}'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None     # no change
+
+    if read_previous:
+        pk, previous, created = row[0], row[1], bool(row[2])
+    else:
+        pk, previous, created = row[0], \
+            existing[0] if existing else None, existing is None
+    instance.pk = pk
+    instance._state.adding = False
+    instance._state.db = connection.alias
+    post_save.send(
+        sender=model, instance=instance, created=created,
+        update_fields=None if created else frozenset(update), raw=False,
+        using=connection.alias)
+    return pk, previous
+
+
+def set_reaction(
+    model: Type[models.Model], present: bool, **lookups
+) -> bool:
+    """
+    Add or remove a reaction, e.g. hide, pin or follow
+    :param model: reaction model
+    :param present: add reaction flag
+    :param lookups: reaction field values
+    :return: True if reaction changed
+    """
+    if present:
+        changed = insert_if_absent(model, **lookups) is not None
+    else:
+        deleted, _ = model.objects.filter(**lookups).delete()
+        changed = deleted > 0
+    return changed
+
+
+def toggle_agreement(
+    content: Union[Opinion, Comment], user: User, status: Status
+) -> Optional[Status]:
+    """
+    Toggle an agree/disagree reaction to content, and adjust the content
+    counters. Reacting with the current status removes the reaction,
+    otherwise the status is set.
+    :param content: opinion/comment
+    :param user: user reacting
+    :param status: agreement status
+    :return: new status or None if reaction removed
+    """
+    content_field = AgreementStatus.content_field(content)
+    lookups = {
+        content_field: content,
+        AgreementStatus.USER_FIELD: user
+    }
+    count_field = agreement_count_field(status)
+
+    deleted, _ = AgreementStatus.objects.filter(**lookups, **{
+        AgreementStatus.STATUS_FIELD: status
+    }).delete()
+    if deleted:
+        # toggle off
+        adjust_counters(content, **{count_field: -deleted})
+        return None
+
+    result = upsert(
+        AgreementStatus,
+        [AgreementStatus.USER_FIELD, content_field],
+        [AgreementStatus.STATUS_FIELD, AgreementStatus.UPDATED_FIELD],
+        **lookups, **{AgreementStatus.STATUS_FIELD: status}
+    )
+    if result is not None:
+        _, previous = result
+        deltas = {count_field: 1}
+        if previous is not None:
+            # change from the other status
+            deltas[
+                Opinion.DISAGREE_COUNT_FIELD
+                if count_field == Opinion.AGREE_COUNT_FIELD else
+                Opinion.AGREE_COUNT_FIELD
+            ] = -1
+        adjust_counters(content, **deltas)
+    return status
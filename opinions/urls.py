@@ -54,7 +54,11 @@ from opinions.constants import (
     OPINION_REVIEW_STATUS_ID_ROUTE_NAME, OPINION_REVIEW_DECISION_ID_URL,
     OPINION_REVIEW_DECISION_ID_ROUTE_NAME, COMMENT_REVIEW_STATUS_ID_URL,
     COMMENT_REVIEW_STATUS_ID_ROUTE_NAME, COMMENT_REVIEW_DECISION_ID_URL,
-    COMMENT_REVIEW_DECISION_ID_ROUTE_NAME,
+    COMMENT_REVIEW_DECISION_ID_ROUTE_NAME, OPINION_REVIEW_BULK_URL,
+    OPINION_REVIEW_BULK_ROUTE_NAME, COMMENT_REVIEW_BULK_URL,
+    COMMENT_REVIEW_BULK_ROUTE_NAME, OPINION_REVIEW_CLAIM_URL,
+    OPINION_REVIEW_CLAIM_ROUTE_NAME, COMMENT_REVIEW_CLAIM_URL,
+    COMMENT_REVIEW_CLAIM_ROUTE_NAME,
 )
 from opinions.views.comment_create import (
     OpinionCommentCreate, CommentCommentCreate
@@ -67,7 +71,8 @@ from opinions.views.opinion_by_id import (
     OpinionDetailById, OpinionDetailBySlug, OpinionDetailPreviewById,
     opinion_status_patch, opinion_like_patch, opinion_hide_patch,
     opinion_pin_patch, opinion_report_post, opinion_follow_patch,
-    opinion_review_status_patch, opinion_review_decision_post
+    opinion_review_status_patch, opinion_review_decision_post,
+    opinion_review_bulk_post, opinion_review_claim_post
 )
 from opinions.views.opinion_list import (
     OpinionList, OpinionSearch, OpinionFollowed, OpinionInReview
@@ -75,7 +80,8 @@ from opinions.views.opinion_list import (
 from opinions.views.comment_by_id import (
     comment_like_patch, comment_report_post, comment_hide_patch,
     CommentDetailById, CommentDetailBySlug, comment_follow_patch,
-    comment_review_status_patch, comment_review_decision_post
+    comment_review_status_patch, comment_review_decision_post,
+    comment_review_bulk_post, comment_review_claim_post
 )
 
 # https://docs.djangoproject.com/en/4.1/topics/http/urls/#url-namespaces-and-included-urlconfs
@@ -106,6 +112,12 @@ urlpatterns = [
     # opinions in review
     path(OPINION_IN_REVIEW_URL, OpinionInReview.as_view(),
          name=OPINION_IN_REVIEW_ROUTE_NAME),
+    # post review decision for multiple opinions
+    path(OPINION_REVIEW_BULK_URL, opinion_review_bulk_post,
+         name=OPINION_REVIEW_BULK_ROUTE_NAME),
+    # claim opinions pending review
+    path(OPINION_REVIEW_CLAIM_URL, opinion_review_claim_post,
+         name=OPINION_REVIEW_CLAIM_ROUTE_NAME),
     # create opinion
     path(OPINION_NEW_URL, OpinionCreate.as_view(),
          name=OPINION_NEW_ROUTE_NAME),
@@ -151,6 +163,13 @@ urlpatterns = [
     path(COMMENT_IN_REVIEW_URL, CommentInReview.as_view(),
          name=COMMENT_IN_REVIEW_ROUTE_NAME),
 
+    # post review decision for multiple comments
+    path(COMMENT_REVIEW_BULK_URL, comment_review_bulk_post,
+         name=COMMENT_REVIEW_BULK_ROUTE_NAME),
+    # claim comments pending review
+    path(COMMENT_REVIEW_CLAIM_URL, comment_review_claim_post,
+         name=COMMENT_REVIEW_CLAIM_ROUTE_NAME),
+
     # get comment by id
     path(COMMENT_ID_URL, CommentDetailById.as_view(),
          name=COMMENT_ID_ROUTE_NAME),
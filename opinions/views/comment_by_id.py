@@ -26,6 +26,7 @@ from http import HTTPStatus
 
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from django.http import (
     HttpRequest, HttpResponse, JsonResponse
 )
@@ -35,7 +36,7 @@ from django.views import View
 from django.views.decorators.http import require_http_methods
 
 from categories.constants import STATUS_DELETED, STATUS_PREVIEW
-from categories.models import Status
+from categories.registry import get_status
 from opinions.comment_data import (
     get_comment_query_args, CommentData, get_comments_review_status
 )
@@ -49,6 +50,7 @@ from opinions.constants import (
     REVIEW_RECORD_CTX, STATUS_BG_CTX, IS_PREVIEW_CTX, IS_REVIEW_CTX,
     OPINION_CONTENT_STATUS_CTX, SUBMIT_URL_CTX, COMMENT_OFFSET_CTX
 )
+from opinions.counters import adjust_comment_counters
 from opinions.enums import ReactionStatus, ViewMode
 from opinions.forms import CommentForm, ReportForm
 from opinions.models import Comment
@@ -62,7 +64,7 @@ from opinions.reactions import COMMENT_REACTIONS, get_reaction_status
 from opinions.views.comment_create import get_comment_offset
 from opinions.views.opinion_by_id import (
     like_patch, report_post, hide_patch, follow_patch, review_status_patch,
-    review_decision_post, TITLE_UPDATE
+    review_decision_post, review_bulk_post, review_claim_post, TITLE_UPDATE
 )
 from opinions.views.utils import (
     opinion_permission_check, comment_permission_check, DEFAULT_COMMENT_DEPTH,
@@ -300,11 +302,12 @@ class CommentDetail(LoginRequiredMixin, View):
                     f'Unknown {REFERENCE_QUERY} query value: '
                     f'{request.GET[REFERENCE_QUERY]}')
 
-        comment_obj.content = ""
-        comment_obj.status = Status.objects.get(**{
-            f'{Status.NAME_FIELD}': STATUS_DELETED
-        })
-        comment_obj.save()
+        with transaction.atomic():
+            if comment_obj.status.name != STATUS_DELETED:
+                adjust_comment_counters(comment_obj, -1)
+            comment_obj.content = ""
+            comment_obj.status = get_status(STATUS_DELETED)
+            comment_obj.save()
 
         return get_render_comment_response(
             request, comment_obj.id, template=template)
@@ -532,6 +535,32 @@ def comment_review_decision_post(
     return review_decision_post(request, Comment, pk)
 
 
+@login_required
+@require_http_methods([POST])
+def comment_review_bulk_post(request: HttpRequest) -> JsonResponse:
+    """
+    View function to update the review decision status of multiple comments.
+    :param request: http request
+    :return: http response
+    """
+    comment_permission_check(request, Crud.UPDATE)
+
+    return review_bulk_post(request, Comment)
+
+
+@login_required
+@require_http_methods([POST])
+def comment_review_claim_post(request: HttpRequest) -> JsonResponse:
+    """
+    View function to claim comments pending review.
+    :param request: http request
+    :return: http response
+    """
+    comment_permission_check(request, Crud.UPDATE)
+
+    return review_claim_post(request, Comment)
+
+
 @login_required
 @require_http_methods([PATCH])
 def comment_hide_patch(request: HttpRequest, pk: int) -> HttpResponse:
@@ -24,6 +24,7 @@ from http import HTTPStatus
 from typing import Tuple
 
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from django.http import (
     HttpRequest, HttpResponse, JsonResponse
 )
@@ -32,13 +33,13 @@ from django.template.loader import render_to_string
 from django.views import View
 
 from categories import STATUS_PUBLISHED
-from categories.models import Status
+from categories.registry import get_status
 from opinions.constants import (
     HTML_CTX, COMMENT_OFFSET_CTX, REFERENCE_QUERY,
     OPINION_ID_ROUTE_NAME, COMMENTS_ROUTE_NAME, SINGLE_COMMENT_ROUTE_NAMES
 )
 from opinions.contexts.comment import get_comment_bundle_context
-from opinions.views.comment_queries import get_query_from_route
+from opinions.views.comment_queries import get_route_comment_level
 from soapbox import (
     OPINIONS_APP_NAME
 )
@@ -46,6 +47,7 @@ from utils import (
     Crud, app_template_path
 )
 from opinions.comment_data import CommentBundle
+from opinions.counters import adjust_comment_counters
 from opinions.forms import CommentForm
 from opinions.models import Opinion, Comment
 from opinions.views.utils import (
@@ -80,14 +82,14 @@ class CommentCreate(LoginRequiredMixin, View):
             # save new object
             form.instance.user = request.user
             self.comment_hierarchy(form.instance, pk)
-            form.instance.status = Status.objects.get(name=STATUS_PUBLISHED)
+            form.instance.status = get_status(STATUS_PUBLISHED)
             form.instance.set_slug(form.instance.content)
 
             timestamp_content(form.instance)
 
-            comment = form.save()
-            # django autocommits changes
-            # https://docs.djangoproject.com/en/4.1/topics/db/transactions/#autocommit
+            with transaction.atomic():
+                comment = form.save()
+                adjust_comment_counters(comment, 1)
 
             context = get_comment_bundle_context(
                 comment.id, request.user, depth=0, is_dynamic_insert=True
@@ -147,12 +149,12 @@ def get_comment_offset(
         ]:
             pass
         elif called_by.url_name in SINGLE_COMMENT_ROUTE_NAMES:
-            get_param, _ = get_query_from_route(request, called_by=called_by)
-            view_comment = get_object_or_404(Comment, **get_param)
-            comment_offset = view_comment.level + 1
+            view_id, view_level = get_route_comment_level(
+                request, [comment], called_by=called_by)
+            comment_offset = view_level + 1
 
             # top level if comment is 1 level below viewing comment
-            top_level = comment.parent == view_comment.id
+            top_level = comment.parent == view_id
         else:
             raise ValueError(
                 f'Unknown {REFERENCE_QUERY} query value: '
@@ -186,8 +188,7 @@ class OpinionCommentCreate(CommentCreate):
         :param pk:      id of opinion/comment
         """
         comment.opinion = get_object_or_404(Opinion, pk=pk)
-        comment.level = 0
-        comment.parent = Comment.NO_PARENT
+        comment.set_hierarchy()
 
 
 class CommentCommentCreate(CommentCreate):
@@ -214,7 +215,4 @@ class CommentCommentCreate(CommentCreate):
         :param comment: comment instance
         :param pk:      id of opinion/comment
         """
-        parent = get_object_or_404(Comment, pk=pk)
-        comment.opinion = parent.opinion
-        comment.level = parent.level + 1
-        comment.parent = parent.id
+        comment.set_hierarchy(get_object_or_404(Comment, pk=pk))
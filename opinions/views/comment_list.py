@@ -29,7 +29,6 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import QuerySet
 from django.http import HttpRequest, HttpResponse, JsonResponse
-from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
 from django.views.decorators.http import require_http_methods
 
@@ -38,7 +37,7 @@ from opinions.comment_data import (
 )
 from opinions.views.comment_queries import (
     get_comment_lookup, COMMENT_ALWAYS_FILTERS, COMMENT_FILTERS_ORDER,
-    get_query_from_route
+    get_route_comment_level
 )
 from opinions.constants import (
     STATUS_QUERY, AUTHOR_QUERY, SEARCH_QUERY, COMMENT_LIST_CTX,
@@ -46,7 +45,7 @@ from opinions.constants import (
     PAGE_HEADING_CTX, TITLE_CTX, HTML_CTX, TEMPLATE_COMMENT_REACTIONS,
     TEMPLATE_REACTION_CTRLS, REVIEW_QUERY, IS_REVIEW_CTX, COMMENT_OFFSET_CTX,
     OPINION_ID_ROUTE_NAME, REFERENCE_QUERY, NO_CONTENT_MSG_CTX,
-    NO_CONTENT_HELP_CTX, MESSAGE_CTX, SINGLE_COMMENT_ROUTE_NAMES
+    NO_CONTENT_HELP_CTX, MESSAGE_CTX, SINGLE_COMMENT_ROUTE_NAMES, COMMENTS_CTX
 )
 from opinions.contexts.comment import comments_list_context_for_opinion
 from opinions.enums import QueryArg, QueryStatus, CommentSortOrder, SortOrder
@@ -533,9 +532,12 @@ def opinion_comments(request: HttpRequest) -> HttpResponse:
         if called_by.url_name == OPINION_ID_ROUTE_NAME:
             pass
         elif called_by.url_name in SINGLE_COMMENT_ROUTE_NAMES:
-            get_param, _ = get_query_from_route(request, called_by=called_by)
-            parent = get_object_or_404(Comment, **get_param)
-            comment_offset = parent.level + 1
+            _, parent_level = get_route_comment_level(
+                request, [
+                    bundle.comment for bundle in context[COMMENTS_CTX]
+                    if not bundle.is_more_placeholder
+                ], called_by=called_by)
+            comment_offset = parent_level + 1
         else:
             raise ValueError(
                 f'Unknown {REFERENCE_QUERY} query value: '
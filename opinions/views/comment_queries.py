@@ -26,9 +26,10 @@ from zoneinfo import ZoneInfo
 
 from django.db.models import Q, QuerySet
 from django.http import HttpRequest
+from django.shortcuts import get_object_or_404
 from django.urls import ResolverMatch
 
-from categories.models import Status
+from categories.registry import STATUS_REGISTRY, status_id
 from opinions.views.opinion_queries import NON_LOOKUP_ARGS
 from user.models import User
 from opinions.constants import (
@@ -40,6 +41,7 @@ from opinions.constants import (
 )
 from opinions.models import Opinion, Comment
 from opinions.query_params import QuerySetParams, choice_arg_query
+from opinions.text_search import text_search_query
 from opinions.search import (
     regex_matchers, TERM_GROUP, regex_date_matchers, DATE_QUERY_GROUP,
     DATE_QUERY_YR_GROUP, DATE_QUERY_MTH_GROUP,
@@ -64,7 +66,7 @@ FIELD_LOOKUPS = {
     # TODO opinion
     # https://docs.djangoproject.com/en/4.1/ref/models/querysets/#exact
     ID_QUERY: f'{Comment.id_field()}',
-    STATUS_QUERY: f'{Comment.STATUS_FIELD}__{Status.NAME_FIELD}',
+    STATUS_QUERY: f'{Comment.STATUS_FIELD}',
     CONTENT_QUERY: f'{Comment.CONTENT_FIELD}__icontains',
     AUTHOR_QUERY: f'{Comment.USER_FIELD}__{User.USERNAME_FIELD}__icontains',
     OPINION_ID_QUERY: f'{Comment.OPINION_FIELD}__{Opinion.id_field()}',
@@ -125,7 +127,7 @@ def get_comment_lookup(
             query_set_params.add_all_inclusive(query)
         else:
             query_set_params.add_and_lookup(
-                query, FIELD_LOOKUPS[query], value.display)
+                query, FIELD_LOOKUPS[query], status_id(value.display))
         # else do not include status in query
     elif query == HIDDEN_QUERY:
         # get_hidden_query(query_set_params, value, user)
@@ -159,7 +161,7 @@ def get_comment_search_term(
                 choice_arg_query(
                     query_set_params, match.group(group).lower(),
                     QueryStatus, QueryStatus.ALL,
-                    Status, Status.NAME_FIELD, query, FIELD_LOOKUPS[query]
+                    STATUS_REGISTRY, query, FIELD_LOOKUPS[query]
                 )
             elif query == HIDDEN_QUERY:
                 # need to filter/exclude by list of comments that the user has
@@ -190,30 +192,10 @@ def get_comment_search_term(
                     map(lambda x: x in value, MARKER_CHARS)
                 )
         ):
-            # no delimiting chars, so search content for
+            # no delimiting chars, so text search content for
             # any of the search terms
-            to_query = [CONTENT_QUERY]
-            or_q = {}
-            for term in value.split():
-                if len(or_q) == 0:
-                    or_q = {q: [term] for q in to_query}
-                else:
-                    or_q[CONTENT_QUERY].append(term)
-
-            # https://docs.djangoproject.com/en/4.1/topics/db/queries/#complex-lookups-with-q
-
-            # OR queries of title and content contains terms
-            # e.g. [
-            #   "WHERE ("title") LIKE '<term>'",
-            #   "WHERE ("content") LIKE '<term>'"
-            # ]
-            for qry in to_query:
-                query_set_params.add_or_lookup(
-                    '-'.join(to_query),
-                    Q(_connector=Q.OR, **{
-                        FIELD_LOOKUPS[qry]: term for term in or_q[qry]
-                    })
-                )
+            text_search_query(
+                query_set_params, CONTENT_QUERY, Comment, value.split())
 
     return query_set_params
 
@@ -240,6 +222,48 @@ def get_comment_queryset(
     return query_set_params.apply(Comment.objects)
 
 
+def get_comment_descendants(
+    parents: list[Comment], query_params: dict[str, QueryArg], user: User,
+    depth: int
+) -> dict[int, list[Comment]]:
+    """
+    Get the descendants of the specified comments, down to the specified
+    depth, which satisfy the query. The comment paths allow all the
+    descendants to be retrieved with a single query.
+    :param parents: comments to get descendants of
+    :param query_params: request query; parent and id queries are ignored
+    :param user: current user
+    :param depth: number of levels of descendants to get
+    :return: dict of the form {
+                   key: parent comment id
+                   value: list of child comments, in id order
+               }
+    """
+    children = {}
+    if not parents or depth < 1:
+        return children
+
+    # filter for each level is the same except for the parent
+    level_params = {
+        query: param for query, param in query_params.items()
+        if query not in [PARENT_ID_QUERY, ID_QUERY]
+    }
+    subtree = Q()
+    for parent in parents:
+        subtree |= Q(**{
+            f'{Comment.PATH_FIELD}__startswith': parent.descendant_path,
+            f'{Comment.LEVEL_FIELD}__lte': parent.level + depth,
+        })
+
+    # descendants of comments excluded by the query are also retrieved,
+    # but as they are not reachable from the parents they are ignored
+    for comment in get_comment_queryset(
+            level_params, user).filter(subtree).order_by(Comment.id_field()):
+        children.setdefault(comment.parent, []).append(comment)
+
+    return children
+
+
 def get_query_from_route(
     request: HttpRequest, called_by:  ResolverMatch = None
 ) -> Tuple[Optional[dict], Optional[str]]:
@@ -263,3 +287,35 @@ def get_query_from_route(
             }
 
     return get_param, route
+
+
+def get_route_comment_level(
+    request: HttpRequest, comments: list[Comment],
+    called_by: ResolverMatch = None
+) -> Tuple[int, int]:
+    """
+    Get the id and level of the comment specified by the request. The
+    hierarchy of `comments` is used where possible, otherwise the database
+    is queried.
+    :param request: http request
+    :param comments: comments which may be descendants of the comment
+    :param called_by: resolver match: default None
+    :return: tuple of comment id and level
+    """
+    get_param, _ = get_query_from_route(request, called_by=called_by)
+
+    pk = get_param.get(Comment.id_field())
+    if pk is not None:
+        pk = int(pk)
+        for comment in comments:
+            if comment.id == pk:
+                return pk, comment.level
+            ancestors = comment.ancestor_ids
+            if pk in ancestors:
+                # level is the same as the position in the path
+                return pk, ancestors.index(pk)
+
+    return get_object_or_404(
+        Comment.objects.values_list(
+            Comment.id_field(), Comment.LEVEL_FIELD),
+        **get_param)
@@ -32,19 +32,31 @@ from django.views import generic
 from opinions.constants import (
     ORDER_QUERY, UPDATED_FIELD, PER_PAGE_QUERY,
     OPINION_PAGINATION_ON_EACH_SIDE, OPINION_PAGINATION_ON_ENDS, AUTHOR_QUERY,
-    FILTER_QUERY, REORDER_QUERY
+    FILTER_QUERY, REORDER_QUERY, CURSOR_QUERY, CURSOR_PAGINATION_CTX
 )
 from opinions.enums import SortOrder, QueryArg, PerPage, FilterMode, QueryType
 from opinions.query_params import QuerySetParams
+from opinions.text_search import SEARCH_RANK_FIELD
 from opinions.views.utils import (
     get_query_args, QueryOption, REORDER_REQ_QUERY_ARGS
 )
-from utils import Crud, DESC_LOOKUP, DATE_NEWEST_LOOKUP
+from utils import (
+    Crud, DESC_LOOKUP, DATE_NEWEST_LOOKUP, KeysetPaginator, profiled
+)
 
 
 class ContentListMixin(generic.ListView):
     """ Mixin for content list views """
 
+    cursor_pagination = False
+    """
+    Paginate by cursor rather than page number; the cost of a page is
+    independent of its position in the list, but pages can only be
+    stepped through
+    """
+    cursor_approx_total = False
+    """ Include an approximate total with cursor pagination """
+
     def __init__(self):
         # sort order options to display
         self.sort_order = None
@@ -56,6 +68,8 @@ class ContentListMixin(generic.ListView):
         # query type
         self.query_type = QueryType.UNKNOWN
         self.sub_query_type = None
+        # order by text search relevance flag
+        self.rank_ordering = False
 
     def initialise(self, non_reorder_args: List[str] = None):
         """
@@ -69,6 +83,7 @@ class ContentListMixin(generic.ListView):
             if a.query not in REORDER_REQ_QUERY_ARGS
         ] if non_reorder_args is None else non_reorder_args
 
+    @profiled
     def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
         """
         GET method for Opinion list
@@ -213,6 +228,9 @@ class ContentListMixin(generic.ListView):
         ordering.append(f'{self.model.id_field()}')
         # inherited from MultipleObjectMixin via ListView
         self.ordering = tuple(ordering)
+        # text search without a requested order, most relevant first
+        self.rank_ordering = not query_params[ORDER_QUERY].was_set and \
+            SEARCH_RANK_FIELD in self.queryset.query.annotations
 
     def get_sort_order_enum(self) -> Type[SortOrder]:
         """
@@ -232,6 +250,23 @@ class ContentListMixin(generic.ListView):
         # inherited from MultipleObjectMixin via ListView
         self.paginate_by = query_params[PER_PAGE_QUERY].value_arg_or_value
 
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginate the queryset
+        :param queryset: queryset to paginate
+        :param page_size: number of items per page
+        :return: tuple of paginator (None for cursor pagination), page,
+                object list and is paginated flag
+        """
+        if not self.cursor_pagination:
+            return super().paginate_queryset(queryset, page_size)
+
+        page = KeysetPaginator(
+            queryset, self.get_ordering(), page_size
+        ).page(self.request.GET.get(CURSOR_QUERY),
+               approx_total=self.cursor_approx_total)
+        return None, page, page.object_list, page.has_other_pages()
+
     def get_ordering(self):
         """ Get ordering of list """
         ordering = self.ordering
@@ -248,6 +283,8 @@ class ContentListMixin(generic.ListView):
                     if order.startswith(DESC_LOOKUP) else Lower(order)
             ordering = tuple(
                 map(insensitive_order, ordering))
+            if self.rank_ordering:
+                ordering = (f'{DESC_LOOKUP}{SEARCH_RANK_FIELD}', *ordering)
         return ordering
 
     def context_std_elements(self, context: dict) -> dict:
@@ -270,7 +307,8 @@ class ContentListMixin(generic.ListView):
             )[0],
             'per_page': list(PerPage),
             'selected_per_page': self.paginate_by,
-            'page_links': [{
+            CURSOR_PAGINATION_CTX: self.cursor_pagination,
+            'page_links': [] if self.cursor_pagination else [{
                 'page_num': page,
                 'disabled': page == Paginator.ELLIPSIS,
                 'href':
@@ -25,6 +25,7 @@ from typing import Optional, Union, Type, List
 
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import PermissionDenied
 from django.db import transaction
 from django.db.models import Model
 from django.http import (
@@ -38,7 +39,7 @@ from django.views.decorators.http import require_http_methods
 from categories import (
     STATUS_PREVIEW, STATUS_PENDING_REVIEW
 )
-from categories.models import Status
+from categories.registry import get_status
 from opinions.comment_data import get_comment_query_args
 from opinions.contexts.comment import comments_list_context_for_opinion
 from soapbox import (
@@ -46,8 +47,9 @@ from soapbox import (
 )
 from utils import (
     app_template_path, redirect_on_success_or_render, Crud, reverse_q,
-    namespaced_url, ensure_list, ModelMixin
+    namespaced_url, ensure_list, ModelMixin, profiled
 )
+from user.queries import is_moderator
 from opinions.constants import (
     OPINION_ID_ROUTE_NAME, OPINION_SLUG_ROUTE_NAME,
     OPINION_PREVIEW_ID_ROUTE_NAME, TEMPLATE_TARGET_ID,
@@ -61,12 +63,15 @@ from opinions.constants import (
     STATUS_QUERY, MODE_QUERY, IS_REVIEW_CTX, IS_ASSIGNED_CTX,
     REVIEW_RECORD_CTX, REWRITES_PROP_CTX, STATUS_BG_CTX, ACTION_URL_CTX,
     OPINION_REVIEW_DECISION_ID_ROUTE_NAME,
-    COMMENT_REVIEW_DECISION_ID_ROUTE_NAME,
+    COMMENT_REVIEW_DECISION_ID_ROUTE_NAME, COUNT_CTX, IDS_FIELD,
+)
+from opinions.counters import adjust_counters
+from opinions.forms import (
+    OpinionForm, CommentForm, ReportForm, ReviewForm, BulkReviewForm,
+    ReviewClaimForm
 )
-from opinions.forms import OpinionForm, CommentForm, ReportForm, ReviewForm
 from opinions.models import (
-    Opinion, Comment, AgreementStatus, HideStatus, PinStatus, Review,
-    FollowStatus
+    Opinion, Comment, HideStatus, PinStatus, Review, FollowStatus
 )
 from opinions.queries import (
     content_status_check, effective_content_status, content_review_history,
@@ -75,7 +80,12 @@ from opinions.queries import (
 from opinions.reactions import (
     OPINION_REACTIONS, COMMENT_REACTIONS, get_reaction_status
 )
+from opinions.review_state import (
+    update_review_state, bulk_review_decision, claim_reviews,
+    REVIEW_COPY_FIELDS
+)
 from opinions.templatetags.reaction_ul_id import reaction_ul_id
+from opinions.toggles import set_reaction, toggle_agreement
 from opinions.views.utils import (
     opinion_permission_check, content_save_query_args, timestamp_content,
     own_content_check, published_check, get_opinion_context,
@@ -102,6 +112,7 @@ class OpinionDetail(LoginRequiredMixin, View):
     Class-based view for individual opinion view/update
     """
 
+    @profiled
     def get(self, request: HttpRequest,
             identifier: [int, str], *args, **kwargs) -> HttpResponse:
         """
@@ -598,32 +609,9 @@ def like_patch(
 
     code = HTTPStatus.BAD_REQUEST
     if reaction in [ReactionStatus.AGREE, ReactionStatus.DISAGREE]:
-        query_args = {
-            AgreementStatus.content_field(content): content,
-            AgreementStatus.USER_FIELD: request.user
-        }
-        query = AgreementStatus.objects.filter(**query_args)
-
-        code = HTTPStatus.NO_CONTENT
-        if query.exists():
-            agreement = query.first()
-            if agreement.status != status:
-                # change status
-                agreement.status = status
-                agreement.save()
-                code = HTTPStatus.OK
-            else:
-                # toggle status
-                deleted, _ = query.delete()
-                if deleted:
-                    code = HTTPStatus.OK
-        else:
-            query_args.update({
-                AgreementStatus.STATUS_FIELD: status
-            })
-            agreement = AgreementStatus.objects.create(**query_args)
-            if agreement is not None:
-                code = HTTPStatus.OK
+        with transaction.atomic():
+            toggle_agreement(content, request.user, status)
+        code = HTTPStatus.OK
 
     return react_response(request, content, code)
 
@@ -649,16 +637,14 @@ def opinion_pin_patch(request: HttpRequest, pk: int) -> HttpResponse:
             PinStatus.OPINION_FIELD: opinion_obj,
             PinStatus.USER_FIELD: request.user
         }
-        query = PinStatus.objects.filter(**query_args)
 
         code = HTTPStatus.NO_CONTENT
-        if query.exists() and reaction == ReactionStatus.UNPIN:
-            deleted, _ = query.delete()
-            if deleted:
-                code = HTTPStatus.OK
-        elif reaction == ReactionStatus.PIN:
-            _, created = PinStatus.objects.get_or_create(**query_args)
-            if created:
+        pin = reaction == ReactionStatus.PIN
+        with transaction.atomic():
+            if set_reaction(PinStatus, pin, **query_args):
+                adjust_counters(opinion_obj, **{
+                    Opinion.PIN_COUNT_FIELD: 1 if pin else -1
+                })
                 code = HTTPStatus.OK
 
     return react_response(request, opinion_obj, code)
@@ -697,13 +683,13 @@ def report_post(
         # save new object
         setattr(form.instance, Review.content_field(content), content)
         form.instance.requested = request.user
-        form.instance.status = Status.objects.get(name=STATUS_PENDING_REVIEW)
+        form.instance.status = get_status(STATUS_PENDING_REVIEW)
 
         timestamp_content(form.instance)
 
-        form.save()
-        # django autocommits changes
-        # https://docs.djangoproject.com/en/4.1/topics/db/transactions/#autocommit
+        with transaction.atomic():
+            form.save()
+            update_review_state(content)
 
         response = react_response(request, content, HTTPStatus.OK)
 
@@ -729,10 +715,7 @@ def opinion_review_status_patch(
     return review_status_patch(request, Opinion, pk)
 
 
-REVIEW_UPDATE_COPY_FIELDS = [
-    Review.OPINION_FIELD, Review.COMMENT_FIELD,
-    Review.REASON_FIELD, Review.REQUESTED_FIELD
-]
+REVIEW_UPDATE_COPY_FIELDS = REVIEW_COPY_FIELDS
 
 
 def review_status_patch(
@@ -759,9 +742,7 @@ def review_status_patch(
 
     effective_status = query_params.get(STATUS_QUERY).value
     params = {
-        Review.STATUS_FIELD: Status.objects.get(**{
-            f'{Status.NAME_FIELD}': effective_status.display
-        }),
+        Review.STATUS_FIELD: get_status(effective_status.display),
         Review.REVIEWER_FIELD: request.user,
         Review.content_field(model): content
     }
@@ -882,9 +863,7 @@ def review_decision_post(
     if form.is_valid():
         query_status = QueryStatus.from_arg(
             form.data[ReviewForm.REVIEW_RESULT_FF])
-        new_status = Status.objects.get(**{
-            f'{Status.NAME_FIELD}': query_status.display
-        })
+        new_status = get_status(query_status.display)
         params = {
             Review.STATUS_FIELD: new_status,
             Review.REVIEWER_FIELD: request.user,
@@ -909,6 +888,102 @@ def review_decision_post(
     return response
 
 
+@login_required
+@require_http_methods([POST])
+def opinion_review_bulk_post(request: HttpRequest) -> JsonResponse:
+    """
+    View function to update the review decision status of multiple opinions.
+    :param request: http request
+    :return: http response
+    """
+    opinion_permission_check(request, Crud.UPDATE)
+
+    return review_bulk_post(request, Opinion)
+
+
+def review_bulk_post(
+        request: HttpRequest, model: Type[Model]) -> JsonResponse:
+    """
+    View function to update the review decision status of multiple content
+    items.
+    :param request: http request
+    :param model:   content model class
+    :return: http response
+    """
+    moderator_permission_check(request)
+
+    form = BulkReviewForm(data=request.POST)
+
+    if form.is_valid():
+        content_ids = bulk_review_decision(
+            model, form.cleaned_data[BulkReviewForm.IDS_FF],
+            QueryStatus.from_arg(
+                form.cleaned_data[BulkReviewForm.REVIEW_RESULT_FF]),
+            request.user)
+
+        response = JsonResponse({
+            COUNT_CTX: len(content_ids)
+        }, status=HTTPStatus.OK)
+
+    else:
+        # display form errors
+        response = form_errors_response(form, request=request)
+
+    return response
+
+
+@login_required
+@require_http_methods([POST])
+def opinion_review_claim_post(request: HttpRequest) -> JsonResponse:
+    """
+    View function to claim opinions pending review.
+    :param request: http request
+    :return: http response
+    """
+    opinion_permission_check(request, Crud.UPDATE)
+
+    return review_claim_post(request, Opinion)
+
+
+def review_claim_post(
+        request: HttpRequest, model: Type[Model]) -> JsonResponse:
+    """
+    View function to claim content items pending review.
+    :param request: http request
+    :param model:   content model class
+    :return: http response
+    """
+    moderator_permission_check(request)
+
+    form = ReviewClaimForm(data=request.POST)
+
+    if form.is_valid():
+        content_ids = claim_reviews(
+            model, request.user, form.cleaned_data[ReviewClaimForm.COUNT_FF])
+
+        response = JsonResponse({
+            COUNT_CTX: len(content_ids),
+            IDS_FIELD: content_ids
+        }, status=HTTPStatus.OK)
+
+    else:
+        # display form errors
+        response = form_errors_response(form, request=request)
+
+    return response
+
+
+def moderator_permission_check(request: HttpRequest):
+    """
+    Check request user is a moderator who may make review decisions
+    :param request: http request
+    :raises PermissionDenied: if not a moderator
+    """
+    review_permission_check(request, Crud.CREATE)
+    if not is_moderator(request.user):
+        raise PermissionDenied("Only moderators may make review decisions")
+
+
 def save_new_review_status_post(
         content: Union[Opinion, Comment],
         review: Union[Union[Review, ReviewForm],
@@ -928,6 +1003,7 @@ def save_new_review_status_post(
         # add new record(s)
         for record in ensure_list(review):
             record.save()
+        update_review_state(content)
 
 
 def react_response(
@@ -1001,17 +1077,15 @@ def hide_patch(
             HideStatus.content_field(content): content,
             HideStatus.USER_FIELD: request.user
         }
-        query = HideStatus.objects.filter(**query_args)
 
         code = HTTPStatus.NO_CONTENT
-        if query.exists() and reaction == ReactionStatus.SHOW:
-            # remove hide record if exists, otherwise no change
-            deleted, _ = query.delete()
-            if deleted:
-                code = HTTPStatus.OK
-        elif reaction == ReactionStatus.HIDE:
-            obj, created = HideStatus.objects.get_or_create(**query_args)
-            if created:
+        hide = reaction == ReactionStatus.HIDE
+        with transaction.atomic():
+            # no change if already hidden/shown
+            if set_reaction(HideStatus, hide, **query_args):
+                adjust_counters(content, **{
+                    model.HIDE_COUNT_FIELD: 1 if hide else -1
+                })
                 code = HTTPStatus.OK
 
     return redirect_response(HOME_URL, extra={
@@ -1052,17 +1126,10 @@ def follow_patch(
             FollowStatus.AUTHOR_FIELD: content.user,
             FollowStatus.USER_FIELD: request.user
         }
-        query = FollowStatus.objects.filter(**query_args)
 
-        code = HTTPStatus.NO_CONTENT
-        if query.exists() and reaction == ReactionStatus.UNFOLLOW:
-            # remove follow record if exists, otherwise no change
-            deleted, _ = query.delete()
-            if deleted:
-                code = HTTPStatus.OK
-        elif reaction == ReactionStatus.FOLLOW:
-            obj, created = FollowStatus.objects.get_or_create(**query_args)
-            if created:
-                code = HTTPStatus.OK
+        # no change if already followed/unfollowed
+        code = HTTPStatus.OK if set_reaction(
+            FollowStatus, reaction == ReactionStatus.FOLLOW, **query_args
+        ) else HTTPStatus.NO_CONTENT
 
     return react_response(request, content, code)
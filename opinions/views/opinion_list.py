@@ -47,8 +47,8 @@ from opinions.enums import (
 )
 from opinions.models import Opinion
 from opinions.queries import (
-    opinion_is_pinned, content_status_check, followed_author_publications,
-    review_content_by_status
+    content_status_check_bulk, followed_author_publications,
+    review_content_by_status, ReactionState
 )
 from opinions.query_params import QuerySetParams, SearchType
 from opinions.reactions import (
@@ -267,14 +267,16 @@ class OpinionList(LoginRequiredMixin, ContentListMixin):
         """
         context = super().get_context_data(object_list=object_list, **kwargs)
 
-        def is_pinned(opinion: Opinion):
-            """ Check if opinion is pinned by current user """
-            return opinion_is_pinned(opinion, self.user)
-
         self.context_std_elements(
             add_content_no_show_markers(context=context)
         )
 
+        reaction_state = ReactionState(
+            self.user, list(context[OPINION_LIST_CTX]))
+        content_statuses = content_status_check_bulk(
+            Opinion, [opinion.id for opinion in context[OPINION_LIST_CTX]],
+            current_user=self.user)
+
         context.update({
             POPULARITY_CTX: get_popularity_levels(context[OPINION_LIST_CTX]),
             TEMPLATE_OPINION_REACTIONS: OPINION_REACTIONS,
@@ -283,12 +285,13 @@ class OpinionList(LoginRequiredMixin, ContentListMixin):
                 # display pin/unpin
                 reactions=ReactionsList.PIN_FIELDS,
                 visibility={
-                    ReactionsList.PIN_FIELD: is_pinned,
-                    ReactionsList.UNPIN_FIELD: is_pinned
-                }
+                    ReactionsList.PIN_FIELD: reaction_state.is_pinned,
+                    ReactionsList.UNPIN_FIELD: reaction_state.is_pinned
+                },
+                reaction_state=reaction_state
             ),
             CONTENT_STATUS_CTX: [
-                content_status_check(opinion, current_user=self.user)
+                content_statuses[opinion.id]
                 for opinion in context[OPINION_LIST_CTX]
             ],
             STATUS_BG_CTX: STATUS_BADGES,
@@ -723,6 +726,8 @@ class OpinionFollowedFeed(OpinionFollowed):
     """
     Followed author opinion feed response
     """
+    # load more by cursor
+    cursor_pagination = True
 
     def validate_queryset(self, query_params: dict[str, QueryArg]):
         """
@@ -805,6 +810,8 @@ class OpinionCategoryFeed(OpinionList):
     """
     Category opinion feed response
     """
+    # load more by cursor
+    cursor_pagination = True
 
     def valid_req_query_args(self) -> List[QueryOption]:
         """
@@ -928,6 +935,8 @@ class OpinionAllFeed(OpinionList):
     """
     Followed author opinion feed response
     """
+    # load more by cursor
+    cursor_pagination = True
 
     def select_template(self, query_params: dict[str, QueryArg]):
         """
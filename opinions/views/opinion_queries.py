@@ -26,7 +26,9 @@ from zoneinfo import ZoneInfo
 
 from django.db.models import Q, QuerySet
 
-from categories.models import Status, Category
+from categories.registry import (
+    STATUS_REGISTRY, CATEGORY_REGISTRY, status_id
+)
 from opinions.constants import (
     TITLE_QUERY, CONTENT_QUERY, AUTHOR_QUERY, CATEGORY_QUERY, STATUS_QUERY,
     HIDDEN_QUERY, PINNED_QUERY, SEARCH_QUERY, ON_OR_AFTER_QUERY,
@@ -36,6 +38,7 @@ from opinions.constants import (
 from opinions.enums import QueryStatus, Hidden, Pinned, ChoiceArg
 from opinions.models import Opinion, HideStatus, PinStatus
 from opinions.query_params import QuerySetParams, choice_arg_query, SearchType
+from opinions.text_search import text_search_query
 from opinions.search import (
     regex_matchers, TERM_GROUP, DATE_QUERY_YR_GROUP, DATE_QUERY_MTH_GROUP,
     DATE_QUERY_DAY_GROUP, MARKER_CHARS, DATE_QUERY_GROUP, regex_date_matchers,
@@ -57,7 +60,7 @@ REGEX_MATCHERS.update(regex_date_matchers())
 FIELD_LOOKUPS = {
     # query param: filter lookup
     SEARCH_QUERY: '',
-    STATUS_QUERY: f'{Opinion.STATUS_FIELD}__{Status.NAME_FIELD}',
+    STATUS_QUERY: f'{Opinion.STATUS_FIELD}',
     TITLE_QUERY: f'{Opinion.TITLE_FIELD}__icontains',
     CONTENT_QUERY: f'{Opinion.CONTENT_FIELD}__icontains',
     AUTHOR_QUERY: f'{Opinion.USER_FIELD}__{User.USERNAME_FIELD}__icontains',
@@ -126,13 +129,13 @@ def get_lookup(
             query_set_params.add_or_lookup(
                 query,
                 Q(_connector=Q.OR, *[
-                    Q(**{f'{FIELD_LOOKUPS[query]}': stat.display})
+                    Q(**{f'{FIELD_LOOKUPS[query]}': status_id(stat.display)})
                     for stat in value if stat
                 ])
             )
         else:
             query_set_params.add_and_lookup(
-                query, FIELD_LOOKUPS[query], value.display)
+                query, FIELD_LOOKUPS[query], status_id(value.display))
         # else do not include status in query
     elif query == CATEGORY_QUERY:
         get_category_query(query_set_params, value)
@@ -178,7 +181,7 @@ def get_search_term(
                 choice_arg_query(
                     query_set_params, match.group(group).lower(),
                     QueryStatus, QueryStatus.ALL,
-                    Status, Status.NAME_FIELD, query, FIELD_LOOKUPS[query]
+                    STATUS_REGISTRY, query, FIELD_LOOKUPS[query]
                 )
             elif query == HIDDEN_QUERY:
                 # need to filter/exclude by list of opinions that the user has
@@ -216,31 +219,11 @@ def get_search_term(
         ) else SearchType.UNKNOWN
 
         if query_set_params.search_type == SearchType.FREE:
-            # no delimiting chars, so search title & content for
+            # no delimiting chars, so text search title & content for
             # any of the search terms
-            to_query = [TITLE_QUERY, CONTENT_QUERY]
-            or_q = {}
-            for term in value.split():
-                if len(or_q) == 0:
-                    or_q = {q: [term] for q in to_query}
-                else:
-                    or_q[TITLE_QUERY].append(term)
-                    or_q[CONTENT_QUERY].append(term)
-
-            # https://docs.djangoproject.com/en/4.1/topics/db/queries/#complex-lookups-with-q
-
-            # OR queries of title and content contains terms
-            # e.g. [
-            #   "WHERE ("title") LIKE '<term>'",
-            #   "WHERE ("content") LIKE '<term>'"
-            # ]
-            for qry in to_query:
-                query_set_params.add_or_lookup(
-                    '-'.join(to_query),
-                    Q(_connector=Q.OR, **{
-                        FIELD_LOOKUPS[qry]: term for term in or_q[qry]
-                    })
-                )
+            text_search_query(
+                query_set_params, '-'.join([TITLE_QUERY, CONTENT_QUERY]),
+                Opinion, value.split())
 
     return query_set_params
 
@@ -302,15 +285,11 @@ def get_category_query(query_set_params: QuerySetParams,
     :param query_set_params: query params to update
     :param name: category name or part thereof
     """
-    # need inner queryset to get list of categories with names
-    # like the search term and then look for opinions with those
-    # categories
-    # https://docs.djangoproject.com/en/4.1/ref/models/querysets/#icontains
-    inner_qs = Category.objects.filter(**{
-        f'{Category.NAME_FIELD}__icontains': name
-    })
+    # get list of ids of categories with names like the search term and
+    # then look for opinions with those categories
     query_set_params.add_and_lookup(
-        CATEGORY_QUERY, FIELD_LOOKUPS[CATEGORY_QUERY], inner_qs)
+        CATEGORY_QUERY, FIELD_LOOKUPS[CATEGORY_QUERY],
+        CATEGORY_REGISTRY.ids_of(CATEGORY_REGISTRY.names_containing(name)))
 
 
 def get_date_query(query_set_params: QuerySetParams,
@@ -45,7 +45,8 @@ from utils import (
 from categories import (
     STATUS_DRAFT, STATUS_PUBLISHED, CATEGORY_UNASSIGNED
 )
-from categories.models import Status, Category
+from categories.models import Status
+from categories.registry import get_status, get_category
 from opinions.constants import (
     ORDER_QUERY, SEARCH_QUERY, STATUS_QUERY, PER_PAGE_QUERY,
     PAGE_QUERY, TITLE_QUERY, CONTENT_QUERY, CATEGORY_QUERY, AUTHOR_QUERY,
@@ -354,7 +355,7 @@ def query_args_status(
     :return: tuple of Status and argument class instance
     """
     status_query = query_args_value(request, query_option)
-    status = Status.objects.get(name=status_query.display)
+    status = get_status(status_query.display)
 
     return status, status_query
 
@@ -645,7 +646,7 @@ def render_opinion_form(title: str, **kwargs) -> tuple[
     if opinion_form:
         opinion_obj = context.get(OPINION_CTX, None)
         opinion_form[OpinionForm.CATEGORIES_FF].initial = [
-            Category.objects.get(name=CATEGORY_UNASSIGNED)
+            get_category(CATEGORY_UNASSIGNED)
         ] if opinion_obj is None else opinion_obj.categories.all()
 
     return app_template_path(OPINIONS_APP_NAME, "opinion_form.html"), context
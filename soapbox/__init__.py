@@ -22,7 +22,7 @@
 
 from .constants import (
     BASE_APP_NAME, USER_APP_NAME, CATEGORIES_APP_NAME, OPINIONS_APP_NAME,
-    APP_NAME, COPYRIGHT_YEAR, COPYRIGHT,
+    JOBS_APP_NAME, APP_NAME, COPYRIGHT_YEAR, COPYRIGHT,
     GET, PATCH, POST, DELETE,
     HOME_URL, HOME_ROUTE_NAME,
     ADMIN_URL, ACCOUNTS_URL, SUMMERNOTE_URL,
@@ -38,6 +38,7 @@ __all__ = [
     'USER_APP_NAME',
     'CATEGORIES_APP_NAME',
     'OPINIONS_APP_NAME',
+    'JOBS_APP_NAME',
     'APP_NAME',
     'COPYRIGHT_YEAR',
     'COPYRIGHT',
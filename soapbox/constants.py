@@ -31,6 +31,7 @@ BASE_APP_NAME = "base"
 USER_APP_NAME = "user"
 CATEGORIES_APP_NAME = "categories"
 OPINIONS_APP_NAME = "opinions"
+JOBS_APP_NAME = "jobs"
 
 # Request methods
 GET = 'GET'
@@ -42,10 +43,16 @@ DELETE = 'DELETE'
 HOME_URL = "/"
 HELP_URL = append_slash("help")
 FEED_URL = append_slash("feed")
+METRICS_URL = append_slash("metrics")
+PROFILES_URL = append_slash("profiles")
+PROFILE_URL = url_path(PROFILES_URL, "<str:name>")
 
 HOME_ROUTE_NAME = "home"
 HELP_ROUTE_NAME = "help"
 LANDING_ROUTE_NAME = "landing"
+METRICS_ROUTE_NAME = "metrics"
+PROFILES_ROUTE_NAME = "profiles"
+PROFILE_ROUTE_NAME = "profile"
 
 HOME_MENU_CTX = "home_menu"
 OPINION_MENU_CTX = "opinion_menu"
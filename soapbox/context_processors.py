@@ -29,6 +29,7 @@ from base.views import add_base_context
 from opinions.views.utils import opinion_permissions, add_opinion_context
 from categories.views import category_permissions
 from user.views import add_user_context
+from utils import timed
 from .constants import (
     COPYRIGHT_YEAR, COPYRIGHT, VAL_TEST_PATH_PREFIX, IS_DEVELOPMENT_CTX,
     IS_TEST_CTX
@@ -38,6 +39,7 @@ from .settings import DEVELOPMENT, TEST, GOOGLE_SITE_VERIFICATION
 Social = namedtuple("Social", ["name", "icon", "url"])
 
 
+@timed()
 def footer_context(request: HttpRequest) -> dict:
     """
     Context processor providing basic footer info
@@ -33,6 +33,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 import environ
@@ -40,7 +41,7 @@ from django.contrib.messages import constants as messages
 
 from .constants import (
     BASE_APP_NAME, USER_APP_NAME, CATEGORIES_APP_NAME, OPINIONS_APP_NAME,
-    MIN_PASSWORD_LEN
+    JOBS_APP_NAME, MIN_PASSWORD_LEN
 )
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -195,6 +196,7 @@ INSTALLED_APPS.extend([
     CATEGORIES_APP_NAME,
     OPINIONS_APP_NAME,
     USER_APP_NAME,
+    JOBS_APP_NAME,
 
     # needs to be after app with django template overrides
     'django.forms',
@@ -209,12 +211,16 @@ INSTALLED_APPS.extend([
 FORM_RENDERER = 'django.forms.renderers.TemplatesSetting'
 
 MIDDLEWARE = [
+    # first, so request metrics cover all other middleware
+    'utils.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'utils.AuthSnapshotMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'opinions.notifications.NotificationMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -334,6 +340,61 @@ if not TEST:
         )
     })
 
+# Cache
+# https://django-environ.readthedocs.io/en/latest/types.html#environ-env-cache-url
+# a shared cache (e.g. dbcache://, rediscache://) is required for cached data
+# to be invalidated across worker processes
+CACHES = {
+    # read os.environ['CACHE_URL']
+    'default': env.cache_url('CACHE_URL', default='locmemcache://'),
+}
+
+# Following feed
+# authors with more followers than this have their opinions read by
+# followers rather than written to the feed of each follower
+FEED_FANOUT_LIMIT = env.int('FEED_FANOUT_LIMIT', default=1000)
+
+# Background jobs
+# run jobs immediately when enqueued rather than by a worker process,
+# see jobs/queue.py
+JOBS_SYNC = env.bool('JOBS_SYNC', default=TEST)
+# number of times a job is attempted before it is marked as failed
+JOB_MAX_ATTEMPTS = env.int('JOB_MAX_ATTEMPTS', default=5)
+# delay in seconds before the first retry of a failed job, doubling for
+# each subsequent retry
+JOB_RETRY_DELAY = env.int('JOB_RETRY_DELAY', default=30)
+# number of days completed jobs are kept before being deleted by the worker
+JOB_DONE_RETENTION_DAYS = env.int('JOB_DONE_RETENTION_DAYS', default=7)
+
+# Request metrics
+# fraction of requests to record metrics for, with a Server-Timing
+# response header; 0 disables, see utils/instrumentation.py
+REQUEST_METRICS_SAMPLE_RATE = env.float(
+    'REQUEST_METRICS_SAMPLE_RATE', default=0.0)
+# log a structured line of the metrics of sampled requests
+REQUEST_METRICS_LOG = env.bool('REQUEST_METRICS_LOG', default=False)
+
+# Metrics registry
+# record metrics of all requests, for scraping from the metrics endpoint
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=False)
+# directory shared by server processes to aggregate metrics
+METRICS_DIR = env('METRICS_DIR', default=str(
+    Path(tempfile.gettempdir()) / 'soapbox-metrics'))
+# minimum seconds between writes of a process's metrics to METRICS_DIR
+METRICS_FLUSH_INTERVAL = env.float('METRICS_FLUSH_INTERVAL', default=5.0)
+# bearer token allowing non-staff access to the metrics endpoint, e.g. for
+# a Prometheus server
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+# On-demand profiling
+# directory to save superuser requested profiles in
+PROFILE_DIR = env('PROFILE_DIR', default=str(
+    Path(tempfile.gettempdir()) / 'soapbox-profiles'))
+# maximum number of profiles to keep, the oldest are removed
+PROFILE_MAX_FILES = env.int('PROFILE_MAX_FILES', default=50)
+# seconds between samples of the sampling profiler
+PROFILE_SAMPLE_INTERVAL = env.float('PROFILE_SAMPLE_INTERVAL', default=0.002)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -446,6 +507,10 @@ LOGGING = {
             'level': DJANGO_LOG_LEVEL,
             'filters': ['require_debug_true'],
             'class': 'logging.StreamHandler',
+        },
+        'metrics': {
+            'level': 'INFO',
+            'class': 'logging.StreamHandler',
         }
     },
     'loggers': {
@@ -458,6 +523,11 @@ LOGGING = {
             'level': DJANGO_LOG_LEVEL,
             'propagate': True,
         },
+        'utils.instrumentation': {
+            'handlers': ['metrics'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     }
 }
 
@@ -42,17 +42,10 @@ function update_content(order, per_page, page) {
     // remove per page and page handlers as new elements will be returned with the response
     $('#per-page-select').off();
     $('.page-item').off();
-
-    const repeat_search = $('#var--repeat-search-term').text().trim();
-    const query_args = [
-        "order=" + order, "per-page=" + per_page, "reorder=1"
-    ];
-    if (repeat_search.length > 0) {
-        query_args.push(repeat_search)
-    }
+    $('.load-more-item').off();
 
     $.ajax({
-        url: page + "&" + query_args.join("&")
+        url: page + "&" + content_query_args(order, per_page)
     }).done(function(data) {
         $('#article-content').html(data);
 
@@ -65,6 +58,50 @@ function update_content(order, per_page, page) {
     });
 }
 
+/**
+ * Append the next page of content to the current content
+ * :param order: sort order
+ * :param per_page: per page
+ * :param page: url of next page
+ */
+function load_more_content(order, per_page, page) {
+
+    // remove load more handler as a new element will be returned with the response
+    $('.load-more-item').off();
+
+    $.ajax({
+        url: page + "&" + content_query_args(order, per_page)
+    }).done(function(data) {
+        const content = $('<div>').html(data);
+        $('#id--content-list').append(content.find('#id--content-list').children());
+        $('#id--load-more').replaceWith(content.find('#id--load-more'));
+
+        setReactionHandlers();
+        enableTooltips();
+
+        add_load_more_handler();
+    });
+}
+
+/**
+ * Get the query args for a content request
+ * :param order: sort order
+ * :param per_page: per page
+ */
+function content_query_args(order, per_page) {
+    const repeat_search = $('#var--repeat-search-term').text().trim();
+    const query_args = [
+        "per-page=" + per_page, "reorder=1"
+    ];
+    if (order !== undefined) {
+        query_args.unshift("order=" + order)
+    }
+    if (repeat_search.length > 0) {
+        query_args.push(repeat_search)
+    }
+    return query_args.join("&");
+}
+
 /** Get current per page value */
 function get_per_page() {
     return $('#per-page-select').find(":selected").val();
@@ -100,6 +137,21 @@ function add_page_content_handlers() {
         event.preventDefault();
         update_content(get_order(), get_per_page(), event.currentTarget.firstElementChild.href)
     });
+    add_load_more_handler();
+}
+
+/**
+ * Add click handler for load more
+ */
+function add_load_more_handler() {
+    /**
+     * Click handler for load more request
+     * :param event: click event
+     */
+    $('.load-more-item').on( "click", function(event) {
+        event.preventDefault();
+        load_more_content(get_order(), get_per_page(), event.currentTarget.firstElementChild.href)
+    });
 }
 
 
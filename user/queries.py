@@ -24,6 +24,8 @@ from typing import List
 
 from allauth.socialaccount.models import SocialApp
 
+from utils import get_auth_snapshot
+
 from .constants import MODERATOR_GROUP, AUTHOR_GROUP
 from .models import User
 
@@ -34,7 +36,7 @@ def is_moderator(user: User) -> bool:
     :param user: user to check
     :return: True if moderator
     """
-    return user.groups.filter(name=MODERATOR_GROUP).exists() \
+    return get_auth_snapshot(user).in_group(MODERATOR_GROUP) \
         if user else False
 
 
@@ -44,7 +46,7 @@ def is_author(user: User) -> bool:
     :param user: user to check
     :return: True if author
     """
-    return user.groups.filter(name=AUTHOR_GROUP).exists() \
+    return get_auth_snapshot(user).in_group(AUTHOR_GROUP) \
         if user else False
 
 
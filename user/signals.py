@@ -20,6 +20,7 @@
 #  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 #  DEALINGS IN THE SOFTWARE.
 #
+from django.db.models.signals import m2m_changed
 from django.dispatch import receiver
 from allauth.account.signals import (
     user_logged_in, user_logged_out, user_signed_up
@@ -32,10 +33,18 @@ from allauth.socialaccount.signals import (
 from opinions.notifications import (
     process_login_opinions, process_register_new_user
 )
+from utils import invalidate_auth_snapshot
 from .models import User
 from .permissions import add_to_authors
 
 
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed_callback(sender, **kwargs):
+    # groups of user changed so any authorisation snapshot is out of date
+    if not kwargs.get('reverse', False):
+        invalidate_auth_snapshot(kwargs.get('instance', None))
+
+
 @receiver(user_logged_in)
 def user_logged_in_callback(sender, **kwargs):
     # by the time this signal is received the 'last_login' field in
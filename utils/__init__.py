@@ -26,12 +26,25 @@ from .misc import (
     permission_check, ensure_list, find_index
 )
 from .views import redirect_on_success_or_render, resolve_req
+from .auth import (
+    AuthSnapshot, AuthSnapshotMiddleware, get_auth_snapshot,
+    request_auth_snapshot, invalidate_auth_snapshot
+)
 from .forms import update_field_widgets, error_messages, ErrorMsgs
 from .file import find_parent_of_folder
 from .models import (
     SlugMixin, ModelMixin, ModelFacadeMixin,
     DESC_LOOKUP, DATE_OLDEST_LOOKUP, DATE_NEWEST_LOOKUP
 )
+from .pagination import KeysetPaginator, KeysetPage
+from .instrumentation import (
+    RequestMetrics, RequestMetricsMiddleware, QueryTimer, current_metrics,
+    timed
+)
+from .metrics import (
+    MetricsRegistry, get_registry, exposition, METRICS_CONTENT_TYPE
+)
+from .profiling import profiled, ProfileMode
 
 
 __all__ = [
@@ -51,6 +64,12 @@ __all__ = [
     'redirect_on_success_or_render',
     'resolve_req',
 
+    'AuthSnapshot',
+    'AuthSnapshotMiddleware',
+    'get_auth_snapshot',
+    'request_auth_snapshot',
+    'invalidate_auth_snapshot',
+
     'update_field_widgets',
     'error_messages',
     'ErrorMsgs',
@@ -62,5 +81,22 @@ __all__ = [
     'ModelFacadeMixin',
     'DESC_LOOKUP',
     'DATE_OLDEST_LOOKUP',
-    'DATE_NEWEST_LOOKUP'
+    'DATE_NEWEST_LOOKUP',
+
+    'KeysetPaginator',
+    'KeysetPage',
+
+    'RequestMetrics',
+    'RequestMetricsMiddleware',
+    'QueryTimer',
+    'current_metrics',
+    'timed',
+
+    'MetricsRegistry',
+    'get_registry',
+    'exposition',
+    'METRICS_CONTENT_TYPE',
+
+    'profiled',
+    'ProfileMode'
 ]
@@ -0,0 +1,136 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from functools import cached_property
+from typing import Callable, Optional, TYPE_CHECKING
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+if TYPE_CHECKING:
+    # utils is imported before the apps registry is ready
+    from django.contrib.auth.base_user import AbstractBaseUser
+
+AUTH_SNAPSHOT_ATTRIB = 'auth_snapshot'
+""" Name of request/user attribute holding the authorisation snapshot """
+_USER_SNAPSHOT_ATTRIB = f'_{AUTH_SNAPSHOT_ATTRIB}'
+
+
+class AuthSnapshot:
+    """
+    Snapshot of a user's groups and permissions, loaded once on first use
+    """
+    def __init__(self, user: Optional['AbstractBaseUser']):
+        self.user = user
+
+    @property
+    def is_active(self) -> bool:
+        """ Check if the user is an active, authenticated user """
+        return self.user is not None and self.user.is_authenticated and \
+            self.user.is_active
+
+    @cached_property
+    def groups(self) -> frozenset[str]:
+        """ Names of the groups the user belongs to """
+        return frozenset(
+            self.user.groups.values_list('name', flat=True)
+        ) if self.is_active else frozenset()
+
+    @cached_property
+    def permissions(self) -> frozenset[str]:
+        """ Permissions the user has, including those of their groups """
+        return frozenset(
+            self.user.get_all_permissions()
+        ) if self.is_active else frozenset()
+
+    def in_group(self, name: str) -> bool:
+        """
+        Check if the user is a member of the specified group
+        :param name: name of group
+        :return: True if member
+        """
+        return name in self.groups
+
+    def has_perm(self, perm: str) -> bool:
+        """
+        Check if the user has the specified permission
+        :param perm: permission name; `<app_label>.<permission codename>`
+        :return: True if user has permission
+        """
+        if self.is_active and self.user.is_superuser:
+            return True
+        return perm in self.permissions
+
+
+def get_auth_snapshot(user: Optional['AbstractBaseUser']) -> AuthSnapshot:
+    """
+    Get the authorisation snapshot for a user
+    :param user: user to get snapshot for
+    :return: snapshot
+    """
+    if user is None or user.is_anonymous:
+        return AuthSnapshot(user)
+
+    snapshot = getattr(user, _USER_SNAPSHOT_ATTRIB, None)
+    if snapshot is None:
+        snapshot = AuthSnapshot(user)
+        setattr(user, _USER_SNAPSHOT_ATTRIB, snapshot)
+    return snapshot
+
+
+def request_auth_snapshot(request: HttpRequest) -> AuthSnapshot:
+    """
+    Get the authorisation snapshot for the user of a request
+    :param request: http request
+    :return: snapshot
+    """
+    snapshot = getattr(request, AUTH_SNAPSHOT_ATTRIB, None)
+    return snapshot if snapshot is not None else \
+        get_auth_snapshot(request.user)
+
+
+def invalidate_auth_snapshot(user: Optional['AbstractBaseUser']):
+    """
+    Discard the authorisation snapshot for a user
+    :param user: user whose groups or permissions have changed
+    """
+    if user is not None and hasattr(user, _USER_SNAPSHOT_ATTRIB):
+        delattr(user, _USER_SNAPSHOT_ATTRIB)
+    for cache in ['_perm_cache', '_user_perm_cache', '_group_perm_cache']:
+        # ModelBackend permission caches
+        if user is not None and hasattr(user, cache):
+            delattr(user, cache)
+
+
+class AuthSnapshotMiddleware:
+    """
+    Middleware attaching an authorisation snapshot to requests, so the
+    request user's groups and permissions are only loaded once per request.
+    Must be placed after AuthenticationMiddleware.
+    """
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        setattr(request, AUTH_SNAPSHOT_ATTRIB, SimpleLazyObject(
+            lambda: get_auth_snapshot(request.user)))
+        return self.get_response(request)
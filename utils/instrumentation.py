@@ -0,0 +1,321 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from contextlib import ExitStack
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict, field
+from functools import wraps
+import json
+import logging
+import random
+from time import perf_counter
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+from .metrics import get_registry
+from .views import resolve_req
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_HEADER = 'Server-Timing'
+UNRESOLVED_URL_NAME = 'unresolved'
+""" Url name of requests which do not resolve to a view """
+
+_MISSING = object()
+
+
+@dataclass
+class RequestMetrics:
+    """ Metrics of a request; times in milliseconds """
+
+    url_name: str = UNRESOLVED_URL_NAME
+    method: str = ''
+    status: int = 0
+    total_ms: float = 0.0
+    view_ms: float = 0.0
+    sql_count: int = 0
+    sql_ms: float = 0.0
+    template_ms: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    spans: dict[str, float] = field(default_factory=dict)
+    """ Times of functions decorated with `timed`, with name as key """
+
+    def server_timing(self) -> str:
+        """ Get the metrics as a Server-Timing header value """
+        return ', '.join([
+            f'total;dur={self.total_ms:.1f}',
+            f'view;dur={self.view_ms:.1f}',
+            f'sql;dur={self.sql_ms:.1f};desc="{self.sql_count} queries"',
+            f'tpl;dur={self.template_ms:.1f}',
+            f'cache;desc="{self.cache_hits} hits {self.cache_misses} '
+            f'misses"',
+        ] + [
+            f'{name};dur={duration:.1f}'
+            for name, duration in self.spans.items()
+        ])
+
+    def log_line(self) -> str:
+        """ Get the metrics as a structured log line """
+        metrics = asdict(self)
+        metrics['spans'] = {
+            name: round(duration, 3) for name, duration in self.spans.items()
+        }
+        return json.dumps({
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in metrics.items()
+        })
+
+
+_current_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    'request_metrics', default=None)
+_counting_cache: ContextVar[bool] = ContextVar(
+    'counting_cache', default=False)
+""" Cache access is being counted flag, see `_instrument_caches` """
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """ Get the metrics of the request being instrumented, if any """
+    return _current_metrics.get()
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """
+    Decorator recording the time spent in a function in the metrics of the
+    request being instrumented, if any
+    :param name: span name; default function name
+    :return: decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        span = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = current_metrics()
+            if metrics is None:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.spans[span] = metrics.spans.get(span, 0.0) + \
+                    (perf_counter() - start) * 1000
+        return wrapper
+    return decorator
+
+
+class QueryTimer:
+    """
+    Database execute wrapper counting and timing queries
+    https://docs.djangoproject.com/en/4.2/topics/db/instrumentation/
+    """
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+        """ Total query time in seconds """
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += perf_counter() - start
+            self.count += 1
+
+
+def _instrument_templates():
+    """
+    Time template rendering.
+    Only top-level renders (i.e. render_to_string or template responses)
+    are timed, so included templates are not counted twice.
+    """
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, 'instrumented', False):
+        return
+    render = Template.render
+
+    @wraps(render)
+    def timed_render(self, *args, **kwargs):
+        metrics = current_metrics()
+        if metrics is None:
+            return render(self, *args, **kwargs)
+        start = perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            metrics.template_ms += (perf_counter() - start) * 1000
+
+    timed_render.instrumented = True
+    Template.render = timed_render
+
+
+def _count_cache_access(func: Callable, *args, **kwargs):
+    """
+    Call a cache access function, unless a cache access is already being
+    counted, in which case the function is called without counting.
+    Backends implement get and get_many in terms of each other (e.g.
+    DatabaseCache.get uses get_many, BaseCache.get_many uses get), so only
+    the outermost access is counted.
+    :param func: counting function to call
+    :return: tuple of (counted flag, function result)
+    """
+    if _counting_cache.get() or current_metrics() is None:
+        return False, None
+    token = _counting_cache.set(True)
+    try:
+        return True, func(*args, **kwargs)
+    finally:
+        _counting_cache.reset(token)
+
+
+def _instrument_caches():
+    """ Count cache hits and misses of the configured cache backends """
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        if getattr(backend.get, 'instrumented', False):
+            continue
+        get = backend.get
+        get_many = backend.get_many
+
+        def get_value(self, key, version, _get=get):
+            value = _get(self, key, default=_MISSING, version=version)
+            metrics = current_metrics()
+            if value is _MISSING:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+            return value
+
+        @wraps(get)
+        def counted_get(self, key, default=None, version=None, _get=get,
+                        _get_value=get_value):
+            counted, value = _count_cache_access(
+                _get_value, self, key, version)
+            if not counted:
+                return _get(self, key, default=default, version=version)
+            return default if value is _MISSING else value
+
+        def get_values(self, keys, version, _get_many=get_many):
+            values = _get_many(self, keys, version=version)
+            metrics = current_metrics()
+            metrics.cache_hits += len(values)
+            metrics.cache_misses += len(keys) - len(values)
+            return values
+
+        @wraps(get_many)
+        def counted_get_many(self, keys, version=None, _get_many=get_many,
+                             _get_values=get_values):
+            keys = list(keys)
+            counted, values = _count_cache_access(
+                _get_values, self, keys, version)
+            if not counted:
+                return _get_many(self, keys, version=version)
+            return values
+
+        counted_get.instrumented = True
+        backend.get = counted_get
+        backend.get_many = counted_get_many
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware recording per-request metrics; SQL query count and time,
+    template render time, cache hits/misses, and view and total time.
+    Sampled requests get a Server-Timing header and, if
+    REQUEST_METRICS_LOG is set, a structured log line keyed by url name.
+    If METRICS_ENABLED is set, all requests are recorded in the metrics
+    registry.
+    The view time runs from the view being called until its response is
+    rendered; for template responses this is when rendering completes, and
+    for other responses, which are rendered by the view, when the response
+    is returned to this middleware, so it also includes the response
+    processing of any later middleware. Should be placed first, so the
+    total time covers all middleware.
+    """
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        self.log = settings.REQUEST_METRICS_LOG
+        self.registry = get_registry() if settings.METRICS_ENABLED else None
+        if self.sample_rate > 0 or self.registry:
+            _instrument_templates()
+            _instrument_caches()
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        sampled = self.sample_rate > 0 and \
+            random.random() < self.sample_rate
+        if not sampled and not self.registry:
+            return self.get_response(request)
+
+        metrics = RequestMetrics(method=request.method)
+        token = _current_metrics.set(metrics)
+        timer = QueryTimer()
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+
+        end = perf_counter()
+        metrics.total_ms = (end - start) * 1000
+        metrics.sql_count = timer.count
+        metrics.sql_ms = timer.elapsed * 1000
+        view_start = getattr(request, '_metrics_view_start', None)
+        if view_start is not None:
+            metrics.view_ms = (getattr(
+                request, '_metrics_view_end', end) - view_start) * 1000
+        metrics.status = response.status_code
+        match = getattr(request, 'resolver_match', None) or \
+            resolve_req(request)
+        if match:
+            metrics.url_name = match.view_name
+
+        if self.registry:
+            self.registry.observe_request(metrics)
+        if sampled:
+            response[SERVER_TIMING_HEADER] = metrics.server_timing()
+            if self.log:
+                logger.info(metrics.log_line())
+        return response
+
+    def process_view(self, request: HttpRequest, view_func, view_args,
+                     view_kwargs):
+        if current_metrics() is not None:
+            setattr(request, '_metrics_view_start', perf_counter())
+
+    def process_template_response(self, request: HttpRequest,
+                                  response: HttpResponse):
+        # called before the response is rendered, so stamp the end of the
+        # view after rendering
+        if current_metrics() is not None:
+            response.add_post_render_callback(
+                lambda rendered: setattr(
+                    request, '_metrics_view_end', perf_counter()))
+        return response
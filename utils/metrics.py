@@ -0,0 +1,355 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+import atexit
+from bisect import bisect_left
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+from time import monotonic
+from typing import Optional, Union
+
+from django.conf import settings
+
+# In-process metrics registry.
+# Each process keeps its metrics in memory and periodically writes them to
+# its own file in a shared directory, so that the metrics of all the
+# worker processes of a server can be aggregated when scraped.
+
+METRICS_PREFIX = 'soapbox'
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+""" Prometheus text exposition format content type """
+QUANTILES = (0.5, 0.95, 0.99)
+""" Quantiles estimated from histograms """
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+REQUESTS_TOTAL = 'requests_total'
+REQUEST_DURATION = 'request_duration_seconds'
+REQUEST_QUERIES = 'request_queries'
+DB_QUERIES_TOTAL = 'db_queries_total'
+DB_QUERY_DURATION_TOTAL = 'db_query_duration_seconds_total'
+CACHE_HITS_TOTAL = 'cache_hits_total'
+CACHE_MISSES_TOTAL = 'cache_misses_total'
+CACHE_HIT_RATIO = 'cache_hit_ratio'
+JOBS_QUEUE_DEPTH = 'jobs_queue_depth'
+
+ROUTE_LABEL = 'route'
+
+METRICS = {
+    # name: (type, help, histogram buckets)
+    REQUESTS_TOTAL: (COUNTER, 'Requests by route, method and status', None),
+    REQUEST_DURATION: (HISTOGRAM, 'Request duration by route', (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)),
+    REQUEST_QUERIES: (HISTOGRAM, 'Database queries per request by route', (
+        1, 2, 5, 10, 20, 50, 100, 200, 500)),
+    DB_QUERIES_TOTAL: (COUNTER, 'Database queries by route', None),
+    DB_QUERY_DURATION_TOTAL: (
+        COUNTER, 'Database query duration by route', None),
+    CACHE_HITS_TOTAL: (COUNTER, 'Cache hits', None),
+    CACHE_MISSES_TOTAL: (COUNTER, 'Cache misses', None),
+    CACHE_HIT_RATIO: (GAUGE, 'Ratio of cache reads which were hits', None),
+    JOBS_QUEUE_DEPTH: (GAUGE, 'Background jobs by state', None),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: Optional[dict]) -> Labels:
+    """ Get a hashable representation of labels """
+    return tuple(sorted(
+        (key, str(value)) for key, value in (labels or {}).items()))
+
+
+class MetricsRegistry:
+    """
+    Registry of counters and histograms
+    """
+    def __init__(self, directory: Optional[Union[str, Path]] = None,
+                 flush_interval: float = 0, process_id: str = None):
+        """
+        Constructor
+        :param directory: directory to write metrics to; default None, i.e.
+                    only held in memory
+        :param flush_interval: minimum seconds between writes
+        :param process_id: id of process; default process id
+        """
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self.process_id = process_id or str(os.getpid())
+        self.lock = threading.Lock()
+        self.counters: dict[tuple[str, Labels], float] = {}
+        self.histograms: dict[tuple[str, Labels], list] = {}
+        self.last_flush = monotonic()
+
+    @property
+    def path(self) -> Optional[Path]:
+        """ Path of this process's metrics file """
+        return self.directory / f'{self.process_id}.json' \
+            if self.directory else None
+
+    def inc(self, name: str, labels: Optional[dict] = None,
+            value: float = 1):
+        """
+        Increment a counter
+        :param name: metric name
+        :param labels: metric labels
+        :param value: amount to increment by
+        """
+        key = (name, _labels(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float,
+                labels: Optional[dict] = None):
+        """
+        Record a histogram observation
+        :param name: metric name
+        :param value: observed value
+        :param labels: metric labels
+        """
+        buckets = METRICS[name][2]
+        key = (name, _labels(labels))
+        with self.lock:
+            # per bucket counts, including +Inf, then sum and count
+            histogram = self.histograms.setdefault(
+                key, [0] * (len(buckets) + 1) + [0.0, 0])
+            histogram[bisect_left(buckets, value)] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def observe_request(self, metrics):
+        """
+        Record the metrics of a request
+        :param metrics: RequestMetrics of request
+        """
+        route = {ROUTE_LABEL: metrics.url_name}
+        self.inc(REQUESTS_TOTAL, {
+            **route, 'method': metrics.method, 'status': metrics.status})
+        self.observe(REQUEST_DURATION, metrics.total_ms / 1000, route)
+        self.observe(REQUEST_QUERIES, metrics.sql_count, route)
+        self.inc(DB_QUERIES_TOTAL, route, metrics.sql_count)
+        self.inc(DB_QUERY_DURATION_TOTAL, route, metrics.sql_ms / 1000)
+        self.inc(CACHE_HITS_TOTAL, value=metrics.cache_hits)
+        self.inc(CACHE_MISSES_TOTAL, value=metrics.cache_misses)
+        self.flush()
+
+    def snapshot(self) -> dict:
+        """ Get a serialisable copy of the metrics """
+        with self.lock:
+            return {
+                COUNTER: [
+                    [name, list(labels), value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                HISTOGRAM: [
+                    [name, list(labels), list(values)]
+                    for (name, labels), values in self.histograms.items()
+                ],
+            }
+
+    def flush(self, force: bool = False):
+        """
+        Write the metrics to this process's file, if the flush interval
+        has elapsed
+        :param force: write regardless of flush interval
+        """
+        if not self.directory or not force and \
+                monotonic() - self.last_flush < self.flush_interval:
+            return
+        self.last_flush = monotonic()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # write and rename so readers never see a partial file
+        with tempfile.NamedTemporaryFile(
+                'w', dir=self.directory, suffix='.tmp',
+                delete=False) as file:
+            json.dump(self.snapshot(), file)
+        os.replace(file.name, self.path)
+
+    def collect(self) -> 'MetricsRegistry':
+        """
+        Get the metrics aggregated across all processes writing to the
+        metrics directory
+        :return: aggregated registry
+        """
+        if not self.directory:
+            return self
+        self.flush(force=True)
+
+        aggregated = MetricsRegistry()
+        for path in sorted(self.directory.glob('*.json')):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue    # removed or unreadable
+            for name, labels, value in snapshot[COUNTER]:
+                key = (name, tuple(map(tuple, labels)))
+                aggregated.counters[key] = \
+                    aggregated.counters.get(key, 0) + value
+            for name, labels, values in snapshot[HISTOGRAM]:
+                key = (name, tuple(map(tuple, labels)))
+                histogram = aggregated.histograms.setdefault(
+                    key, [0] * len(values))
+                for index, value in enumerate(values):
+                    histogram[index] += value
+        return aggregated
+
+
+def histogram_quantile(quantile: float, buckets: tuple,
+                       counts: list) -> float:
+    """
+    Estimate a quantile from histogram bucket counts, by linear
+    interpolation within the bucket containing it
+    :param quantile: quantile, 0 to 1
+    :param buckets: bucket upper bounds, excluding +Inf
+    :param counts: per bucket counts, including +Inf
+    :return: estimate
+    """
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = quantile * total
+    cumulative = 0
+    for index, count in enumerate(counts):
+        if count and cumulative + count >= rank:
+            if index == len(buckets):
+                # in +Inf bucket, so highest finite bound is best estimate
+                return float(buckets[-1])
+            lower = buckets[index - 1] if index else 0
+            return lower + (buckets[index] - lower) * \
+                (rank - cumulative) / count
+        cumulative += count
+    return float(buckets[-1])
+
+
+def _label_str(labels: Labels, **extra) -> str:
+    """ Format labels for exposition """
+    labels = list(labels) + list(extra.items())
+    if not labels:
+        return ''
+    return '{' + ','.join([
+        f'{key}="{_escape(value)}"' for key, value in labels
+    ]) + '}'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace(
+        '\n', r'\n').replace('"', r'\"')
+
+
+def _value(value: float) -> str:
+    return f'{value:g}' if isinstance(value, float) else str(value)
+
+
+def exposition(registry: MetricsRegistry,
+               gauges: Optional[dict[str, dict[Labels, float]]] = None
+               ) -> str:
+    """
+    Format metrics in Prometheus text exposition format
+    :param registry: metrics to format
+    :param gauges: gauge values with metric name as key; default None
+    :return: text
+    """
+    gauges = dict(gauges or {})
+    hits = sum(
+        value for (name, _), value in registry.counters.items()
+        if name == CACHE_HITS_TOTAL)
+    reads = hits + sum(
+        value for (name, _), value in registry.counters.items()
+        if name == CACHE_MISSES_TOTAL)
+    if reads:
+        gauges[CACHE_HIT_RATIO] = {(): hits / reads}
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        full_name = f'{METRICS_PREFIX}_{name}'
+        if kind == HISTOGRAM:
+            series = sorted(
+                (labels, values)
+                for (metric, labels), values in registry.histograms.items()
+                if metric == name)
+        elif kind == COUNTER:
+            series = sorted(
+                (labels, value)
+                for (metric, labels), value in registry.counters.items()
+                if metric == name)
+        else:
+            series = sorted(gauges.get(name, {}).items())
+        if not series:
+            continue
+
+        lines.append(f'# HELP {full_name} {help_text}')
+        lines.append(f'# TYPE {full_name} {kind}')
+        for labels, values in series:
+            if kind != HISTOGRAM:
+                lines.append(
+                    f'{full_name}{_label_str(labels)} {_value(values)}')
+                continue
+            counts = values[:-2]
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], counts):
+                cumulative += count
+                lines.append(
+                    f'{full_name}_bucket'
+                    f'{_label_str(labels, le=_value(bound))} {cumulative}')
+            lines.append(
+                f'{full_name}_sum{_label_str(labels)} {_value(values[-2])}')
+            lines.append(
+                f'{full_name}_count{_label_str(labels)} {values[-1]}')
+
+        if kind == HISTOGRAM:
+            # quantile estimates, for consumers without histogram_quantile
+            quantile_name = f'{full_name}_quantile'
+            lines.append(f'# HELP {quantile_name} {help_text}, estimated '
+                         f'quantiles')
+            lines.append(f'# TYPE {quantile_name} {GAUGE}')
+            for labels, values in series:
+                for quantile in QUANTILES:
+                    estimate = histogram_quantile(
+                        quantile, buckets, values[:-2])
+                    lines.append(
+                        f'{quantile_name}'
+                        f'{_label_str(labels, quantile=quantile)} '
+                        f'{_value(float(estimate))}')
+
+    return '\n'.join(lines) + '\n'
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> MetricsRegistry:
+    """ Get the metrics registry of this process """
+    global _registry
+    directory = Path(settings.METRICS_DIR) if settings.METRICS_DIR else None
+    with _registry_lock:
+        if _registry is None or _registry.directory != directory:
+            _registry = MetricsRegistry(
+                directory=directory,
+                flush_interval=settings.METRICS_FLUSH_INTERVAL)
+            atexit.register(_registry.flush, force=True)
+        return _registry
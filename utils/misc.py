@@ -32,6 +32,8 @@ from django.db import models
 from django.http import HttpRequest
 from django.urls import reverse as django_reverse
 
+from .auth import request_auth_snapshot
+
 
 def append_slash(url: str) -> str:
     """
@@ -171,8 +173,9 @@ def permission_check(
             True
     """
     has_perm = False
+    auth_snapshot = request_auth_snapshot(request)
     for chk_perm in ensure_list(perm_op):
-        has_perm = request.user.has_perm(
+        has_perm = auth_snapshot.has_perm(
             permission_name(model, chk_perm, app_label=app_label))
         if not has_perm:
             break
@@ -0,0 +1,245 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+from datetime import datetime
+from hashlib import md5
+from typing import Any, Optional, Union
+
+from django.core import signing
+from django.db.models import Q, F, QuerySet, Expression
+from django.db.models.expressions import OrderBy
+
+from .models import DESC_LOOKUP
+
+CURSOR_SALT = 'utils.pagination.cursor'
+""" Salt for signing cursor tokens """
+APPROX_TOTAL_LIMIT = 1000
+""" Maximum count for approximate totals """
+
+_KEY_ANNOTATION = '_keyset_{}'
+_NEXT = 'n'
+_PREVIOUS = 'p'
+_DATETIME = 'dt'
+
+TypeOrdering = Union[str, Expression]
+
+
+def ordering_keys(
+        ordering: tuple[TypeOrdering]) -> list[tuple[Expression, bool]]:
+    """
+    Get the keys of an ordering
+    :param ordering: tuple of lookups/expressions as passed to order_by()
+    :return: list of tuples of key expression and descending flag
+    """
+    keys = []
+    for order in ordering:
+        if isinstance(order, str):
+            keys.append((
+                F(order[len(DESC_LOOKUP):])
+                if order.startswith(DESC_LOOKUP) else F(order),
+                order.startswith(DESC_LOOKUP)
+            ))
+        elif isinstance(order, OrderBy):
+            keys.append((order.expression, order.descending))
+        else:
+            keys.append((order, False))
+    return keys
+
+
+def _encode_value(value: Any) -> Any:
+    """ Encode a key value for a cursor token """
+    return [_DATETIME, value.isoformat()] \
+        if isinstance(value, datetime) else value
+
+
+def _decode_value(value: Any) -> Any:
+    """ Decode a key value from a cursor token """
+    return datetime.fromisoformat(value[1]) \
+        if isinstance(value, list) and value[0] == _DATETIME else value
+
+
+class KeysetPage:
+    """
+    Page of results from a keyset paginated query
+    """
+    object_list: list
+    """ Objects in the page """
+    next_cursor: Optional[str]
+    """ Token to get the following page """
+    previous_cursor: Optional[str]
+    """ Token to get the preceding page """
+    approx_total: Optional[int]
+    """ Total number of objects, up to `APPROX_TOTAL_LIMIT` """
+
+    def __init__(self, object_list: list, next_cursor: Optional[str] = None,
+                 previous_cursor: Optional[str] = None,
+                 approx_total: Optional[int] = None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.approx_total = approx_total
+
+    @property
+    def has_next(self) -> bool:
+        """ Check if there is a following page """
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        """ Check if there is a preceding page """
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        """ Check if there are other pages """
+        return self.has_next or self.has_previous
+
+    @property
+    def total_is_exact(self) -> bool:
+        """ Check if the approximate total is the actual total """
+        return self.approx_total is not None and \
+            self.approx_total < APPROX_TOTAL_LIMIT
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)}>'
+
+
+class KeysetPaginator:
+    """
+    Paginator which selects pages by comparing the ordering keys with those
+    of the last/first row of the previous page, rather than using an offset.
+    The cost of getting a page is independent of its position in the
+    results. Ordering keys must not be null, and should be unique when
+    combined, e.g. by ending with the id.
+    """
+    def __init__(self, queryset: QuerySet, ordering: tuple[TypeOrdering],
+                 per_page: int):
+        """
+        Constructor
+        :param queryset: query set to paginate
+        :param ordering: tuple of lookups/expressions as passed to order_by()
+        :param per_page: number of objects per page
+        """
+        self.queryset = queryset
+        self.keys = ordering_keys(ordering)
+        self.per_page = per_page
+        # identifies the ordering a cursor was generated for
+        self.signature = md5(
+            str(self.keys).encode(), usedforsecurity=False).hexdigest()
+
+    def encode_cursor(self, direction: str, obj: Any) -> str:
+        """
+        Get the cursor token for the page before/after an object
+        :param direction: direction from object
+        :param obj: object
+        :return: token
+        """
+        return signing.dumps({
+            's': self.signature,
+            'd': direction,
+            'v': [
+                _encode_value(getattr(obj, _KEY_ANNOTATION.format(idx)))
+                for idx in range(len(self.keys))
+            ]
+        }, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(
+            self, cursor: Optional[str]) -> tuple[str, Optional[list]]:
+        """
+        Decode a cursor token
+        :param cursor: token
+        :return: tuple of direction and key values, or None if the token
+                is missing or not valid for this paginator
+        """
+        try:
+            token = signing.loads(cursor, salt=CURSOR_SALT) \
+                if cursor else None
+        except signing.BadSignature:
+            token = None
+        if not isinstance(token, dict) or \
+                token.get('s') != self.signature or \
+                len(token.get('v', [])) != len(self.keys):
+            return _NEXT, None
+        return token.get('d', _NEXT), list(map(_decode_value, token['v']))
+
+    def page(self, cursor: Optional[str] = None,
+             approx_total: bool = False) -> KeysetPage:
+        """
+        Get a page
+        :param cursor: token from a previous page; default None i.e. the
+                first page
+        :param approx_total: count the total, up to `APPROX_TOTAL_LIMIT`;
+                default False
+        :return: page
+        """
+        direction, values = self.decode_cursor(cursor)
+        backwards = direction == _PREVIOUS
+
+        names = [
+            _KEY_ANNOTATION.format(idx) for idx in range(len(self.keys))
+        ]
+        query_set = self.queryset.annotate(**{
+            name: expression for name, (expression, _) in zip(names, self.keys)
+        })
+        # descending flags in the direction of travel
+        descending = [desc != backwards for _, desc in self.keys]
+
+        if values is not None:
+            # rows after the cursor row: first key beyond the cursor value,
+            # or equal first key and second key beyond, etc.
+            after = Q()
+            for idx, name in enumerate(names):
+                after |= Q(**{
+                    names[prev]: values[prev] for prev in range(idx)
+                }, **{
+                    f'{name}__{"lt" if descending[idx] else "gt"}':
+                        values[idx]
+                })
+            query_set = query_set.filter(after)
+
+        rows = list(
+            query_set.order_by(*[
+                f'{DESC_LOOKUP if desc else ""}{name}'
+                for name, desc in zip(names, descending)
+            ])[:self.per_page + 1]
+        )
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        has_next = more if not backwards else values is not None
+        has_previous = more if backwards else values is not None
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(_NEXT, rows[-1])
+            if rows and has_next else None,
+            previous_cursor=self.encode_cursor(_PREVIOUS, rows[0])
+            if rows and has_previous else None,
+            approx_total=self.queryset.order_by()[
+                :APPROX_TOTAL_LIMIT].count() if approx_total else None
+        )
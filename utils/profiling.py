@@ -0,0 +1,299 @@
+#  MIT License
+#
+#  Copyright (c) 2022 Ian Buttimer
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM,OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+#
+import cProfile
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from enum import Enum
+from functools import wraps
+import io
+from pathlib import Path
+import pstats
+import re
+import sys
+import threading
+from typing import Callable, Optional
+import uuid
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+# On-demand profiling of views.
+# Superusers may profile a view decorated with `profiled` by adding the
+# profile query parameter or header to a request, e.g. '?profile=cprofile'
+# or 'X-Profile: sample'. The profile covers the view and the rendering of
+# its response, and is saved in settings.PROFILE_DIR; cProfile profiles as
+# pstats files and sampled profiles as flamegraph-compatible collapsed
+# stacks. The name of the saved profile is returned in a response header.
+
+PROFILE_QUERY = 'profile'
+""" Query parameter requesting a profile """
+PROFILE_HEADER = 'X-Profile'
+""" Request header requesting a profile, and response header with name """
+PROFILE_NAME_RE = re.compile(r'^[\w-]+$')
+""" Regex of valid profile names """
+
+_profile_lock = threading.Lock()
+""" Lock to ensure only one deterministic profile runs at a time """
+_profiling: ContextVar[bool] = ContextVar('profiling', default=False)
+""" Profile in progress flag, so nested profiled views are not profiled """
+
+
+class ProfileMode(Enum):
+    """ Enum representing profiler modes """
+    CPROFILE = ('cprofile', 'pstats', 'prof')
+    SAMPLE = ('sample', 'collapsed', 'collapsed')
+
+    def __init__(self, arg: str, format_name: str, extension: str):
+        self.arg = arg
+        self.format_name = format_name
+        self.extension = extension
+
+    @staticmethod
+    def from_arg(arg: str) -> Optional['ProfileMode']:
+        """
+        Get the ProfileMode corresponding to `arg`
+        :param arg: argument to find
+        :return: mode or None if not found
+        """
+        arg = arg.strip().lower()
+        for mode in ProfileMode:
+            if arg == mode.arg:
+                return mode
+        return ProfileMode.CPROFILE if arg in ['1', 'true'] else None
+
+    @staticmethod
+    def from_extension(extension: str) -> Optional['ProfileMode']:
+        """
+        Get the ProfileMode corresponding to a file extension
+        :param extension: extension, without '.'
+        :return: mode or None if not found
+        """
+        for mode in ProfileMode:
+            if extension == mode.extension:
+                return mode
+        return None
+
+
+def requested_profile(request: HttpRequest) -> Optional[ProfileMode]:
+    """
+    Get the profile mode requested by a request
+    :param request: http request
+    :return: profile mode or None if not requested or not permitted
+    """
+    arg = request.GET.get(PROFILE_QUERY) or \
+        request.headers.get(PROFILE_HEADER)
+    if not arg or not request.user.is_authenticated or \
+            not request.user.is_superuser:
+        return None
+    return ProfileMode.from_arg(arg)
+
+
+class SamplingProfiler:
+    """
+    Profiler periodically sampling the stack of the thread which started it
+    """
+    def __init__(self, interval: float):
+        """
+        Constructor
+        :param interval: seconds between samples
+        """
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        """ Start sampling the current thread """
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        """ Stop sampling """
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f'{code.co_name} ({Path(code.co_filename).name}:'
+                    f'{frame.f_lineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """
+        Get samples as collapsed stacks, one per line with the sample count
+        :return: text
+        """
+        return ''.join([
+            f'{stack} {count}\n'
+            for stack, count in self.stacks.most_common()
+        ])
+
+
+def profile_dir() -> Path:
+    """ Get the profile directory """
+    return Path(settings.PROFILE_DIR)
+
+
+def profile_path(name: str) -> Optional[Path]:
+    """
+    Get the path of a saved profile
+    :param name: name of profile
+    :return: path or None if not found
+    """
+    if not PROFILE_NAME_RE.match(name):
+        return None
+    for mode in ProfileMode:
+        path = profile_dir() / f'{name}.{mode.extension}'
+        if path.is_file():
+            return path
+    return None
+
+
+def list_profiles() -> list[Path]:
+    """
+    Get the saved profiles, newest first
+    :return: list of paths
+    """
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    return sorted([
+        path for path in directory.iterdir()
+        if ProfileMode.from_extension(path.suffix[1:])
+    ], key=lambda path: path.name, reverse=True)
+
+
+def _save_profile(profiler, mode: ProfileMode, view_name: str) -> str:
+    """
+    Save a profile, removing the oldest if there are too many
+    :param profiler: profiler
+    :param mode: profile mode
+    :param view_name: name of profiled view
+    :return: profile name
+    """
+    name = '-'.join([
+        datetime.now().strftime('%Y%m%d%H%M%S%f'),
+        re.sub(r'[^\w-]', '-', view_name),
+        uuid.uuid4().hex[:8]
+    ])
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{name}.{mode.extension}'
+    if mode == ProfileMode.CPROFILE:
+        profiler.dump_stats(path)
+    else:
+        path.write_text(profiler.collapsed())
+
+    for old in list_profiles()[settings.PROFILE_MAX_FILES:]:
+        old.unlink(missing_ok=True)
+    return name
+
+
+def profile_text(path: Path, limit: int = 50) -> str:
+    """
+    Get a text summary of a saved profile
+    :param path: path of profile
+    :param limit: maximum number of functions or stacks to include
+    :return: text
+    """
+    if ProfileMode.from_extension(path.suffix[1:]) == ProfileMode.CPROFILE:
+        stream = io.StringIO()
+        stats = pstats.Stats(str(path), stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        return stream.getvalue()
+    return ''.join(path.read_text().splitlines(keepends=True)[:limit])
+
+
+def profiled(func: Callable) -> Callable:
+    """
+    Decorator for view functions and methods, to profile the view when
+    requested by a superuser
+    :param func: view function or method, with the request as the first
+                argument after any `self`
+    :return: decorated function
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs) -> HttpResponse:
+        request = next(
+            arg for arg in args if isinstance(arg, HttpRequest))
+        mode = requested_profile(request)
+        if mode is None or _profiling.get():
+            return func(*args, **kwargs)
+
+        token = _profiling.set(True)
+        try:
+            profiler, response = _profile(mode, func, *args, **kwargs)
+        finally:
+            _profiling.reset(token)
+
+        match = getattr(request, 'resolver_match', None)
+        response[PROFILE_HEADER] = _save_profile(
+            profiler, mode, match.view_name if match else func.__name__)
+        return response
+
+    return wrapper
+
+
+def _profile(mode: ProfileMode, func: Callable, *args, **kwargs):
+    """
+    Profile a view
+    :param mode: profile mode
+    :param func: view function
+    :param args: view arguments
+    :param kwargs: view keyword arguments
+    :return: tuple of profiler and response
+    """
+    if mode == ProfileMode.CPROFILE:
+        # only one deterministic profiler may be active at a time
+        with _profile_lock:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = _render(func(*args, **kwargs))
+            finally:
+                profiler.disable()
+    else:
+        profiler = SamplingProfiler(settings.PROFILE_SAMPLE_INTERVAL)
+        profiler.start()
+        try:
+            response = _render(func(*args, **kwargs))
+        finally:
+            profiler.stop()
+    return profiler, response
+
+
+def _render(response: HttpResponse) -> HttpResponse:
+    """ Render a template response, so rendering is profiled """
+    if hasattr(response, 'render') and callable(response.render):
+        response.render()
+    return response